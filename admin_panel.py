@@ -0,0 +1,97 @@
+# admin_panel.py
+# The starlette-admin panel at /admin, and when it gets loaded.
+#
+# The panel (ten views/*_view.py modules, starlette-admin, its templates) is
+# only used by staff, but importing and building it was a good part of every
+# worker's boot time and memory. ADMIN_MODE picks what a worker does:
+#   - "lazy" (default): /admin is a placeholder until its first request,
+#     which imports the views and builds the panel (that first page takes
+#     the import time once per worker); API-only workers never pay for it
+#   - "on": built at startup, like before (a dedicated admin worker pool)
+#   - "off": no /admin at all (API workers when /admin is routed to admin
+#     workers by the load balancer)
+#
+# The views read and write through crud/ and `database`, not SQLAlchemy
+# sessions, so the panel is a plain BaseAdmin without a SQLAlchemy engine.
+#
+# `python -m benchmarks.startup` compares import time and memory per mode.
+import logging
+import os
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# "lazy", "on" or "off", see above
+ADMIN_MODE = os.getenv("ADMIN_MODE", "lazy").lower()
+ADMIN_MODES = ("lazy", "on", "off")
+ADMIN_BASE_URL = "/admin"
+ADMIN_ROUTE_NAME = "admin"
+
+# response header set to "true" when an admin list page total is an estimate
+# (see views/sql_view.py; here so main.py doesn't have to import the views)
+ESTIMATED_COUNT_HEADER = "X-Total-Count-Estimated"
+
+
+# Import the views and build the panel (the slow part)
+def build_admin():
+    from starlette_admin import BaseAdmin
+
+    from views.authors_view import AuthorsView
+    from views.book_authors_view import BookAuthorsView
+    from views.books_view import BooksView
+    from views.copies_view import CopiesView
+    from views.fines_view import FinesView
+    from views.loans_view import LoansView
+    from views.members_view import MemberView
+    from views.publishers_view import PublishersView
+    from views.reservations_view import ReservationsView
+    from views.staff_views import StaffView
+
+    admin = BaseAdmin(title="Library Admin Panel", base_url=ADMIN_BASE_URL, route_name=ADMIN_ROUTE_NAME)
+    for view in (
+        AuthorsView, BookAuthorsView, BooksView, CopiesView, FinesView,
+        LoansView, MemberView, PublishersView, ReservationsView, StaffView,
+    ):
+        admin.add_view(view)
+    return admin
+
+
+# Stands in for the panel's Mount until the first /admin request, then swaps
+# the real Mount into the app's routes (url_for needs its child routes) and
+# hands that request over to it
+class LazyAdmin:
+    def __init__(self, app: Starlette):
+        self.app = app
+        self.panel = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.panel is None:
+            # no await until it's swapped in, so concurrent first requests
+            # can't build it twice
+            self.panel = self._swap_in()
+        await self.panel(scope, receive, send)
+
+    def _swap_in(self):
+        holder = Starlette()
+        build_admin().mount_to(holder)
+        mount = holder.routes[0]
+        routes = self.app.router.routes
+        for index, route in enumerate(routes):
+            if isinstance(route, Mount) and route.app is self:
+                routes[index] = mount
+        logger.info("Admin panel loaded")
+        return mount.app
+
+
+def mount_admin(app: Starlette) -> None:
+    if ADMIN_MODE not in ADMIN_MODES:
+        raise ValueError(f"ADMIN_MODE must be one of {', '.join(ADMIN_MODES)}, not {ADMIN_MODE!r}")
+    if ADMIN_MODE == "off":
+        return
+    if ADMIN_MODE == "on":
+        build_admin().mount_to(app)
+        return
+    app.mount(ADMIN_BASE_URL, app=LazyAdmin(app), name=ADMIN_ROUTE_NAME)
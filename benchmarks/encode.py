@@ -0,0 +1,81 @@
+# benchmarks/encode.py
+# CPU cost of turning one page of list rows into a JSON body: the validating
+# path (a model per row, validated again as the response_model, then
+# jsonable_encoder + json) against the fast path in responses.py (trusted()
+# models, one dumps()). No database needed; rows are built in memory.
+#
+#   python -m benchmarks.encode
+#   python -m benchmarks.encode --rows 1000 --repeat 200
+import argparse
+import json
+import time
+from datetime import date, timedelta
+from typing import Callable, List, Type
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+from responses import dumps, orjson, trusted
+from schemas.books import Books
+from schemas.loans import Loans
+
+
+def book_rows(n: int) -> List[dict]:
+    return [
+        {"ISBN": f"978{i:010d}", "Title": f"Title {i}", "Categories": "Fiction",
+         "PublishYear": 1950 + i % 75, "PublishName": f"Publisher {i % 50}"}
+        for i in range(n)
+    ]
+
+
+def loan_rows(n: int) -> List[dict]:
+    start = date(2025, 1, 1)
+    return [
+        {"LoanID": i, "ReturnDate": start + timedelta(days=i % 30) if i % 3 else None,
+         "DueDate": start + timedelta(days=i % 30 + 14), "ISBN": f"978{i % 5000:010d}",
+         "MemberID": i % 1000, "StaffID": i % 20, "CopyID": i}
+        for i in range(n)
+    ]
+
+
+# Before: model per row in crud/, response_model validation, jsonable_encoder, json
+def validating(model: Type[BaseModel], rows: List[dict]) -> bytes:
+    models = [model(**row) for row in rows]
+    checked = TypeAdapter(List[model]).validate_python(models, from_attributes=True)
+    return json.dumps(jsonable_encoder(checked), separators=(",", ":")).encode()
+
+
+# After: trusted() in crud/, fast_json() in the route
+def fast(model: Type[BaseModel], rows: List[dict]) -> bytes:
+    return dumps(trusted(model, rows))
+
+
+def best_ms(fn: Callable[[], bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Row-to-JSON cost of a list page, validating vs fast path")
+    parser.add_argument("--rows", type=int, default=1000, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=50, help="runs per case (the best one is reported)")
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}, {args.rows} rows per page")
+    header = f"{'page':<8}{'validating ms':>15}{'fast ms':>10}{'speed-up':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, model, rows in (("books", Books, book_rows(args.rows)), ("loans", Loans, loan_rows(args.rows))):
+        # both paths must produce the same JSON
+        assert json.loads(validating(model, rows)) == json.loads(fast(model, rows))
+        before = best_ms(lambda: validating(model, rows), args.repeat)
+        after = best_ms(lambda: fast(model, rows), args.repeat)
+        print(f"{name:<8}{before:>15.2f}{after:>10.2f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
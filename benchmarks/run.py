@@ -0,0 +1,203 @@
+# benchmarks/run.py
+# Drive the real app (main.app) through its hot endpoints with concurrent
+# clients and report latency percentiles, throughput and queries per request.
+#
+#   DATABASE_URL=sqlite+aiosqlite:///bench.db python -m benchmarks.run
+#   python -m benchmarks.run --concurrency 50 --requests 2000 --json before.json
+#   python -m benchmarks.run --compare before.json
+#
+# Seed the database first (benchmarks/seed.py). By default the app runs in
+# this process (httpx ASGI transport, no network), which is what makes the
+# query counts possible. With --url the requests go to a running server
+# instead and the query count column is left empty.
+#
+# Endpoints that use MySQL-only SQL (ON DUPLICATE KEY, FOR UPDATE,
+# GROUP_CONCAT ... SEPARATOR) are skipped on SQLite.
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from database import database, IS_MYSQL
+from benchmarks.seed import table_sizes, isbn
+
+
+class Endpoint:
+    def __init__(self, name: str, method: str, path: Callable[[random.Random], str],
+                 body: Optional[Callable[[random.Random], dict]] = None, mysql_only: bool = False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.mysql_only = mysql_only
+
+
+# ===================================================================
+# ENDPOINTS
+# ===================================================================
+# Paths pick random existing keys from the seeded sizes; creates use ids
+# above the seeded range so they never collide.
+def hot_endpoints(rows: int) -> List[Endpoint]:
+    n = table_sizes(rows)
+    # loan creates check out each copy once (one already on loan is a 409)
+    next_copy_id = itertools.count(1).__next__
+    new_member_id = itertools.count(n["Members"] + 1).__next__
+    return [
+        Endpoint("books available", "GET", lambda r: "/api/books/available?limit=50"),
+        Endpoint("books on loan", "GET", lambda r: "/api/books/on-loan?limit=50"),
+        Endpoint("catalog view", "GET", lambda r: "/api/catalog/view?limit=50", mysql_only=True),
+        Endpoint("book get", "GET", lambda r: f"/api/books/{isbn(r.randrange(n['Books']))}"),
+        Endpoint("loans list", "GET", lambda r: f"/api/loans/?limit=50&skip={r.randrange(max(1, n['Loans'] - 50))}"),
+        Endpoint("loan get", "GET", lambda r: f"/api/loans/{r.randint(1, n['Loans'])}"),
+        Endpoint("loan create", "POST", lambda r: "/api/loans/", mysql_only=True, body=lambda r: {
+            "MemberID": r.randint(1, n["Members"]),
+            "StaffID": r.randint(1, n["Staff"]), "CopyID": next_copy_id(),
+        }),
+        Endpoint("members list", "GET", lambda r: f"/api/members/?limit=50&skip={r.randrange(max(1, n['Members'] - 50))}"),
+        Endpoint("member get", "GET", lambda r: f"/api/members/{r.randint(1, n['Members'])}"),
+        Endpoint("member create", "POST", lambda r: "/api/members/", body=lambda r: {
+            "memberID": new_member_id(), "memName": "Bench Member", "Email": "bench@example.com",
+            "Phone": "555-0000000", "Address": "1 Bench Rd",
+        }),
+        Endpoint("admin books", "GET", lambda r: "/admin/api/books?skip=0&limit=20"),
+        Endpoint("admin loans", "GET", lambda r: "/admin/api/loans?skip=0&limit=20"),
+        Endpoint("admin members", "GET", lambda r: "/admin/api/members?skip=0&limit=20"),
+    ]
+
+
+# ===================================================================
+# LOAD
+# ===================================================================
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(p / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+# Run `requests` calls against one endpoint with `concurrency` clients
+async def run_endpoint(client: httpx.AsyncClient, endpoint: Endpoint, requests: int,
+                       concurrency: int, seed: int, count_queries: bool) -> dict:
+    rng = random.Random(seed)
+    plan = [(endpoint.path(rng), endpoint.body(rng) if endpoint.body else None) for _ in range(requests)]
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+
+    async def one(path: str, body: Optional[dict]) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        if count_queries:
+            with database.track_queries() as counter:
+                response = await client.request(endpoint.method, path, json=body)
+            queries.append(counter.count)
+        else:
+            response = await client.request(endpoint.method, path, json=body)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+
+    async def worker(jobs: asyncio.Queue) -> None:
+        while not jobs.empty():
+            await one(*jobs.get_nowait())
+
+    jobs: asyncio.Queue = asyncio.Queue()
+    for job in plan:
+        jobs.put_nowait(job)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(jobs) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "endpoint": endpoint.name,
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+async def run(args) -> List[dict]:
+    endpoints = [e for e in hot_endpoints(args.rows) if not args.only or e.name in args.only]
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        lifespan = None
+    else:
+        from main import app, lifespan as app_lifespan
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench", timeout=60)
+        lifespan = app_lifespan(app)
+        await lifespan.__aenter__()
+
+    results = []
+    try:
+        async with client:
+            for endpoint in endpoints:
+                if endpoint.mysql_only and not IS_MYSQL and not args.url:
+                    print(f"skipped {endpoint.name} (MySQL only)")
+                    continue
+                # warm up (pool, caches) before measuring
+                await run_endpoint(client, endpoint, min(args.requests, 20), args.concurrency, args.seed + 1, False)
+                results.append(await run_endpoint(
+                    client, endpoint, args.requests, args.concurrency, args.seed, count_queries=not args.url
+                ))
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    return results
+
+
+# ===================================================================
+# REPORT
+# ===================================================================
+
+def print_report(results: List[dict], baseline: Optional[Dict[str, dict]] = None) -> None:
+    header = f"{'endpoint':<16}{'reqs':>6}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+    if baseline:
+        header += f"{'p95 vs base':>13}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        queries = "" if r["queries_per_request"] is None else f"{r['queries_per_request']:.2f}"
+        line = (f"{r['endpoint']:<16}{r['requests']:>6}{r['errors']:>8}{r['rps']:>9.1f}"
+                f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{queries:>9}")
+        base = (baseline or {}).get(r["endpoint"])
+        if base and base["p95_ms"]:
+            line += f"{(r['p95_ms'] / base['p95_ms'] - 1) * 100:>+12.0f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load/latency benchmark of the library API")
+    parser.add_argument("--rows", type=int, default=10_000, help="the --rows the database was seeded with")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent clients")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="benchmark a running server instead of an in-process app")
+    parser.add_argument("--only", nargs="*", help="endpoint names to run (default: all)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--compare", help="results file of an earlier run to compare p95 against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {r["endpoint"]: r for r in json.load(f)["results"]}
+    print_report(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": args.rows, "concurrency": args.concurrency, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
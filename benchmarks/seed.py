@@ -0,0 +1,240 @@
+# benchmarks/seed.py
+# Build a benchmark database with the tables from libraryDB.sql and synthetic
+# rows, at a given scale (10k / 100k / 1M).
+#
+#   DATABASE_URL=sqlite+aiosqlite:///bench.db python -m benchmarks.seed --rows 100000
+#   DATABASE_URL=mysql+aiomysql://root:@localhost:3306/librarybench python -m benchmarks.seed --rows 1000000
+#
+# Uses the same DATABASE_URL as the app. EXISTING TABLES ARE DROPPED, so point
+# it at a scratch database, never the real one. For SQLite the MySQL DDL is
+# translated (inline indexes become CREATE INDEX, FULLTEXT is skipped,
+# AUTO_INCREMENT keys become INTEGER PRIMARY KEY) and the
+# foreign key columns get the indexes MySQL would create for them. The
+# migrations in migrations/ are applied on top, like on the real database.
+import argparse
+import asyncio
+import random
+import re
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from database import database, IS_MYSQL
+from crud.availability_crud import COUNT_COPIES, rebuild_availability
+from crud.search_crud import rebuild_search
+from migrations.runner import HISTORY_TABLE, migrate
+
+SCHEMA_FILE = "libraryDB.sql"
+
+# rows per INSERT statement
+INSERT_CHUNK = 500
+
+CATEGORIES = ["Fiction", "Fantasy", "Mystery", "Science", "History", "Biography", "Poetry", "Children"]
+WORDS = [
+    "shadow", "river", "garden", "winter", "empire", "secret", "silent", "house", "ocean",
+    "light", "stone", "night", "city", "forest", "letters", "storm", "mirror", "journey",
+]
+CONDITIONS = ["New", "Good", "Fair", "Worn"]
+POSITIONS = ["Librarian", "Assistant", "Clerk", "Manager"]
+
+
+# ===================================================================
+# SCHEMA
+# ===================================================================
+
+# (table name, CREATE TABLE statement) in file order, plus the CREATE INDEX lines
+def read_schema() -> Tuple[List[tuple], List[str]]:
+    sql = open(SCHEMA_FILE).read()
+    sql = "\n".join(line for line in sql.splitlines() if not line.lstrip().startswith("#"))
+    tables = re.findall(r"(CREATE TABLE (\w+) \(.*?\n\);)", sql, flags=re.S)
+    indexes = re.findall(r"CREATE INDEX .*?;", sql)
+    return [(name, statement) for statement, name in tables], indexes
+
+
+# MySQL CREATE TABLE -> SQLite CREATE TABLE + CREATE INDEX statements
+def to_sqlite(table: str, statement: str) -> List[str]:
+    lines = statement.splitlines()
+    indexes = []
+    kept = []
+    for line in lines:
+        match = re.match(r"\s*INDEX (\w+) \((.*?)\),?$", line)
+        if match:
+            indexes.append(f"CREATE INDEX {match.group(1)} ON {table} ({match.group(2)})")
+        elif "FULLTEXT" not in line:
+            kept.append(line)
+    create = re.sub(r",\s*\n\);$", "\n);", "\n".join(kept))
+    # SQLite numbers an INTEGER PRIMARY KEY by itself
+    create = create.replace("INT AUTO_INCREMENT PRIMARY KEY", "INTEGER PRIMARY KEY")
+    # MySQL indexes foreign key columns by itself, SQLite doesn't
+    for column in re.findall(r"FOREIGN KEY \((\w+)\)", create):
+        indexes.append(f"CREATE INDEX idx_{table.lower()}_{column.lower()} ON {table} ({column})")
+    return [create] + indexes
+
+
+async def create_schema() -> None:
+    tables, indexes = read_schema()
+    await database.execute(f"DROP TABLE IF EXISTS {HISTORY_TABLE}")
+    for name, _ in reversed(tables):
+        await database.execute(f"DROP TABLE IF EXISTS {name}")
+    for name, statement in tables:
+        if IS_MYSQL:
+            await database.execute(statement)
+        else:
+            for sql in to_sqlite(name, statement):
+                await database.execute(sql)
+    for sql in indexes:
+        await database.execute(sql)
+    for line in await migrate():
+        print(line)
+
+
+# ===================================================================
+# SYNTHETIC ROWS
+# ===================================================================
+
+def isbn(i: int) -> str:
+    return f"978{i:010d}"
+
+
+def title(rng: random.Random) -> str:
+    return " ".join(rng.sample(WORDS, rng.randint(2, 4))).title()
+
+
+# Table sizes for a scale; "rows" is the size of the biggest tables
+def table_sizes(rows: int) -> Dict[str, int]:
+    return {
+        "Publishers": max(10, rows // 1000),
+        "Authors": max(10, rows // 10),
+        "Books": rows,
+        "Copies": rows,
+        "Members": max(10, rows // 10),
+        "Staff": 20,
+        "Loans": rows // 2,
+        "Reservations": rows // 10,
+        "Fines": rows // 20,
+    }
+
+
+def generate(rows: int, seed: int) -> Iterator[tuple]:
+    rng = random.Random(seed)
+    n = table_sizes(rows)
+    today = date.today()
+
+    yield "Publishers", [
+        {"PublishName": f"Publisher {i}", "ContactInfo": f"contact@publisher{i}.example"}
+        for i in range(n["Publishers"])
+    ]
+    yield "Authors", [
+        {"AuthorName": f"Author {i}", "DOB": (date(1940, 1, 1) + timedelta(days=rng.randint(0, 20000))).isoformat(),
+         "Nationality": rng.choice(["American", "British", "Canadian", "Irish", "Nigerian", "Indian"])}
+        for i in range(n["Authors"])
+    ]
+    yield "Books", [
+        {"ISBN": isbn(i), "Title": title(rng), "Categories": rng.choice(CATEGORIES),
+         "PublishYear": rng.randint(1950, 2024), "PublishName": f"Publisher {rng.randrange(n['Publishers'])}"}
+        for i in range(n["Books"])
+    ]
+    # one author per book, every fourth book has a co-author
+    links = []
+    for i in range(n["Books"]):
+        authors = rng.sample(range(n["Authors"]), 2 if i % 4 == 0 else 1)
+        links.extend({"ISBN": isbn(i), "AuthorName": f"Author {a}"} for a in authors)
+    yield "BookAuthors", links
+    copy_rows = [
+        {"CopyID": i + 1, "ISBN": isbn(rng.randrange(n["Books"])),
+         "ShelfLocation": f"{rng.choice('ABCDEFGH')}{rng.randint(1, 40)}", "ConditionDesc": rng.choice(CONDITIONS)}
+        for i in range(n["Copies"])
+    ]
+    yield "Copies", copy_rows
+    yield "Members", [
+        {"MemberID": i + 1, "MemName": f"Member {i + 1}", "Email": f"member{i + 1}@example.com",
+         "Phone": f"555-{i + 1:07d}", "Address": f"{rng.randint(1, 9999)} Main St"}
+        for i in range(n["Members"])
+    ]
+    yield "Staff", [
+        {"StaffID": i + 1, "StaffName": f"Staff {i + 1}", "Position": rng.choice(POSITIONS), "WorkTime": rng.choice([20, 30, 40])}
+        for i in range(n["Staff"])
+    ]
+    # about a third of the loans are still open, each on a different copy;
+    # roughly one loan in five is (or was) brought back late
+    copies = list(range(1, n["Copies"] + 1))
+    rng.shuffle(copies)
+    loans = []
+    for i in range(n["Loans"]):
+        open_loan = i % 3 == 0
+        copy_id = copies[i] if open_loan else rng.randint(1, n["Copies"])
+        return_date = None if open_loan else today - timedelta(days=rng.randint(1, 900))
+        due_date = (return_date or today) + timedelta(days=rng.randint(-60, 14) if rng.random() < 0.2 else rng.randint(0, 14))
+        loans.append({
+            "LoanID": i + 1,
+            "ReturnDate": return_date.isoformat() if return_date else None,
+            "DueDate": due_date.isoformat(),
+            "ISBN": copy_rows[copy_id - 1]["ISBN"],
+            "MemberID": rng.randint(1, n["Members"]),
+            "StaffID": rng.randint(1, n["Staff"]),
+            "CopyID": copy_id,
+        })
+    yield "Loans", loans
+    yield "Reservations", [
+        {"ReservationID": i + 1, "DateFor": (today + timedelta(days=rng.randint(1, 60))).isoformat(),
+         "MemberID": rng.randint(1, n["Members"]), "BookReserved": isbn(rng.randrange(n["Books"]))}
+        for i in range(n["Reservations"])
+    ]
+    yield "Fines", [
+        {"FineID": i + 1, "AmountFined": rng.randint(1, 50), "DaysOverdue": rng.randint(1, 60), "LoanID": loan["LoanID"]}
+        for i, loan in enumerate(rng.sample(loans, n["Fines"]))
+    ]
+
+
+async def insert_rows(table: str, rows: List[dict]) -> None:
+    if not rows:
+        return
+    columns = list(rows[0])
+    async with database.transaction():
+        for start in range(0, len(rows), INSERT_CHUNK):
+            chunk = rows[start:start + INSERT_CHUNK]
+            tuples = []
+            values = {}
+            for i, row in enumerate(chunk):
+                tuples.append("(" + ", ".join(f":{c}_{i}" for c in columns) + ")")
+                values.update({f"{c}_{i}": row[c] for c in columns})
+            await database.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join(tuples)}", values=values
+            )
+
+
+# ===================================================================
+# MAIN
+# ===================================================================
+
+async def seed(rows: int, seed_value: int) -> None:
+    await database.connect()
+    try:
+        started = time.perf_counter()
+        await create_schema()
+        for table, table_rows in generate(rows, seed_value):
+            await insert_rows(table, table_rows)
+            print(f"{table:<13} {len(table_rows):>9} rows")
+
+        if IS_MYSQL:
+            await rebuild_availability()
+            await rebuild_search()
+        else:
+            await database.execute(
+                f"INSERT INTO BookAvailability (ISBN, TotalCopies, OnLoan) {COUNT_COPIES.format(filter='')}"
+            )
+        print(f"seeded in {time.perf_counter() - started:.1f}s")
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed a benchmark database (DROPS existing tables)")
+    parser.add_argument("--rows", type=int, default=10_000, help="size of the biggest tables (10000, 100000, 1000000)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed, same seed = same data")
+    args = parser.parse_args()
+    asyncio.run(seed(args.rows, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/startup.py
+# Worker boot cost per ADMIN_MODE (see admin_panel.py): how long `import main`
+# takes, how much memory the process holds after it and how many modules it
+# loaded, each measured in a fresh interpreter. Also how long the first
+# /admin request spends building the panel in lazy mode, and which packages
+# take the most import time (from python -X importtime). No database needed.
+#
+#   python -m benchmarks.startup
+#   python -m benchmarks.startup --repeat 5 --top 15
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+from typing import Dict, Tuple
+
+MODES = ("on", "lazy", "off")
+
+# Runs in the child interpreter; prints one JSON line
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter() - started
+build = None
+if {build!r}:
+    from admin_panel import build_admin
+    started = time.perf_counter()
+    build_admin()
+    build = time.perf_counter() - started
+try:
+    import resource
+    # kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+except ImportError:  # Windows
+    rss = None
+print(json.dumps({{"import_ms": imported * 1000, "build_ms": build and build * 1000,
+                  "rss_mb": rss, "modules": len(sys.modules)}}))
+"""
+
+
+# One fresh interpreter: (measurements, self import time in ms per top-level package)
+def measure(mode: str, build: bool = False) -> Tuple[dict, Dict[str, float]]:
+    env = {**os.environ, "ADMIN_MODE": mode}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD.format(build=build)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    packages: Counter = Counter()
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000
+    return json.loads(result.stdout.strip().splitlines()[-1]), packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import time and memory of a worker per ADMIN_MODE")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode (the fastest one is reported)")
+    parser.add_argument("--top", type=int, default=10, help="packages listed by import time")
+    args = parser.parse_args()
+
+    header = f"{'ADMIN_MODE':<12}{'import ms':>11}{'RSS MB':>9}{'modules':>9}"
+    print(header)
+    print("-" * len(header))
+    slowest: Dict[str, Counter] = {}
+    for mode in MODES:
+        runs = [measure(mode) for _ in range(args.repeat)]
+        best, packages = min(runs, key=lambda run: run[0]["import_ms"])
+        slowest[mode] = packages
+        rss = f"{best['rss_mb']:.1f}" if best["rss_mb"] is not None else "-"
+        print(f"{mode:<12}{best['import_ms']:>11.0f}{rss:>9}{best['modules']:>9}")
+
+    lazy, _ = measure("lazy", build=True)
+    print(f"\nfirst /admin request in lazy mode builds the panel: {lazy['build_ms']:.0f} ms (once per worker)")
+
+    print(f"\nslowest packages to import (ADMIN_MODE=on vs lazy, ms):")
+    for name, ms in slowest["on"].most_common(args.top):
+        print(f"  {name:<24}{ms:>8.1f}{slowest['lazy'].get(name, 0.0):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# cache.py
+# Small in-process cache for catalog reads (books, authors, publishers,
+# book-author links). Bounded size with LRU eviction, a TTL so entries can't
+# stay stale forever, and hit/miss counters.
+#
+# The CRUD write functions (create_*/update_*/delete_*) invalidate the
+# matching entries, so a worker always sees its own writes. Other workers
+# see changes and deletes once the TTL runs out, so keep CATALOG_CACHE_TTL
+# short. Lookups that found nothing are not cached: a row created through
+# another worker is seen right away, instead of a TTL of 404s.
+#
+# With read replicas (see database.py) only requests whose reads go to the
+# primary fill the caches: a lagging replica can return a row older than the
+# write that just invalidated it (or bumped the table version it would be
+# cached under), and a request pinned to the primary to read its own writes
+# would then get it back from the cache.
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+from database import read_database
+
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "10000"))
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))
+
+# returned by get() when the key is not cached (None is a valid cached value)
+MISSING = object()
+
+# every cache created, by name (used for stats / metrics)
+caches: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int = CATALOG_CACHE_SIZE, ttl: float = CATALOG_CACHE_TTL):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        caches[name] = self
+
+    # ===================================================================
+    # READ
+    # ===================================================================
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    # ===================================================================
+    # WRITE
+    # ===================================================================
+    # (skipped when the value may come from a replica, see above)
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0 or not read_database.on_primary():
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    # ===================================================================
+    # INVALIDATION
+    # ===================================================================
+    def invalidate(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    # ===================================================================
+    # STATS
+    # ===================================================================
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def cache_stats() -> list:
+    return [c.stats() for c in caches.values()]
+
+
+# ================================
+# CATALOG CACHES
+# ================================
+books_cache = TTLCache("books")                # ISBN -> Books
+authors_cache = TTLCache("authors")            # AuthorName -> dict
+publishers_cache = TTLCache("publishers")      # PublishName -> Publishers
+book_authors_cache = TTLCache("book_authors")  # ISBN -> [dict, ...]
+
+
+# ================================
+# TABLE VERSIONS
+# ================================
+# A counter per table, bumped by the CRUD write functions. Caches of whole
+# responses (see http_cache.py) put the versions of the tables they read in
+# their keys, so a write makes every response built from that table stale at
+# once, without having to know which entries it affected.
+table_versions: Dict[str, int] = {}
+
+
+def bump_version(*tables: str) -> None:
+    for table in tables:
+        table_versions[table] = table_versions.get(table, 0) + 1
+
+
+def table_version(table: str) -> int:
+    return table_versions.get(table, 0)
@@ -1,26 +1,39 @@
-from database import database
+from database import database, read_database
 from typing import List, Optional
+from crud.pagination import keyset_clause
+from crud.bulk import bulk_upsert
+from crud.search_crud import refresh_search, isbns_for_authors
+from cache import MISSING, authors_cache, book_authors_cache, bump_version
 
 
-# READ: Get all authors
-async def get_authors(skip: int = 0, limit: int = 10):
-    query = """
+# READ: Get all authors (offset or keyset cursor)
+async def get_authors(skip: int = 0, limit: int = 10, cursor: Optional[str] = None):
+    where_sql, order_sql, values = keyset_clause(["AuthorName"], cursor, skip)
+    query = f"""
         SELECT AuthorName, DOB, Nationality
         FROM Authors
+        {where_sql}
+        {order_sql}
         LIMIT :limit OFFSET :skip
     """
-    return await database.fetch_all(query=query, values={"limit": limit, "skip": skip})
+    return await read_database.fetch_all(query=query, values={**values, "limit": limit})
 
 
-# READ: Get one author by name
+# READ: Get one author by name (cached, but not "not found"; callers get
+# their own copy of the dict)
 async def get_author(author_name: str) -> Optional[dict]:
-    query = """
-        SELECT AuthorName, DOB, Nationality
-        FROM Authors
-        WHERE AuthorName = :author_name
-    """
-    row = await database.fetch_one(query=query, values={"author_name": author_name})
-    return dict(row) if row else None
+    author = authors_cache.get(author_name)
+    if author is MISSING:
+        query = """
+            SELECT AuthorName, DOB, Nationality
+            FROM Authors
+            WHERE AuthorName = :author_name
+        """
+        row = await read_database.fetch_one(query=query, values={"author_name": author_name})
+        author = dict(row) if row else None
+        if author is not None:
+            authors_cache.set(author_name, author)
+    return dict(author) if author else None
 
 
 # CREATE: Insert new author
@@ -39,11 +52,21 @@ async def create_author(author_name: str, dob: str, nationality: str) -> str:
                 "Nationality": nationality
             },
         )
+        authors_cache.invalidate(author_name)
+        bump_version("Authors")
         return author_name
     except Exception:
         raise ValueError(f"Author '{author_name}' already exists.")
 
 
+# CREATE/UPDATE many: authors as dicts with AuthorName, DOB, Nationality
+async def upsert_authors(authors: List[dict]) -> List[dict]:
+    results = await bulk_upsert("Authors", ["AuthorName", "DOB", "Nationality"], ["AuthorName"], authors)
+    authors_cache.invalidate(*(author["AuthorName"] for author in authors))
+    bump_version("Authors")
+    return results
+
+
 # UPDATE: Update author info
 async def update_author(author_name: str, dob: str, nationality: str) -> bool:
     query = """
@@ -62,15 +85,23 @@ async def update_author(author_name: str, dob: str, nationality: str) -> bool:
                 "Nationality": nationality
             },
         )
+        authors_cache.invalidate(author_name)
+        bump_version("Authors")
         return True
     except Exception as err:
         raise ValueError(f"Error updating author '{author_name}': {err}")
 
 
-# DELETE: Delete a single author
+# DELETE: Delete a single author (BookAuthors rows cascade)
 async def delete_author(author_name: str) -> int:
+    isbns = await isbns_for_authors([author_name])
     query = "DELETE FROM Authors WHERE AuthorName = :author_name"
-    return await database.execute(query=query, values={"author_name": author_name})
+    deleted = await database.execute(query=query, values={"author_name": author_name})
+    authors_cache.invalidate(author_name)
+    book_authors_cache.clear()
+    bump_version("Authors", "BookAuthors")
+    await refresh_search(isbns)
+    return deleted
 
 
 # DELETE many: List of names
@@ -78,8 +109,14 @@ async def delete_authors(author_names: List[str]) -> int:
     if not author_names:
         return 0
 
+    isbns = await isbns_for_authors(author_names)
     placeholders = ",".join(f":name{i}" for i in range(len(author_names)))
     query = f"DELETE FROM Authors WHERE AuthorName IN ({placeholders})"
     values = {f"name{i}": name for i, name in enumerate(author_names)}
 
-    return await database.execute(query=query, values=values)
+    deleted = await database.execute(query=query, values=values)
+    authors_cache.invalidate(*author_names)
+    book_authors_cache.clear()
+    bump_version("Authors", "BookAuthors")
+    await refresh_search(isbns)
+    return deleted
@@ -0,0 +1,151 @@
+# crud/availability_crud.py
+# Per-ISBN copy availability, kept in the BookAvailability summary table.
+#
+# Books/available and books/on-loan used to join Books -> Copies -> Loans with
+# DISTINCT on every request. Instead, every write to Copies or Loans calls
+# refresh_availability() for the ISBNs it touched, which recounts just those
+# titles, and the read endpoints become indexed lookups on this table.
+#
+# The recount runs in the write's own transaction (availability_transaction),
+# so the counts commit or roll back together with the loan/copy/hold change
+# and a failed recount can't leave them stale.
+from contextlib import asynccontextmanager
+from typing import Iterable, List, Optional
+
+from database import database, read_database
+from crud.lookups import in_clause
+from crud.pagination import keyset_clause
+from cache import bump_version
+from schemas.availability import BookAvailability
+from responses import trusted
+
+TABLE_NAME = "BookAvailability"
+
+# Copies per ISBN, and how many of them are out: on an open loan (ReturnDate
+# IS NULL) or held for a reservation (see crud/reservation_queue.py). The
+# EXISTS probes use the Loans.CopyID and Reservations.AssignedCopyID indexes,
+# so only the copies of the requested titles are read.
+COUNT_COPIES = """
+    SELECT c.ISBN,
+           COUNT(*) AS TotalCopies,
+           SUM(EXISTS (
+               SELECT 1 FROM Loans l
+               WHERE l.CopyID = c.CopyID AND l.ReturnDate IS NULL
+           ) OR EXISTS (
+               SELECT 1 FROM Reservations r
+               WHERE r.AssignedCopyID = c.CopyID
+           )) AS OnLoan
+    FROM Copies c
+    WHERE c.ISBN IS NOT NULL {filter}
+    GROUP BY c.ISBN
+"""
+
+
+# ===================================================================
+# MAINTENANCE
+# ===================================================================
+
+# Recount every title (one set-based statement)
+async def rebuild_availability() -> None:
+    async with database.transaction():
+        await database.execute(f"""
+            INSERT INTO {TABLE_NAME} (ISBN, TotalCopies, OnLoan)
+            {COUNT_COPIES.format(filter="")}
+            ON DUPLICATE KEY UPDATE TotalCopies = VALUES(TotalCopies), OnLoan = VALUES(OnLoan)
+        """)
+        await database.execute(f"""
+            DELETE FROM {TABLE_NAME}
+            WHERE NOT EXISTS (SELECT 1 FROM Copies c WHERE c.ISBN = {TABLE_NAME}.ISBN)
+        """)
+    bump_version(TABLE_NAME)
+
+
+# Transaction for a write to Copies, Loans or Reservations and its
+# refresh_availability() call; cached responses built from the counts are
+# invalidated once it has committed
+@asynccontextmanager
+async def availability_transaction():
+    async with database.transaction():
+        yield
+    bump_version(TABLE_NAME)
+
+
+# Recount the given titles after a write to Copies or Loans (call it inside
+# that write's availability_transaction)
+async def refresh_availability(isbns: Iterable[Optional[str]]) -> None:
+    isbns = sorted({isbn for isbn in isbns if isbn})
+    if not isbns:
+        return
+    placeholders, values = in_clause("isbn", isbns)
+    await database.execute(f"""
+        INSERT INTO {TABLE_NAME} (ISBN, TotalCopies, OnLoan)
+        {COUNT_COPIES.format(filter=f"AND c.ISBN IN ({placeholders})")}
+        ON DUPLICATE KEY UPDATE TotalCopies = VALUES(TotalCopies), OnLoan = VALUES(OnLoan)
+    """, values=values)
+    # titles whose last copy is gone
+    await database.execute(f"""
+        DELETE FROM {TABLE_NAME}
+        WHERE ISBN IN ({placeholders})
+          AND NOT EXISTS (SELECT 1 FROM Copies c WHERE c.ISBN = {TABLE_NAME}.ISBN)
+    """, values=values)
+
+
+# ISBNs of the given copies (to know which titles a loan/copy write touched)
+async def isbns_for_copies(copy_ids: Iterable[Optional[int]]) -> List[str]:
+    copy_ids = sorted({copy_id for copy_id in copy_ids if copy_id is not None})
+    if not copy_ids:
+        return []
+    placeholders, values = in_clause("copy", copy_ids)
+    rows = await database.fetch_all(
+        f"SELECT DISTINCT ISBN FROM Copies WHERE CopyID IN ({placeholders})", values=values
+    )
+    return [row["ISBN"] for row in rows]
+
+
+async def refresh_availability_for_copies(copy_ids: Iterable[Optional[int]]) -> None:
+    await refresh_availability(await isbns_for_copies(copy_ids))
+
+
+# ===================================================================
+# READS
+# ===================================================================
+
+# Copy counts per title, optionally only titles with a free copy / on loan
+async def get_availability(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[BookAvailability]:
+    where_sql, order_sql, values = keyset_clause(["a.ISBN"], cursor, skip, prefix="AND")
+    status_sql = {
+        "available": "AND a.IsAvailable = 1",
+        "on-loan": "AND a.IsOnLoan = 1",
+    }.get(status, "")
+    query = f"""
+        SELECT a.ISBN, b.Title, a.TotalCopies, a.OnLoan,
+               a.TotalCopies - a.OnLoan AS Available
+        FROM {TABLE_NAME} a
+        INNER JOIN Books b ON b.ISBN = a.ISBN
+        WHERE 1 = 1 {status_sql}
+        {where_sql}
+        {order_sql}
+        LIMIT :limit OFFSET :skip
+    """
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
+    return trusted(BookAvailability, rows)
+
+
+# Copy counts for one title (a title without copies has zero of everything)
+async def get_book_availability(isbn: str) -> Optional[BookAvailability]:
+    query = f"""
+        SELECT b.ISBN, b.Title,
+               COALESCE(a.TotalCopies, 0) AS TotalCopies,
+               COALESCE(a.OnLoan, 0) AS OnLoan,
+               COALESCE(a.TotalCopies - a.OnLoan, 0) AS Available
+        FROM Books b
+        LEFT JOIN {TABLE_NAME} a ON a.ISBN = b.ISBN
+        WHERE b.ISBN = :isbn
+    """
+    row = await read_database.fetch_one(query=query, values={"isbn": isbn})
+    return BookAvailability(**dict(row)) if row else None
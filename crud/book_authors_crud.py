@@ -1,28 +1,40 @@
-from database import database
+from database import database, read_database
 from typing import List, Optional
+from crud.pagination import keyset_clause
+from crud.bulk import bulk_upsert
+from crud.search_crud import refresh_search, isbns_for_authors
+from cache import MISSING, book_authors_cache, bump_version
 
 
 # FOR THE UPDATE FUNCTION:
 # In many to many relationship, you have you just delete the row and
 # then insert a new row to replace it, so for this file there is NO update function.
 
-# READ many: Get multiple book authors
-async def get_book_authors(skip: int = 0, limit: int = 10):
-    query = """
+# READ many: Get multiple book authors (offset or keyset cursor on the composite PK)
+async def get_book_authors(skip: int = 0, limit: int = 10, cursor: Optional[str] = None):
+    where_sql, order_sql, values = keyset_clause(["ISBN", "AuthorName"], cursor, skip)
+    query = f"""
         SELECT ISBN, AuthorName
         FROM BookAuthors
+        {where_sql}
+        {order_sql}
         LIMIT :limit OFFSET :skip
     """
-    return await database.fetch_all(query=query, values={"limit": limit, "skip": skip})
+    return await read_database.fetch_all(query=query, values={**values, "limit": limit})
 
-# READ one: Get single book author by ISBN and AuthorName
+# READ one: Get single book author by ISBN and AuthorName (cached per ISBN,
+# but not a book without authors: they are usually linked right after)
 async def get_authors_by_book(isbn: str):
-    query = """
-        SELECT ISBN, AuthorName
-        FROM BookAuthors
-        WHERE ISBN = :isbn
-    """
-    rows = await database.fetch_all(query=query, values={"isbn": isbn})
+    rows = book_authors_cache.get(isbn)
+    if rows is MISSING:
+        query = """
+            SELECT ISBN, AuthorName
+            FROM BookAuthors
+            WHERE ISBN = :isbn
+        """
+        rows = [dict(r) for r in await read_database.fetch_all(query=query, values={"isbn": isbn})]
+        if rows:
+            book_authors_cache.set(isbn, rows)
     return [dict(r) for r in rows]
 
 # READ: all books for one author
@@ -32,7 +44,7 @@ async def get_books_by_author(author_name: str):
         FROM BookAuthors
         WHERE AuthorName = :author_name
     """
-    rows = await database.fetch_all(query=query, values={"author_name": author_name})
+    rows = await read_database.fetch_all(query=query, values={"author_name": author_name})
     return [dict(r) for r in rows]
 
 # CREATE: Insert a new book-author relationship
@@ -47,12 +59,23 @@ async def create_book_author(isbn: str, author_name: str):
             query=query,
             values={"ISBN": isbn, "AuthorName": author_name},
         )
+        book_authors_cache.invalidate(isbn)
+        bump_version("BookAuthors")
+        await refresh_search([isbn])
         return {"ISBN": isbn, "AuthorName": author_name}
     except Exception as err:
         raise ValueError(
             f"Relationship (ISBN={isbn}, Author={author_name}) already exists or FK error: {err}"
         )
 
+# CREATE many: links as dicts with ISBN, AuthorName (existing links are kept)
+async def upsert_book_authors(links: List[dict]) -> List[dict]:
+    results = await bulk_upsert("BookAuthors", ["ISBN", "AuthorName"], ["ISBN", "AuthorName"], links)
+    book_authors_cache.invalidate(*{link["ISBN"] for link in links})
+    bump_version("BookAuthors")
+    await refresh_search(link["ISBN"] for link in links)
+    return results
+
 # NO UPDATE FUNCTION
 
 # DELETE: a relationship (just one pair)
@@ -61,17 +84,31 @@ async def delete_book_author(isbn: str, author_name: str) -> int:
         DELETE FROM BookAuthors
         WHERE ISBN = :ISBN AND AuthorName = :AuthorName
     """
-    return await database.execute(
+    deleted = await database.execute(
         query=query,
         values={"ISBN": isbn, "AuthorName": author_name},
     )
+    book_authors_cache.invalidate(isbn)
+    bump_version("BookAuthors")
+    await refresh_search([isbn])
+    return deleted
 
 # DELETE: all authors for a book
 async def delete_authors_by_book(isbn: str) -> int:
     query = "DELETE FROM BookAuthors WHERE ISBN = :ISBN"
-    return await database.execute(query=query, values={"ISBN": isbn})
+    deleted = await database.execute(query=query, values={"ISBN": isbn})
+    book_authors_cache.invalidate(isbn)
+    bump_version("BookAuthors")
+    await refresh_search([isbn])
+    return deleted
 
 # DELETE: all books for an author
 async def delete_books_by_author(author_name: str) -> int:
+    isbns = await isbns_for_authors([author_name])
     query = "DELETE FROM BookAuthors WHERE AuthorName = :AuthorName"
-    return await database.execute(query=query, values={"AuthorName": author_name})
\ No newline at end of file
+    deleted = await database.execute(query=query, values={"AuthorName": author_name})
+    # the ISBNs touched are unknown here, drop every cached list
+    book_authors_cache.clear()
+    bump_version("BookAuthors")
+    await refresh_search(isbns)
+    return deleted
\ No newline at end of file
@@ -3,7 +3,12 @@ from typing import List, Optional
 from databases import Database
 from fastapi import HTTPException
 from schemas.books import Books
-from database import database  # your Database instance
+from database import database, read_database  # your Database instance
+from crud.pagination import keyset_clause
+from crud.bulk import bulk_upsert
+from crud.search_crud import refresh_search
+from cache import MISSING, books_cache, book_authors_cache, bump_version
+from responses import trusted
 
 TABLE_NAME = "Books"
 
@@ -13,30 +18,39 @@ async def ensure_connection():
         await database.connect()
 
 
-# Fetch all books with optional pagination
-async def get_books(skip: int = 0, limit: int = 100) -> List[Books]:
+# Fetch all books with optional pagination (offset or keyset cursor)
+async def get_books(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Books]:
     await ensure_connection()
+    where_sql, order_sql, values = keyset_clause(["ISBN"], cursor, skip)
     query = f"""
         SELECT ISBN, Title, Categories, PublishYear, PublishName
         FROM {TABLE_NAME}
+        {where_sql}
+        {order_sql}
         LIMIT :limit OFFSET :skip
     """
-    rows = await database.fetch_all(query=query, values={"skip": skip, "limit": limit})
-    return [Books(**dict(row)) for row in rows]
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
+    return trusted(Books, rows)
 
 
-# Fetch a single book by ISBN
+# Fetch a single book by ISBN (cached; "not found" is not, so a book just
+# created through another worker process is found right away)
 async def get_book(isbn: str) -> Optional[Books]:
+    cached = books_cache.get(isbn)
+    if cached is not MISSING:
+        return cached
     await ensure_connection()
     query = f"""
         SELECT ISBN, Title, Categories, PublishYear, PublishName
         FROM {TABLE_NAME}
         WHERE ISBN = :isbn
     """
-    row = await database.fetch_one(query=query, values={"isbn": isbn})
-    if row:
-        return Books(**dict(row))
-    return None
+    row = await read_database.fetch_one(query=query, values={"isbn": isbn})
+    if row is None:
+        return None
+    book = Books(**dict(row))
+    books_cache.set(isbn, book)
+    return book
 
 
 # Create a new book
@@ -47,9 +61,27 @@ async def create_book(book: Books) -> Books:
         VALUES (:ISBN, :Title, :Categories, :PublishYear, :PublishName)
     """
     await database.execute(query=query, values=book.dict())
+    books_cache.invalidate(book.ISBN)
+    bump_version("Books")
+    await refresh_search([book.ISBN])
     return book
 
 
+# Insert or update many books in chunks (one transaction)
+async def upsert_books(books: List[Books]) -> List[dict]:
+    await ensure_connection()
+    results = await bulk_upsert(
+        TABLE_NAME,
+        ["ISBN", "Title", "Categories", "PublishYear", "PublishName"],
+        ["ISBN"],
+        [book.dict() for book in books],
+    )
+    books_cache.invalidate(*(book.ISBN for book in books))
+    bump_version("Books")
+    await refresh_search(book.ISBN for book in books)
+    return results
+
+
 # Update an existing book
 async def update_book(book: Books) -> Optional[Books]:
     await ensure_connection()
@@ -62,39 +94,51 @@ async def update_book(book: Books) -> Optional[Books]:
         WHERE ISBN = :ISBN
     """
     await database.execute(query=query, values=book.dict())
+    books_cache.invalidate(book.ISBN)
+    bump_version("Books")
+    await refresh_search([book.ISBN])
     return book
 
 
-# Delete a book by ISBN
+# Delete a book by ISBN (BookAuthors/BookSearch rows cascade)
 async def delete_book(isbn: str) -> None:
     await ensure_connection()
     query = f"DELETE FROM {TABLE_NAME} WHERE ISBN = :isbn"
     await database.execute(query=query, values={"isbn": isbn})
+    books_cache.invalidate(isbn)
+    book_authors_cache.invalidate(isbn)
+    bump_version("Books", "BookAuthors")
 
-async def get_books_available_for_loan(skip: int = 0, limit: int = 100) -> List[Books]:
+# Books with at least one copy not on loan
+# (indexed lookup on the BookAvailability summary, see crud/availability_crud.py)
+async def get_books_available_for_loan(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Books]:
     await ensure_connection()
-    query = """
-        SELECT DISTINCT b.ISBN, b.Title, b.Categories, b.PublishYear, b.PublishName
-        FROM Books b
-        INNER JOIN Copies c ON b.ISBN = c.ISBN
-        LEFT JOIN Loans l ON c.CopyID = l.CopyID AND l.ReturnDate IS NULL
-        WHERE l.LoanID IS NULL
+    where_sql, order_sql, values = keyset_clause(["a.ISBN"], cursor, skip, prefix="AND")
+    query = f"""
+        SELECT b.ISBN, b.Title, b.Categories, b.PublishYear, b.PublishName
+        FROM BookAvailability a
+        INNER JOIN Books b ON b.ISBN = a.ISBN
+        WHERE a.IsAvailable = 1
+        {where_sql}
+        {order_sql}
         LIMIT :limit OFFSET :skip
     """
-    rows = await database.fetch_all(query=query, values={"skip": skip, "limit": limit})
-    return [Books(**dict(row)) for row in rows]
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
+    return trusted(Books, rows)
 
 
 # Books currently on loan (need to reserve)
-async def get_books_on_loan(skip: int = 0, limit: int = 100) -> List[Books]:
+async def get_books_on_loan(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Books]:
     await ensure_connection()
-    query = """
-        SELECT DISTINCT b.ISBN, b.Title, b.Categories, b.PublishYear, b.PublishName
-        FROM Books b
-        INNER JOIN Copies c ON b.ISBN = c.ISBN
-        INNER JOIN Loans l ON c.CopyID = l.CopyID
-        WHERE l.ReturnDate IS NULL
+    where_sql, order_sql, values = keyset_clause(["a.ISBN"], cursor, skip, prefix="AND")
+    query = f"""
+        SELECT b.ISBN, b.Title, b.Categories, b.PublishYear, b.PublishName
+        FROM BookAvailability a
+        INNER JOIN Books b ON b.ISBN = a.ISBN
+        WHERE a.IsOnLoan = 1
+        {where_sql}
+        {order_sql}
         LIMIT :limit OFFSET :skip
     """
-    rows = await database.fetch_all(query=query, values={"skip": skip, "limit": limit})
-    return [Books(**dict(row)) for row in rows]
\ No newline at end of file
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
+    return trusted(Books, rows)
\ No newline at end of file
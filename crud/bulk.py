@@ -0,0 +1,137 @@
+# crud/bulk.py
+# Chunked multi-row "INSERT ... ON DUPLICATE KEY UPDATE" used by the
+# /bulk ingestion endpoints. All chunks run in ONE transaction, so a feed is
+# either loaded completely or not at all.
+#
+# A bad row (unknown foreign key, value too long or out of range, failed
+# CHECK constraint...) rolls the load back and raises BulkLoadError, which
+# the routes turn into a 400; the driver's message stays in the log.
+# Anything else (connection lost, a failed search refresh after the commit)
+# is a server error, not the feed's.
+import logging
+import os
+import sqlite3
+from typing import Any, Dict, List, Sequence
+
+import pymysql
+
+from database import database
+
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
+# errors caused by the rows themselves (aiomysql raises pymysql's, the
+# benchmarks' SQLite database sqlite3's)
+BAD_ROW_ERRORS = (
+    pymysql.err.IntegrityError,
+    pymysql.err.DataError,
+    sqlite3.IntegrityError,
+    sqlite3.DataError,
+)
+
+# MySQL error numbers caused by the rows themselves, whatever class pymysql
+# raises them as (a failed CHECK constraint comes as an OperationalError)
+BAD_ROW_ERRNOS = {
+    1048,  # column cannot be null
+    1062,  # duplicate entry for a unique key
+    1216, 1217, 1451, 1452,  # foreign key: missing parent / row still referenced
+    1264,  # value out of range for the column
+    1265,  # data truncated
+    1292,  # incorrect date/time value
+    1366,  # incorrect value for the column's type
+    1406,  # data too long for the column
+    3819,  # check constraint violated
+}
+
+
+def is_bad_row(err: Exception) -> bool:
+    if isinstance(err, BAD_ROW_ERRORS):
+        return True
+    return isinstance(err, pymysql.err.MySQLError) and bool(err.args) and err.args[0] in BAD_ROW_ERRNOS
+
+
+class BulkLoadError(ValueError):
+    pass
+
+
+def chunked(rows: Sequence[Any], size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield start, rows[start:start + size]
+
+
+def _key(row: dict, key_columns: Sequence[str]) -> tuple:
+    return tuple(row[column] for column in key_columns)
+
+
+# Keys (as tuples) of the rows in this chunk that already exist
+async def _existing_keys(table: str, key_columns: Sequence[str], rows: Sequence[dict]) -> set:
+    values: Dict[str, Any] = {}
+    tuples = []
+    for i, row in enumerate(rows):
+        names = []
+        for column in key_columns:
+            values[f"k{i}_{column}"] = row[column]
+            names.append(f":k{i}_{column}")
+        tuples.append("(" + ", ".join(names) + ")" if len(key_columns) > 1 else names[0])
+    target = "(" + ", ".join(key_columns) + ")" if len(key_columns) > 1 else key_columns[0]
+    query = f"SELECT {', '.join(key_columns)} FROM {table} WHERE {target} IN ({', '.join(tuples)})"
+    found = await database.fetch_all(query=query, values=values)
+    return {tuple(row[column] for column in key_columns) for row in found}
+
+
+# Insert or update rows in chunks. Returns one result per input row, in order:
+# {"index": i, "key": "...", "status": "created" | "updated"}
+async def bulk_upsert(
+    table: str,
+    columns: Sequence[str],
+    key_columns: Sequence[str],
+    rows: Sequence[dict],
+) -> List[dict]:
+    update_columns = [c for c in columns if c not in key_columns]
+    if update_columns:
+        on_duplicate = ", ".join(f"{c} = VALUES({c})" for c in update_columns)
+    else:
+        # link tables: nothing to update, keep the existing row
+        on_duplicate = f"{key_columns[0]} = {key_columns[0]}"
+
+    results: List[dict] = []
+    seen = set()
+    try:
+        async with database.transaction():
+            for start, chunk in chunked(rows):
+                existing = await _existing_keys(table, key_columns, chunk)
+
+                values: Dict[str, Any] = {}
+                tuples = []
+                for i, row in enumerate(chunk):
+                    tuples.append("(" + ", ".join(f":{c}_{i}" for c in columns) + ")")
+                    values.update({f"{c}_{i}": row.get(c) for c in columns})
+                query = f"""
+                    INSERT INTO {table} ({', '.join(columns)})
+                    VALUES {', '.join(tuples)}
+                    ON DUPLICATE KEY UPDATE {on_duplicate}
+                """
+                await database.execute(query=query, values=values)
+
+                for i, row in enumerate(chunk):
+                    key = _key(row, key_columns)
+                    status = "updated" if key in existing or key in seen else "created"
+                    seen.add(key)
+                    results.append({
+                        "index": start + i,
+                        "key": "/".join(str(part) for part in key),
+                        "status": status,
+                    })
+    except (pymysql.err.MySQLError, sqlite3.Error) as err:
+        if not is_bad_row(err):
+            raise
+        logger.warning("Bulk load into %s rolled back: %s", table, err)
+        raise BulkLoadError("Bulk load failed, nothing was saved: a row is invalid or references a missing record") from err
+    return results
+
+
+# Totals + per-row results in the shape of schemas.bulk.BulkResult
+def bulk_summary(results: List[dict]) -> dict:
+    created = sum(1 for r in results if r["status"] == "created")
+    return {"created": created, "updated": len(results) - created, "results": results}
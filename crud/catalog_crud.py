@@ -0,0 +1,50 @@
+# crud/catalog_crud.py
+# Read-only catalog view for the member pages: each book with its authors,
+# publisher contact and copy counts, from ONE joined statement per page
+# instead of a books call plus per-book author/availability calls.
+from typing import List, Optional
+
+from database import read_database
+from crud.pagination import keyset_clause
+from schemas.catalog import CatalogBook
+from responses import trusted
+
+# Authors come from a correlated subquery on the BookAuthors primary key, so
+# only the books on the requested page are aggregated. Copy counts come from
+# the BookAvailability summary (see crud/availability_crud.py).
+CATALOG_QUERY = """
+    SELECT b.ISBN, b.Title, b.Categories, b.PublishYear, b.PublishName,
+           p.ContactInfo AS PublisherContact,
+           (SELECT GROUP_CONCAT(ba.AuthorName ORDER BY ba.AuthorName SEPARATOR ', ')
+            FROM BookAuthors ba
+            WHERE ba.ISBN = b.ISBN) AS Authors,
+           COALESCE(a.TotalCopies, 0) AS TotalCopies,
+           COALESCE(a.OnLoan, 0) AS OnLoan,
+           COALESCE(a.TotalCopies - a.OnLoan, 0) AS Available
+    FROM Books b
+    LEFT JOIN Publishers p ON p.PublishName = b.PublishName
+    LEFT JOIN BookAvailability a ON a.ISBN = b.ISBN
+    WHERE 1 = 1 {status}
+    {where}
+    {order}
+    LIMIT :limit OFFSET :skip
+"""
+
+CATALOG_STATUS = {
+    None: "",
+    "available": "AND a.IsAvailable = 1",
+    "on-loan": "AND a.IsOnLoan = 1",
+}
+
+
+# One page of the catalog (status = available | on-loan to filter)
+async def get_catalog_view(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[CatalogBook]:
+    where_sql, order_sql, values = keyset_clause(["b.ISBN"], cursor, skip, prefix="AND")
+    query = CATALOG_QUERY.format(status=CATALOG_STATUS[status], where=where_sql, order=order_sql)
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
+    return trusted(CatalogBook, rows)
@@ -1,13 +1,19 @@
-from database import database
+from database import database, read_database
+from crud.pagination import keyset_clause
+from crud.availability_crud import availability_transaction, refresh_availability, isbns_for_copies
+from crud.bulk import bulk_upsert
 
-# READ multiple
-async def get_copies(skip: int = 0, limit: int = 10):
-    query = """
+# READ multiple (offset or keyset cursor)
+async def get_copies(skip: int = 0, limit: int = 10, cursor: str | None = None):
+    where_sql, order_sql, values = keyset_clause(["CopyID"], cursor, skip)
+    query = f"""
     SELECT CopyID, ISBN, ShelfLocation, ConditionDesc
     FROM Copies
+    {where_sql}
+    {order_sql}
     LIMIT :limit OFFSET :skip
     """
-    return await database.fetch_all(query=query, values={"limit": limit, "skip": skip})
+    return await read_database.fetch_all(query=query, values={**values, "limit": limit})
 
 # READ single
 async def get_copy(CopyID: int):
@@ -16,7 +22,7 @@ async def get_copy(CopyID: int):
     FROM Copies
     WHERE CopyID = :CopyID
     """
-    row = await database.fetch_one(query=query, values={"CopyID": CopyID})
+    row = await read_database.fetch_one(query=query, values={"CopyID": CopyID})
     return dict(row) if row else None
 
 # CREATE
@@ -25,16 +31,28 @@ async def create_copy(CopyID: int, ISBN: str, ShelfLocation: str | None = None,
     INSERT INTO Copies (CopyID, ISBN, ShelfLocation, ConditionDesc)
     VALUES (:CopyID, :ISBN, :ShelfLocation, :ConditionDesc)
     """
-    try:
-        await database.execute(query=query, values={
-            "CopyID": CopyID,
-            "ISBN": ISBN,
-            "ShelfLocation": ShelfLocation,
-            "ConditionDesc": ConditionDesc
-        })
-        return CopyID
-    except Exception:
-        raise ValueError(f"Copy with ID {CopyID} already exists.")
+    async with availability_transaction():
+        try:
+            await database.execute(query=query, values={
+                "CopyID": CopyID,
+                "ISBN": ISBN,
+                "ShelfLocation": ShelfLocation,
+                "ConditionDesc": ConditionDesc
+            })
+        except Exception:
+            raise ValueError(f"Copy with ID {CopyID} already exists.")
+        await refresh_availability([ISBN])
+    return CopyID
+
+# CREATE/UPDATE many: copies as dicts with CopyID, ISBN, ShelfLocation, ConditionDesc
+async def upsert_copies(copies: list[dict]):
+    async with availability_transaction():
+        old_isbns = await isbns_for_copies(copy["CopyID"] for copy in copies)
+        results = await bulk_upsert(
+            "Copies", ["CopyID", "ISBN", "ShelfLocation", "ConditionDesc"], ["CopyID"], copies
+        )
+        await refresh_availability(old_isbns + [copy["ISBN"] for copy in copies])
+    return results
 
 # UPDATE
 async def update_copy(CopyID: int, ISBN: str, ShelfLocation: str | None = None, ConditionDesc: str | None = None):
@@ -43,18 +61,25 @@ async def update_copy(CopyID: int, ISBN: str, ShelfLocation: str | None = None,
     SET ISBN = :ISBN, ShelfLocation = :ShelfLocation, ConditionDesc = :ConditionDesc
     WHERE CopyID = :CopyID
     """
-    await database.execute(query=query, values={
-        "CopyID": CopyID,
-        "ISBN": ISBN,
-        "ShelfLocation": ShelfLocation,
-        "ConditionDesc": ConditionDesc
-    })
+    async with availability_transaction():
+        old_isbns = await isbns_for_copies([CopyID])
+        await database.execute(query=query, values={
+            "CopyID": CopyID,
+            "ISBN": ISBN,
+            "ShelfLocation": ShelfLocation,
+            "ConditionDesc": ConditionDesc
+        })
+        await refresh_availability(old_isbns + [ISBN])
     return True
 
 # DELETE one
 async def delete_copy(CopyID: int):
     query = "DELETE FROM Copies WHERE CopyID = :CopyID"
-    return await database.execute(query=query, values={"CopyID": CopyID})
+    async with availability_transaction():
+        old_isbns = await isbns_for_copies([CopyID])
+        deleted = await database.execute(query=query, values={"CopyID": CopyID})
+        await refresh_availability(old_isbns)
+    return deleted
 
 # DELETE many
 async def delete_copies(CopyIDs: list[int]):
@@ -63,4 +88,8 @@ async def delete_copies(CopyIDs: list[int]):
     placeholders = ', '.join([f":id{i}" for i in range(len(CopyIDs))])
     query = f"DELETE FROM Copies WHERE CopyID IN ({placeholders})"
     values = {f"id{i}": CopyIDs[i] for i in range(len(CopyIDs))}
-    return await database.execute(query=query, values=values)
+    async with availability_transaction():
+        old_isbns = await isbns_for_copies(CopyIDs)
+        deleted = await database.execute(query=query, values=values)
+        await refresh_availability(old_isbns)
+    return deleted
@@ -0,0 +1,94 @@
+# crud/export_crud.py
+# Streaming NDJSON / CSV export of whole tables.
+#
+# Rows are read in primary-key batches (keyset pagination, see
+# crud/pagination.py) and written to the client as each batch arrives, so
+# memory stays at one batch whatever the table size. Each batch is its own
+# short query, so a slow download never pins a pooled connection or holds
+# a long-running read open on MySQL.
+import csv
+import io
+import json
+import os
+from typing import AsyncIterator, List
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from database import read_database
+from crud.pagination import keyset_clause, next_cursor
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# resource -> (table, columns, primary key columns)
+EXPORT_TABLES = {
+    "authors": ("Authors", ["AuthorName", "DOB", "Nationality"], ["AuthorName"]),
+    "book-authors": ("BookAuthors", ["ISBN", "AuthorName"], ["ISBN", "AuthorName"]),
+    "books": ("Books", ["ISBN", "Title", "Categories", "PublishYear", "PublishName"], ["ISBN"]),
+    "copies": ("Copies", ["CopyID", "ISBN", "ShelfLocation", "ConditionDesc"], ["CopyID"]),
+    "fines": ("Fines", ["FineID", "AmountFined", "DaysOverdue", "LoanID"], ["FineID"]),
+    "loans": ("Loans", ["LoanID", "ReturnDate", "DueDate", "ISBN", "MemberID", "StaffID", "CopyID"], ["LoanID"]),
+    "members": ("Members", ["memberID", "memName", "Email", "Phone", "Address"], ["memberID"]),
+    "publishers": ("Publishers", ["PublishName", "ContactInfo"], ["PublishName"]),
+    "reservations": ("Reservations", ["ReservationID", "memberID", "DateFor", "BookReserved", "AssignedCopyID"], ["ReservationID"]),
+    "staff": ("Staff", ["StaffID", "StaffName", "Position", "WorkTime"], ["StaffID"]),
+}
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+# Yield the table one batch (list of dicts) at a time, in primary key order
+async def iter_batches(resource: str, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    table, columns, key_columns = EXPORT_TABLES[resource]
+    cursor = None
+    while True:
+        where_sql, order_sql, values = keyset_clause(key_columns, cursor)
+        query = f"""
+            SELECT {', '.join(columns)}
+            FROM {table}
+            {where_sql}
+            {order_sql}
+            LIMIT :limit
+        """
+        values.pop("skip")
+        rows = [dict(row) for row in await read_database.fetch_all(query=query, values={**values, "limit": batch_size})]
+        if rows:
+            yield rows
+        cursor = next_cursor(rows, key_columns, batch_size)
+        if not cursor:
+            break
+
+
+async def _ndjson(resource: str) -> AsyncIterator[bytes]:
+    async for rows in iter_batches(resource):
+        yield "".join(json.dumps(row, default=str) + "\n" for row in rows).encode()
+
+
+async def _csv(resource: str) -> AsyncIterator[bytes]:
+    _, columns, _ = EXPORT_TABLES[resource]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in iter_batches(resource):
+        writer.writerows([row[column] for column in columns] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # header only when the table is empty
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+# Streaming response for GET /api/<resource>/export?format=ndjson|csv
+def export_response(resource: str, format: str) -> StreamingResponse:
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    body = _ndjson(resource) if format == "ndjson" else _csv(resource)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{format}"'},
+    )
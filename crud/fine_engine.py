@@ -0,0 +1,232 @@
+# crud/fine_engine.py
+# Overdue fines, computed from Loans instead of typed in by hand.
+#
+# A loan is overdue once it is past its DueDate plus FINE_GRACE_DAYS: an open
+# loan keeps growing until today, a returned one stops at its ReturnDate. The
+# amount comes from FINE_RATE_SCHEDULE and the Fines row is upserted on its
+# LoanID (UNIQUE), so running the engine twice changes nothing.
+#
+# The work is done in set-based statements over LoanID ranges of
+# FINE_BATCH_SIZE loans (one INSERT ... SELECT ... ON DUPLICATE KEY UPDATE per
+# range, each in its own short transaction); no rows travel to Python.
+#
+#   python -m crud.fine_engine                      # nightly run (cron)
+#   python -m crud.fine_engine --today 2025-11-01   # as of another day
+#
+# or POST /api/fines/compute (runs it as a background job, see jobs.py), or
+# set FINE_ENGINE_INTERVAL_HOURS to let the app run it by itself (one worker
+# process per interval, see BACKGROUND RUNS below).
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from database import database, IS_MYSQL
+from jobs import TABLE_NAME as JOBS_TABLE, submit
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = "Fines"
+
+# "first overdue day:amount per day" tiers, e.g. 1 a day for the first two
+# weeks, then 2 a day, then 3 a day from day 31
+FINE_RATE_SCHEDULE = os.getenv("FINE_RATE_SCHEDULE", "1:1,15:2,31:3")
+# days after the due date that are not charged (nor counted in DaysOverdue)
+FINE_GRACE_DAYS = int(os.getenv("FINE_GRACE_DAYS", "0"))
+# most a single loan can be fined (0 = no limit)
+FINE_MAX_AMOUNT = int(os.getenv("FINE_MAX_AMOUNT", "100"))
+# loans per statement
+FINE_BATCH_SIZE = int(os.getenv("FINE_BATCH_SIZE", "50000"))
+# the app runs the engine this often (0 = never, use the CLI/cron instead)
+FINE_ENGINE_INTERVAL_HOURS = float(os.getenv("FINE_ENGINE_INTERVAL_HOURS", "0"))
+
+# Ensure database connection
+async def ensure_connection():
+    if not database.is_connected:
+        await database.connect()
+
+
+# ===================================================================
+# RATE SCHEDULE
+# ===================================================================
+
+# "1:1,15:2,31:3" -> [(1, 1.0), (15, 2.0), (31, 3.0)]
+def parse_schedule(schedule: str) -> List[Tuple[int, float]]:
+    tiers = []
+    for part in schedule.split(","):
+        if not part.strip():
+            continue
+        try:
+            start, rate = part.split(":")
+            tiers.append((int(start), float(rate)))
+        except ValueError:
+            raise ValueError(f"Bad FINE_RATE_SCHEDULE entry {part!r}, expected 'day:rate'")
+    tiers.sort()
+    if not tiers or tiers[0][0] != 1:
+        raise ValueError("FINE_RATE_SCHEDULE must start at day 1")
+    return tiers
+
+
+# SQL expression for the fine of `days` overdue days: each tier charges its
+# rate for the days that fall inside it, capped at FINE_MAX_AMOUNT
+def amount_sql(days: str, tiers: List[Tuple[int, float]], max_amount: int = FINE_MAX_AMOUNT) -> str:
+    parts = []
+    for i, (start, rate) in enumerate(tiers):
+        last_day = f"LEAST({days}, {tiers[i + 1][0] - 1})" if i + 1 < len(tiers) else days
+        parts.append(f"{rate} * GREATEST(0, {last_day} - {start - 1})")
+    amount = f"ROUND({' + '.join(parts)})"
+    return f"LEAST({max_amount}, {amount})" if max_amount else amount
+
+
+# ===================================================================
+# ENGINE
+# ===================================================================
+
+# One statement per LoanID range. New fines get FineIDs after the current
+# MAX(FineID) (read with a locking read);
+# existing fines keep theirs and are only written when the amount changed.
+def upsert_sql(tiers: List[Tuple[int, float]]) -> str:
+    return f"""
+        INSERT INTO {TABLE_NAME} (FineID, AmountFined, DaysOverdue, LoanID)
+        SELECT COALESCE(o.FineID, :base_id + ROW_NUMBER() OVER (PARTITION BY o.FineID IS NULL ORDER BY o.LoanID)),
+               o.AmountFined, o.DaysOverdue, o.LoanID
+        FROM (
+            SELECT d.LoanID, d.DaysOverdue, d.FineID, d.OldAmount, d.OldDays,
+                   {amount_sql("d.DaysOverdue", tiers)} AS AmountFined
+            FROM (
+                SELECT l.LoanID, f.FineID, f.AmountFined AS OldAmount, f.DaysOverdue AS OldDays,
+                       DATEDIFF(COALESCE(l.ReturnDate, :today), l.DueDate) - :grace AS DaysOverdue
+                FROM Loans l
+                LEFT JOIN {TABLE_NAME} f ON f.LoanID = l.LoanID
+                WHERE l.LoanID > :after AND l.LoanID <= :upto
+                  AND l.DueDate < :today
+            ) d
+            WHERE d.DaysOverdue > 0
+        ) o
+        WHERE o.FineID IS NULL OR o.OldAmount <> o.AmountFined OR o.OldDays <> o.DaysOverdue
+        ON DUPLICATE KEY UPDATE AmountFined = VALUES(AmountFined), DaysOverdue = VALUES(DaysOverdue)
+    """
+
+
+# Fine every overdue loan as of `today`; returns what was done. `progress`
+# (e.g. a background job's) is awaited with (batches done, batches) after each batch
+async def compute_fines(
+    today: Optional[date] = None, batch_size: int = FINE_BATCH_SIZE,
+    progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> dict:
+    await ensure_connection()
+    today = today or date.today()
+    tiers = parse_schedule(FINE_RATE_SCHEDULE)
+    query = upsert_sql(tiers)
+    started = time.perf_counter()
+
+    bounds = await database.fetch_one("SELECT MIN(LoanID) AS low, MAX(LoanID) AS high FROM Loans")
+    batches = 0
+    changed = 0
+    if bounds["low"] is not None:
+        after = bounds["low"] - 1
+        total = -(-(bounds["high"] - after) // batch_size)
+        while after < bounds["high"]:
+            upto = after + batch_size
+            async with database.transaction():
+                base_id = await database.fetch_val(f"SELECT COALESCE(MAX(FineID), 0) FROM {TABLE_NAME} FOR UPDATE")
+                await database.execute(query=query, values={
+                    "base_id": base_id, "today": today.isoformat(), "grace": FINE_GRACE_DAYS,
+                    "after": after, "upto": upto,
+                })
+                # 1 per new fine, 2 per updated fine (MySQL's upsert count)
+                changed += await database.fetch_val("SELECT ROW_COUNT()")
+            batches += 1
+            after = upto
+            if progress is not None:
+                await progress(batches, total)
+
+    summary = {
+        "today": today.isoformat(),
+        "batches": batches,
+        "rows_changed": changed,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    logger.info("fine engine: %s", summary)
+    return summary
+
+
+# ===================================================================
+# BACKGROUND RUNS
+# ===================================================================
+# POST /api/fines/compute and the schedule below run the engine as a
+# background job (see jobs.py), so runs show up in GET /api/jobs.
+#
+# Every worker process runs the schedule (lifespan in main.py), but only one
+# of them submits each run: under a named lock (GET_LOCK, like the migration
+# runner) a worker first looks in the Jobs table for a run submitted in the
+# last half interval, by any process, and skips if there is one. Without the
+# lock the workers would each run the engine and queue up behind each other
+# on the MAX(FineID) locking read, doing the same work N times.
+JOB_KIND = "compute fines"
+SCHEDULE_LOCK_NAME = "library_fine_engine"
+
+
+# Job body: fine every overdue loan as of `today`, progress per batch
+async def fines_job(job, today: Optional[date] = None) -> dict:
+    return await compute_fines(today, progress=job.progress)
+
+
+# Submit a run unless one was submitted in the last half interval (or another
+# process is deciding right now); True if this one submitted it
+async def submit_scheduled_run(interval_hours: float = FINE_ENGINE_INTERVAL_HOURS) -> bool:
+    since = datetime.now() - timedelta(hours=interval_hours / 2)
+    async with database.connection() as connection:
+        if IS_MYSQL:
+            locked = await connection.fetch_val("SELECT GET_LOCK(:name, 0)", values={"name": SCHEDULE_LOCK_NAME})
+            if locked != 1:
+                return False
+        try:
+            recent = await connection.fetch_val(
+                f"SELECT COUNT(*) FROM {JOBS_TABLE} WHERE Kind = :kind AND CreatedAt > :since",
+                values={"kind": JOB_KIND, "since": since},
+            )
+            if recent:
+                return False
+            await submit(JOB_KIND, fines_job)
+            return True
+        finally:
+            if IS_MYSQL:
+                await connection.fetch_val("SELECT RELEASE_LOCK(:name)", values={"name": SCHEDULE_LOCK_NAME})
+
+
+# Submit a run every FINE_ENGINE_INTERVAL_HOURS until cancelled
+async def run_periodically(interval_hours: float = FINE_ENGINE_INTERVAL_HOURS) -> None:
+    while True:
+        try:
+            await submit_scheduled_run(interval_hours)
+        except Exception:
+            logger.exception("fine engine run not submitted")
+        await asyncio.sleep(interval_hours * 3600)
+
+
+# ===================================================================
+# CLI
+# ===================================================================
+
+async def run_once(today: Optional[date], batch_size: int) -> dict:
+    await database.connect()
+    try:
+        return await compute_fines(today, batch_size)
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compute overdue fines from Loans")
+    parser.add_argument("--today", type=date.fromisoformat, help="compute as of this day (YYYY-MM-DD, default today)")
+    parser.add_argument("--batch-size", type=int, default=FINE_BATCH_SIZE, help="loans per statement")
+    args = parser.parse_args()
+    print(asyncio.run(run_once(args.today, args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
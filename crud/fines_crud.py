@@ -1,9 +1,11 @@
 # crud/fines_crud.py
-from typing import List
+from typing import List, Optional
 from databases import Database
 from fastapi import HTTPException
 from schemas.fines import Fines
-from database import database  # your database.py file
+from database import database, read_database  # your database.py file
+from crud.pagination import keyset_clause
+from responses import trusted
 
 TABLE_NAME = "Fines"
 
@@ -13,19 +15,20 @@ async def ensure_connection():
         await database.connect()
 
 
-# Get all fines with optional pagination
-async def get_fines(skip: int = 0, limit: int = 100) -> List[Fines]:
+# Get all fines with optional pagination (offset or keyset cursor)
+async def get_fines(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Fines]:
     await ensure_connection()
-    query = f"SELECT * FROM {TABLE_NAME} LIMIT :limit OFFSET :skip"
-    rows = await database.fetch_all(query=query, values={"skip": skip, "limit": limit})
-    return [Fines(**row) for row in rows]
+    where_sql, order_sql, values = keyset_clause(["FineID"], cursor, skip)
+    query = f"SELECT * FROM {TABLE_NAME} {where_sql} {order_sql} LIMIT :limit OFFSET :skip"
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
+    return trusted(Fines, rows)
 
 
 # Get a single fine by FineID
 async def get_fine(fine_id: int) -> Fines:
     await ensure_connection()
     query = f"SELECT * FROM {TABLE_NAME} WHERE FineID = :fine_id"
-    row = await database.fetch_one(query=query, values={"fine_id": fine_id})
+    row = await read_database.fetch_one(query=query, values={"fine_id": fine_id})
     if row:
         return Fines(**row)
     raise HTTPException(status_code=404, detail="Fine not found")
@@ -1,89 +1,254 @@
 # crud/loans_crud.py
+import os
 from typing import List, Optional
-from datetime import date
+from datetime import date, timedelta
 from databases import Database
-from schemas.loans import Loans
-from database import database
+from fastapi import HTTPException
+from schemas.loans import Loans, LoanReturned
+from database import database, read_database
+from crud.pagination import keyset_clause
+from crud.lookups import in_clause
+from crud.availability_crud import availability_transaction, refresh_availability, refresh_availability_for_copies
+from crud.reservation_queue import assign_copy, reservation_queues
+from responses import trusted
 
 TABLE_NAME = "Loans"
 
+# days a copy may be kept; sets DueDate when a loan is created without one
+LOAN_PERIOD_DAYS = int(os.getenv("LOAN_PERIOD_DAYS", "14"))
+
 # Ensure database connection
 async def ensure_connection():
     if not database.is_connected:
         await database.connect()
 
 
-# Fetch all loans with optional pagination
-async def get_loans(skip: int = 0, limit: int = 100) -> List[Loans]:
+# Fetch all loans with optional pagination (offset or keyset cursor)
+async def get_loans(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Loans]:
     await ensure_connection()
+    where_sql, order_sql, values = keyset_clause(["LoanID"], cursor, skip)
     query = f"""
-        SELECT LoanID, ReturnDate, ISBN, MemberID, StaffID, CopyID
+        SELECT LoanID, ReturnDate, DueDate, ISBN, MemberID, StaffID, CopyID
         FROM {TABLE_NAME}
+        {where_sql}
+        {order_sql}
         LIMIT :limit OFFSET :skip
     """
-    rows = await database.fetch_all(query=query, values={"skip": skip, "limit": limit})
-    loans = []
-    for row in rows:
-        loan_data = dict(row)
-        if loan_data.get("ReturnDate"):
-            loan_data["ReturnDate"] = loan_data["ReturnDate"].isoformat()
-        loans.append(Loans(**loan_data))
-    return loans
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
+    return trusted(Loans, rows)
 
 
 # Fetch a single loan by LoanID
 async def get_loan(loan_id: int) -> Optional[Loans]:
     await ensure_connection()
     query = f"""
-        SELECT LoanID, ReturnDate, ISBN, MemberID, StaffID, CopyID
+        SELECT LoanID, ReturnDate, DueDate, ISBN, MemberID, StaffID, CopyID
         FROM {TABLE_NAME}
         WHERE LoanID = :loan_id
     """
-    row = await database.fetch_one(query=query, values={"loan_id": loan_id})
+    row = await read_database.fetch_one(query=query, values={"loan_id": loan_id})
     if row:
-        loan_data = dict(row)
-        if loan_data.get("ReturnDate"):
-            loan_data["ReturnDate"] = loan_data["ReturnDate"].isoformat()
-        return Loans(**loan_data)
+        return Loans.model_construct(**dict(row))
     return None
 
 
-# Create a new loan
+# Create a new loan: lends loan.CopyID to loan.MemberID through the
+# checkout desk below (409 if the copy is on loan or held for someone else).
+# The database assigns the LoanID and the ISBN comes from the copy.
 async def create_loan(loan: Loans) -> Loans:
-    await ensure_connection()
-    query = f"""
-        INSERT INTO {TABLE_NAME} (LoanID, ReturnDate, ISBN, MemberID, StaffID, CopyID)
-        VALUES (:LoanID, :ReturnDate, :ISBN, :MemberID, :StaffID, :CopyID)
-    """
-    values = loan.dict()
-    # Convert date to string if present
-    if values.get("ReturnDate") and isinstance(values["ReturnDate"], date):
-        values["ReturnDate"] = values["ReturnDate"].isoformat()
-    await database.execute(query=query, values=values)
-    return loan
+    if loan.MemberID is None or loan.CopyID is None:
+        raise HTTPException(status_code=400, detail="MemberID and CopyID are required")
+    if loan.ReturnDate is not None:
+        raise HTTPException(status_code=400, detail="A new loan is open; close it with POST /api/loans/return")
+    (created,) = await checkout_copies(loan.MemberID, loan.StaffID, [loan.CopyID], loan.DueDate)
+    return created
+
+
+# Copy currently referenced by a loan (before it is changed or deleted)
+async def _loan_copy_id(loan_id: int) -> Optional[int]:
+    return await database.fetch_val(
+        f"SELECT CopyID FROM {TABLE_NAME} WHERE LoanID = :loan_id", values={"loan_id": loan_id}
+    )
 
 
-# Update an existing loan
+# Update an existing loan: its DueDate, MemberID and StaffID. Its copy and
+# ReturnDate only change at the desk below, which locks the copy and keeps
+# its loans, holds and reservation queue straight (409 if they differ from
+# the loan's); its ISBN is the copy's.
 async def update_loan(loan: Loans) -> Loans:
     await ensure_connection()
     query = f"""
-        UPDATE {TABLE_NAME}
-        SET ReturnDate = :ReturnDate,
-            ISBN = :ISBN,
-            MemberID = :MemberID,
-            StaffID = :StaffID,
-            CopyID = :CopyID
-        WHERE LoanID = :LoanID
+        SELECT LoanID, ReturnDate, DueDate, ISBN, MemberID, StaffID, CopyID
+        FROM {TABLE_NAME}
+        WHERE LoanID = :loan_id
     """
-    values = loan.dict()
-    if values.get("ReturnDate") and isinstance(values["ReturnDate"], date):
-        values["ReturnDate"] = values["ReturnDate"].isoformat()
-    await database.execute(query=query, values=values)
-    return loan
+    async with database.transaction():
+        row = await database.fetch_one(f"{query} FOR UPDATE", values={"loan_id": loan.LoanID})
+        if row is None:
+            raise HTTPException(status_code=404, detail="Loan not found")
+        current = Loans(**dict(row))
+        if loan.CopyID != current.CopyID:
+            raise HTTPException(
+                status_code=409,
+                detail="A loan's copy can't change: return it with POST /api/loans/return and check out the other copy",
+            )
+        if loan.ReturnDate != current.ReturnDate:
+            raise HTTPException(
+                status_code=409,
+                detail="Return copies with POST /api/loans/return; a returned loan can't be reopened",
+            )
+        await _check_people(loan.MemberID, loan.StaffID)
+        await database.execute(f"""
+            UPDATE {TABLE_NAME}
+            SET DueDate = COALESCE(:DueDate, DueDate),
+                MemberID = :MemberID,
+                StaffID = :StaffID
+            WHERE LoanID = :LoanID
+        """, values={
+            "DueDate": loan.DueDate.isoformat() if loan.DueDate else None,
+            "MemberID": loan.MemberID, "StaffID": loan.StaffID, "LoanID": loan.LoanID,
+        })
+        row = await database.fetch_one(query, values={"loan_id": loan.LoanID})
+    return Loans(**dict(row))
 
 
 # Delete a loan by LoanID
 async def delete_loan(loan_id: int) -> None:
     await ensure_connection()
     query = f"DELETE FROM {TABLE_NAME} WHERE LoanID = :loan_id"
-    await database.execute(query=query, values={"loan_id": loan_id})
+    async with availability_transaction():
+        old_copy_id = await _loan_copy_id(loan_id)
+        await database.execute(query=query, values={"loan_id": loan_id})
+        await refresh_availability_for_copies([old_copy_id])
+
+
+# ===================================================================
+# CHECKOUT / RETURN DESK
+# ===================================================================
+# A batch of scanned copies is handled in ONE transaction: the Copies rows
+# (and their open loans and holds) are locked first, so two desks can't lend
+# the same copy, then every loan is inserted/closed with a single statement.
+# A returned copy someone has reserved is held for them (see
+# crud/reservation_queue.py) and only they can check it out.
+
+# Lock the copies, their open loan and their hold, if any (sorted so that
+# concurrent batches always lock in the same order and can't deadlock)
+async def _lock_copies(copy_ids: List[int]) -> dict:
+    placeholders, values = in_clause("copy", sorted(copy_ids))
+    query = f"""
+        SELECT c.CopyID, c.ISBN, l.LoanID, r.ReservationID AS HoldID, r.MemberID AS HoldMemberID
+        FROM Copies c
+        LEFT JOIN {TABLE_NAME} l ON l.CopyID = c.CopyID AND l.ReturnDate IS NULL
+        LEFT JOIN Reservations r ON r.AssignedCopyID = c.CopyID
+        WHERE c.CopyID IN ({placeholders})
+        ORDER BY c.CopyID
+        FOR UPDATE
+    """
+    rows = await database.fetch_all(query=query, values=values)
+    copies = {row["CopyID"]: dict(row) for row in rows}
+    missing = [copy_id for copy_id in copy_ids if copy_id not in copies]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Copies not found: {missing}")
+    return copies
+
+
+# 404 unless the member (and the staff member, if given) exist, read with a
+# shared lock so they can't be deleted before the loan that names them is written
+async def _check_people(member_id: Optional[int], staff_id: Optional[int]) -> None:
+    for table, key, value in (("Members", "MemberID", member_id), ("Staff", "StaffID", staff_id)):
+        if value is None:
+            continue
+        found = await database.fetch_val(
+            f"SELECT {key} FROM {table} WHERE {key} = :id FOR SHARE", values={"id": value}
+        )
+        if found is None:
+            raise HTTPException(status_code=404, detail=f"{key} {value} not found")
+
+
+# Lend every copy to the member, all or nothing (409 if any is on loan or
+# held for someone else). Holds for this member are fulfilled.
+async def checkout_copies(
+    member_id: int, staff_id: Optional[int], copy_ids: List[int], due_date: Optional[date] = None
+) -> List[Loans]:
+    await ensure_connection()
+    copy_ids = list(dict.fromkeys(copy_ids))
+    async with availability_transaction():
+        copies = await _lock_copies(copy_ids)
+        on_loan = [copy_id for copy_id in copy_ids if copies[copy_id]["LoanID"] is not None]
+        if on_loan:
+            raise HTTPException(status_code=409, detail=f"Copies already on loan: {on_loan}")
+        held = [copy_id for copy_id in copy_ids if copies[copy_id]["HoldMemberID"] not in (None, member_id)]
+        if held:
+            raise HTTPException(status_code=409, detail=f"Copies on hold for another member: {held}")
+        await _check_people(member_id, staff_id)
+
+        due_date = due_date or date.today() + timedelta(days=LOAN_PERIOD_DAYS)
+        values = {}
+        tuples = []
+        for i, copy_id in enumerate(copy_ids):
+            tuples.append(f"(NULL, :DueDate, :ISBN{i}, :MemberID, :StaffID, :CopyID{i})")
+            values.update({f"ISBN{i}": copies[copy_id]["ISBN"], f"CopyID{i}": copy_id})
+        # LoanID is AUTO_INCREMENT, so concurrent checkouts don't wait on each other for ids
+        query = f"""
+            INSERT INTO {TABLE_NAME} (ReturnDate, DueDate, ISBN, MemberID, StaffID, CopyID)
+            VALUES {', '.join(tuples)}
+        """
+        await database.execute(query=query, values={
+            **values, "DueDate": due_date.isoformat(), "MemberID": member_id, "StaffID": staff_id,
+        })
+        # the copies are locked, so their open loans are the ones just inserted
+        placeholders, values = in_clause("copy", copy_ids)
+        rows = await database.fetch_all(f"""
+            SELECT LoanID, ReturnDate, DueDate, ISBN, MemberID, StaffID, CopyID
+            FROM {TABLE_NAME}
+            WHERE CopyID IN ({placeholders}) AND ReturnDate IS NULL
+        """, values=values)
+        by_copy = {row["CopyID"]: row for row in rows}
+        loans = [Loans(**dict(by_copy[copy_id])) for copy_id in copy_ids]
+        fulfilled = [copies[copy_id]["HoldID"] for copy_id in copy_ids if copies[copy_id]["HoldID"] is not None]
+        if fulfilled:
+            placeholders, values = in_clause("reservation", fulfilled)
+            await database.execute(f"DELETE FROM Reservations WHERE ReservationID IN ({placeholders})", values=values)
+        await refresh_availability(copy["ISBN"] for copy in copies.values())
+    return loans
+
+
+# Close the open loan of every copy, all or nothing (409 if any isn't on
+# loan), and hold each copy for the next reservation of its title
+async def return_copies(copy_ids: List[int], return_date: Optional[date] = None) -> List[LoanReturned]:
+    await ensure_connection()
+    copy_ids = list(dict.fromkeys(copy_ids))
+    return_date = return_date or date.today()
+    queued_isbns = []
+    try:
+        async with availability_transaction():
+            copies = await _lock_copies(copy_ids)
+            not_on_loan = [copy_id for copy_id in copy_ids if copies[copy_id]["LoanID"] is None]
+            if not_on_loan:
+                raise HTTPException(status_code=409, detail=f"Copies not on loan: {not_on_loan}")
+
+            placeholders, values = in_clause("loan", [copies[copy_id]["LoanID"] for copy_id in copy_ids])
+            query = f"""
+                UPDATE {TABLE_NAME}
+                SET ReturnDate = :return_date
+                WHERE LoanID IN ({placeholders})
+            """
+            await database.execute(query=query, values={**values, "return_date": return_date.isoformat()})
+            query = f"""
+                SELECT LoanID, ReturnDate, DueDate, ISBN, MemberID, StaffID, CopyID
+                FROM {TABLE_NAME}
+                WHERE LoanID IN ({placeholders})
+                ORDER BY LoanID
+            """
+            rows = await database.fetch_all(query=query, values=values)
+            holds = {}
+            for copy_id in sorted(copy_ids):
+                isbn = copies[copy_id]["ISBN"]
+                if isbn:
+                    queued_isbns.append(isbn)
+                    holds[copy_id] = await assign_copy(isbn, copy_id)
+            await refresh_availability(copy["ISBN"] for copy in copies.values())
+    finally:
+        # the queues shown by GET /reservations/queue lost their assigned heads
+        reservation_queues.invalidate(queued_isbns)
+    return [LoanReturned(**dict(row), HeldFor=holds.get(row["CopyID"])) for row in rows]
@@ -0,0 +1,44 @@
+# crud/lookups.py
+# Batched lookups: resolve a column of foreign keys for a whole page of rows
+# with ONE "WHERE key IN (...)" query per table, instead of one query per row.
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from database import read_database
+
+
+# Build ":name0, :name1, ..." placeholders and their values for an IN (...) list
+def in_clause(name: str, values: Iterable[Any]) -> Tuple[str, dict]:
+    values = list(values)
+    placeholders = ", ".join(f":{name}{i}" for i in range(len(values)))
+    return placeholders, {f"{name}{i}": value for i, value in enumerate(values)}
+
+
+# Fetch {key: {alias: value}} for every key in one query
+# columns maps the alias to return -> column in the table
+async def fetch_lookup(
+    table: str, key_column: str, columns: Dict[str, str], keys: Iterable[Any]
+) -> Dict[Any, dict]:
+    keys = list(dict.fromkeys(k for k in keys if k is not None))
+    if not keys:
+        return {}
+    placeholders, values = in_clause("k", keys)
+    select = ", ".join(f"{column} AS {alias}" for alias, column in columns.items())
+    query = f"""
+        SELECT {key_column} AS lookup_key, {select}
+        FROM {table}
+        WHERE {key_column} IN ({placeholders})
+    """
+    rows = await read_database.fetch_all(query=query, values=values)
+    return {row["lookup_key"]: {alias: row[alias] for alias in columns} for row in rows}
+
+
+# Add the looked-up columns to each row dict in place (None when not found)
+async def attach_lookups(
+    rows: Sequence[dict], key: str, table: str, key_column: str, columns: Dict[str, str]
+) -> List[dict]:
+    found = await fetch_lookup(table, key_column, columns, (row.get(key) for row in rows))
+    for row in rows:
+        match = found.get(row.get(key), {})
+        for alias in columns:
+            row[alias] = match.get(alias)
+    return list(rows)
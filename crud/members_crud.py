@@ -1,7 +1,9 @@
 from typing import List, Optional
 from fastapi import HTTPException
 from schemas.members import Members
-from database import database  # Your Database instance
+from database import database, read_database  # Your Database instance
+from crud.pagination import keyset_clause
+from responses import trusted
 
 TABLE_NAME = "Members"
 
@@ -11,27 +13,30 @@ async def ensure_connection():
         await database.connect()
 
 
-# Fetch all members with optional pagination
-async def get_members(skip: int = 0, limit: int = 100) -> List[Members]:
+# Fetch all members with optional pagination (offset or keyset cursor)
+async def get_members(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Members]:
     await ensure_connection()
+    where_sql, order_sql, values = keyset_clause(["memberID"], cursor, skip)
     query = f"""
-        SELECT memberID, memName, Email, Phone, Address
+        SELECT MemberID AS memberID, MemName AS memName, Email, Phone, Address
         FROM {TABLE_NAME}
+        {where_sql}
+        {order_sql}
         LIMIT :limit OFFSET :skip
     """
-    rows = await database.fetch_all(query=query, values={"skip": skip, "limit": limit})
-    return [Members(**dict(row)) for row in rows]
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
+    return trusted(Members, rows)
 
 
 # Fetch a single member by memberID
 async def get_member(memberID: int) -> Members:
     await ensure_connection()
     query = f"""
-        SELECT memberID, memName, Email, Phone, Address
+        SELECT MemberID AS memberID, MemName AS memName, Email, Phone, Address
         FROM {TABLE_NAME}
         WHERE memberID = :memberID
     """
-    row = await database.fetch_one(query=query, values={"memberID": memberID})
+    row = await read_database.fetch_one(query=query, values={"memberID": memberID})
     if row:
         return Members(**dict(row))
     raise HTTPException(status_code=404, detail="Member not found")
@@ -0,0 +1,86 @@
+# crud/pagination.py
+# Keyset (cursor) pagination shared by every list query.
+#
+# Instead of "LIMIT :limit OFFSET :skip" (MySQL reads and throws away every
+# skipped row) a cursor remembers the primary key of the last row sent, and
+# the next page seeks straight to it: "WHERE pk > :after ORDER BY pk".
+# Every page then costs the same as the first one.
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# Turn the key values of the last row into an opaque string
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+# Read a cursor back into key values
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+# Build the seek condition and ORDER BY for a page.
+# columns: the key columns as written in the query (e.g. "b.ISBN")
+# prefix:  "WHERE" or "AND" depending on whether the query already filters
+# Returns (condition_sql, order_sql, values). With no cursor the page falls
+# back to OFFSET :skip so old clients keep working, still in key order.
+def keyset_clause(
+    columns: Sequence[str],
+    cursor: Optional[str],
+    skip: int = 0,
+    prefix: str = "WHERE",
+) -> Tuple[str, str, dict]:
+    order_sql = "ORDER BY " + ", ".join(columns)
+    if not cursor:
+        return "", order_sql, {"skip": skip}
+
+    after = decode_cursor(cursor, len(columns))
+    values = {f"after{i}": value for i, value in enumerate(after)}
+
+    # (a > :a0) OR (a = :a0 AND b > :a1) ... works on any MySQL version and
+    # lets the primary key index do the seek
+    branches = []
+    for i, column in enumerate(columns):
+        parts = [f"{columns[j]} = :after{j}" for j in range(i)]
+        parts.append(f"{column} > :after{i}")
+        branches.append("(" + " AND ".join(parts) + ")")
+    condition = branches[0] if len(branches) == 1 else "(" + " OR ".join(branches) + ")"
+
+    values["skip"] = 0
+    return f"{prefix} {condition}", order_sql, values
+
+
+def _key_value(row: Any, key: str) -> Any:
+    if isinstance(row, dict):
+        return row[key]
+    if hasattr(row, "_mapping"):
+        return row._mapping[key]
+    return getattr(row, key)
+
+
+# Cursor pointing after the last row, or None when this was the last page
+def next_cursor(rows: Sequence[Any], keys: Sequence[str], limit: int) -> Optional[str]:
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor([_key_value(last, key.split(".")[-1]) for key in keys])
+
+
+# Put the next cursor on the response so list bodies stay plain JSON arrays
+def set_next_cursor(response: Response, rows: Sequence[Any], keys: Sequence[str], limit: int) -> None:
+    cursor = next_cursor(rows, keys, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
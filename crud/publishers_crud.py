@@ -1,9 +1,13 @@
 # crud/publishers_crud.py
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException
 from databases import Database
 from schemas.publishers import Publishers
-from database import database  # your database.py file
+from database import database, read_database  # your database.py file
+from crud.pagination import keyset_clause
+from crud.search_crud import refresh_search, isbns_for_publishers
+from cache import MISSING, publishers_cache, books_cache, bump_version
+from responses import trusted
 
 TABLE_NAME = "Publishers"
 
@@ -12,20 +16,26 @@ async def ensure_connection():
     if not database.is_connected:
         await database.connect()
 
-# Get all publishers with optional pagination
-async def get_publishers(skip: int = 0, limit: int = 100) -> List[Publishers]:
+# Get all publishers with optional pagination (offset or keyset cursor)
+async def get_publishers(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Publishers]:
     await ensure_connection()
-    query = f"SELECT PublishName, ContactInfo FROM {TABLE_NAME} LIMIT :limit OFFSET :skip"
-    rows = await database.fetch_all(query=query, values={"skip": skip, "limit": limit})
-    return [Publishers(**row) for row in rows]
+    where_sql, order_sql, values = keyset_clause(["PublishName"], cursor, skip)
+    query = f"SELECT PublishName, ContactInfo FROM {TABLE_NAME} {where_sql} {order_sql} LIMIT :limit OFFSET :skip"
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
+    return trusted(Publishers, rows)
 
-# Get a single publisher by name
+# Get a single publisher by name (cached, but not "not found")
 async def get_publisher(name: str) -> Publishers:
-    await ensure_connection()
-    query = f"SELECT PublishName, ContactInfo FROM {TABLE_NAME} WHERE PublishName = :name"
-    row = await database.fetch_one(query=query, values={"name": name})
-    if row:
-        return Publishers(**row)
+    publisher = publishers_cache.get(name)
+    if publisher is MISSING:
+        await ensure_connection()
+        query = f"SELECT PublishName, ContactInfo FROM {TABLE_NAME} WHERE PublishName = :name"
+        row = await read_database.fetch_one(query=query, values={"name": name})
+        publisher = Publishers(**row) if row else None
+        if publisher is not None:
+            publishers_cache.set(name, publisher)
+    if publisher:
+        return publisher
     raise HTTPException(status_code=404, detail="Publisher not found")
 
 # Create a new publisher
@@ -36,6 +46,8 @@ async def create_publisher(publisher: Publishers) -> Publishers:
         VALUES (:PublishName, :ContactInfo)
     """
     await database.execute(query=query, values=publisher.dict())
+    publishers_cache.invalidate(publisher.PublishName)
+    bump_version("Publishers")
     return publisher
 
 # Update an existing publisher
@@ -47,18 +59,31 @@ async def update_publisher(publisher: Publishers) -> Publishers:
         WHERE PublishName = :PublishName
     """
     await database.execute(query=query, values=publisher.dict())
+    publishers_cache.invalidate(publisher.PublishName)
+    bump_version("Publishers")
     return publisher
 
-# Delete a publisher by name
+# Delete a publisher by name (Books.PublishName is set to NULL by the FK)
 async def delete_publisher(name: str):
     await ensure_connection()
+    isbns = await isbns_for_publishers([name])
     query = f"DELETE FROM {TABLE_NAME} WHERE PublishName = :name"
     await database.execute(query=query, values={"name": name})
+    publishers_cache.invalidate(name)
+    books_cache.clear()
+    bump_version("Publishers", "Books")
+    await refresh_search(isbns)
 
 # Delete multiple publishers by names
 async def delete_publishers(PublishNames: List[str]) -> int:
     if not PublishNames:
         return 0  # Nothing to delete
     await ensure_connection()
+    isbns = await isbns_for_publishers(PublishNames)
     query = f"DELETE FROM {TABLE_NAME} WHERE PublishName IN :PublishNames"
-    return await database.execute(query=query, values={"PublishNames": PublishNames})
+    deleted = await database.execute(query=query, values={"PublishNames": PublishNames})
+    publishers_cache.invalidate(*PublishNames)
+    books_cache.clear()
+    bump_version("Publishers", "Books")
+    await refresh_search(isbns)
+    return deleted
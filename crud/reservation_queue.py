@@ -0,0 +1,111 @@
+# crud/reservation_queue.py
+# Reservation queues: who gets a copy of a title when one comes back.
+#
+# Waiting reservations (AssignedCopyID IS NULL) are served first come, first
+# served: by DateFor, then ReservationID. When return_copies()
+# (crud/loans_crud.py) closes a loan, the copy is assigned to the head of its
+# title's queue in the same transaction and stays on the hold shelf until
+# that member checks it out.
+#
+# The head is picked by a locking read of the queue index
+# (idx_reservations_book_queue since migration 0008), one index row per
+# returned copy. Two workers returning copies of the same title queue up on
+# that row lock, so the second one sees the first's assignment and takes the
+# next member: FIFO holds across workers.
+#
+# GET /api/reservations/queue/{isbn} shows the queue from a per-worker heap,
+# loaded from the same index and reloaded after RESERVATION_QUEUE_TTL seconds
+# (or when this worker changes the title's reservations). It is only a view:
+# another worker's changes can take up to the TTL to show.
+import heapq
+import os
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database import database
+from schemas.reservations import Reservations
+
+TABLE_NAME = "Reservations"
+
+# seconds a loaded queue is trusted before it is read again
+RESERVATION_QUEUE_TTL = float(os.getenv("RESERVATION_QUEUE_TTL", "300"))
+
+# Waiting reservations of one title, in queue order (an index range read)
+WAITING = f"""
+    SELECT ReservationID, MemberID, DateFor
+    FROM {TABLE_NAME}
+    WHERE BookReserved = :isbn AND AssignedCopyID IS NULL
+    ORDER BY DateFor, ReservationID
+"""
+
+# (DateFor, ReservationID, MemberID); a reservation without a date goes first,
+# like NULLs do in ORDER BY DateFor
+Entry = Tuple[date, int, int]
+
+
+def _entry(date_for: Optional[date], reservation_id: int, member_id: int) -> Entry:
+    return (date_for or date.min, reservation_id, member_id)
+
+
+class ReservationQueues:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._heaps: Dict[str, List[Entry]] = {}
+        self._loaded_at: Dict[str, float] = {}
+
+    # The title's heap, (re)loaded from the table when missing or too old
+    async def heap(self, isbn: str) -> List[Entry]:
+        loaded_at = self._loaded_at.get(isbn)
+        if loaded_at is None or time.monotonic() - loaded_at > self.ttl:
+            rows = await database.fetch_all(WAITING, values={"isbn": isbn})
+            # rows come sorted, and a sorted list is already a valid heap
+            self._heaps[isbn] = [_entry(row["DateFor"], row["ReservationID"], row["MemberID"]) for row in rows]
+            self._loaded_at[isbn] = time.monotonic()
+        return self._heaps[isbn]
+
+    # New waiting reservation (titles not loaded yet pick it up when they load)
+    def push(self, isbn: str, date_for: Optional[date], reservation_id: int, member_id: int) -> None:
+        if isbn in self._heaps:
+            heapq.heappush(self._heaps[isbn], _entry(date_for, reservation_id, member_id))
+
+    # Forget the given titles' queues; they are read again on next use
+    def invalidate(self, isbns: Iterable[Optional[str]]) -> None:
+        for isbn in isbns:
+            self._heaps.pop(isbn, None)
+            self._loaded_at.pop(isbn, None)
+
+
+reservation_queues = ReservationQueues(RESERVATION_QUEUE_TTL)
+
+
+# ===================================================================
+# QUEUE
+# ===================================================================
+
+# Waiting reservations of a title, first in line first
+async def get_queue(isbn: str) -> List[Reservations]:
+    return [
+        Reservations(ReservationID=reservation_id, memberID=member_id, DateFor=date_for, BookReserved=isbn)
+        for date_for, reservation_id, member_id in sorted(await reservation_queues.heap(isbn))
+    ]
+
+
+# Hold the copy for the next waiting reservation of its title. Call inside
+# the transaction that freed the copy, and invalidate the title's queue once
+# it has committed. Returns the ReservationID that got the copy, or None if
+# nobody is waiting.
+async def assign_copy(isbn: str, copy_id: int) -> Optional[int]:
+    reservation_id = await database.fetch_val(f"""
+        SELECT ReservationID FROM {TABLE_NAME}
+        WHERE BookReserved = :isbn AND AssignedCopyID IS NULL
+        ORDER BY DateFor, ReservationID
+        LIMIT 1
+        FOR UPDATE
+    """, values={"isbn": isbn})
+    if reservation_id is not None:
+        await database.execute(
+            f"UPDATE {TABLE_NAME} SET AssignedCopyID = :copy_id WHERE ReservationID = :reservation_id",
+            values={"copy_id": copy_id, "reservation_id": reservation_id},
+        )
+    return reservation_id
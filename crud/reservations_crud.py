@@ -1,9 +1,12 @@
 # crud/reservations_crud.py
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException
 from databases import Database
 from schemas.reservations import Reservations
-from database import database  # your database.py file
+from database import database, read_database  # your database.py file
+from crud.pagination import keyset_clause
+from crud.availability_crud import availability_transaction, refresh_availability
+from crud.reservation_queue import assign_copy, reservation_queues
 
 TABLE_NAME = "Reservations"
 
@@ -12,19 +15,20 @@ async def ensure_connection():
     if not database.is_connected:
         await database.connect()
 
-# Get all reservations with optional pagination
-async def get_reservations(skip: int = 0, limit: int = 100) -> List[Reservations]:
+# Get all reservations with optional pagination (offset or keyset cursor)
+async def get_reservations(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Reservations]:
     await ensure_connection()
-    query = f"SELECT ReservationID, memberID, DateFor, BookReserved FROM {TABLE_NAME} LIMIT :limit OFFSET :skip"
-    rows = await database.fetch_all(query=query, values={"skip": skip, "limit": limit})
+    where_sql, order_sql, values = keyset_clause(["ReservationID"], cursor, skip)
+    query = f"SELECT ReservationID, memberID, DateFor, BookReserved, AssignedCopyID FROM {TABLE_NAME} {where_sql} {order_sql} LIMIT :limit OFFSET :skip"
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
     # Convert DateFor to date object
     return [Reservations(**{**row, "DateFor": row["DateFor"]}) for row in rows]
 
 # Get a single reservation by ID
 async def get_reservation(reservation_id: int) -> Reservations:
     await ensure_connection()
-    query = f"SELECT ReservationID, memberID, DateFor, BookReserved FROM {TABLE_NAME} WHERE ReservationID = :reservation_id"
-    row = await database.fetch_one(query=query, values={"reservation_id": reservation_id})
+    query = f"SELECT ReservationID, memberID, DateFor, BookReserved, AssignedCopyID FROM {TABLE_NAME} WHERE ReservationID = :reservation_id"
+    row = await read_database.fetch_one(query=query, values={"reservation_id": reservation_id})
     if row:
         return Reservations(**{**row, "DateFor": row["DateFor"]})
     raise HTTPException(status_code=404, detail="Reservation not found")
@@ -38,31 +42,78 @@ async def create_reservation(reservation: Reservations) -> Reservations:
     """
     # Convert DateFor to string for SQL
     values = {**reservation.dict(), "DateFor": reservation.DateFor.isoformat()}
+    values.pop("AssignedCopyID")   # new reservations wait in the queue
     await database.execute(query=query, values=values)
+    reservation.AssignedCopyID = None
+    reservation_queues.push(str(reservation.BookReserved), reservation.DateFor,
+                            reservation.ReservationID, reservation.memberID)
     return reservation
 
-# Update an existing reservation
+# Update an existing reservation. Moved to another title, it gives up the
+# copy held for it (which goes to the next reservation of the old title, or
+# back on the shelf) and waits in the new title's queue.
 async def update_reservation(reservation: Reservations) -> Reservations:
     await ensure_connection()
-    query = f"""
-        UPDATE {TABLE_NAME}
-        SET memberID = :memberID,
-            DateFor = :DateFor,
-            BookReserved = :BookReserved
-        WHERE ReservationID = :ReservationID
-    """
-    values = {**reservation.dict(), "DateFor": reservation.DateFor.isoformat()}
-    await database.execute(query=query, values=values)
+    new_isbn = str(reservation.BookReserved)
+    isbns = [new_isbn]
+    try:
+        async with availability_transaction():
+            current = await database.fetch_one(
+                f"SELECT BookReserved, AssignedCopyID FROM {TABLE_NAME} WHERE ReservationID = :reservation_id FOR UPDATE",
+                values={"reservation_id": reservation.ReservationID},
+            )
+            if current is None:
+                raise HTTPException(status_code=404, detail="Reservation not found")
+            old_isbn, held_copy_id = current["BookReserved"], current["AssignedCopyID"]
+            isbns.append(old_isbn)
+            moved = old_isbn != new_isbn
+            # holds are only set by the return desk (and dropped by a move)
+            query = f"""
+                UPDATE {TABLE_NAME}
+                SET memberID = :memberID,
+                    DateFor = :DateFor,
+                    BookReserved = :BookReserved
+                    {", AssignedCopyID = NULL" if moved else ""}
+                WHERE ReservationID = :ReservationID
+            """
+            values = {**reservation.dict(), "DateFor": reservation.DateFor.isoformat()}
+            values.pop("AssignedCopyID")
+            await database.execute(query=query, values=values)
+            if moved and held_copy_id is not None:
+                await assign_copy(old_isbn, held_copy_id)
+                await refresh_availability([old_isbn])
+            reservation.AssignedCopyID = None if moved else held_copy_id
+    finally:
+        # its place in the queue (or the queue itself) may have changed
+        reservation_queues.invalidate(isbns)
     return reservation
 
+# Delete the matching reservations; a copy held for one of them goes to the
+# next reservation in its title's queue (or back on the shelf)
+async def _delete_reservations(where_sql: str, values: dict):
+    isbns = []
+    try:
+        async with availability_transaction():
+            rows = await database.fetch_all(
+                f"SELECT BookReserved, AssignedCopyID FROM {TABLE_NAME} WHERE {where_sql} FOR UPDATE", values=values
+            )
+            await database.execute(f"DELETE FROM {TABLE_NAME} WHERE {where_sql}", values=values)
+            isbns = sorted({row["BookReserved"] for row in rows if row["BookReserved"]})
+            for row in rows:
+                if row["AssignedCopyID"] is not None:
+                    await assign_copy(row["BookReserved"], row["AssignedCopyID"])
+            if any(row["AssignedCopyID"] is not None for row in rows):
+                await refresh_availability(isbns)
+    finally:
+        # drop the deleted and newly assigned reservations from the queues
+        reservation_queues.invalidate(isbns)
+
 # Delete a reservation by ID
 async def delete_reservation(reservation_id: int):
     await ensure_connection()
-    query = f"DELETE FROM {TABLE_NAME} WHERE ReservationID = :reservation_id"
-    await database.execute(query=query, values={"reservation_id": reservation_id})
+    await _delete_reservations("ReservationID = :reservation_id", {"reservation_id": reservation_id})
 
 # delete reservations by memberID
 async def delete_reservations_by_member(member_id: int):
     await ensure_connection()
-    query = f"DELETE FROM {TABLE_NAME} WHERE memberID = :member_id"
-    await database.execute(query=query, values={"member_id": member_id})
\ No newline at end of file
+    await _delete_reservations("memberID = :member_id", {"member_id": member_id})
\ No newline at end of file
@@ -0,0 +1,119 @@
+# crud/search_crud.py
+# Full-text catalog search over title, categories, author names and publisher.
+#
+# "LIKE '%term%'" can't use an index, so every search scanned Books. Instead
+# the searchable text of each book is kept in the BookSearch table, which has
+# FULLTEXT indexes, and searches are MATCH ... AGAINST lookups. Like
+# BookAvailability, the CRUD writes to Books/BookAuthors (and author/publisher
+# deletes) call refresh_search() for the ISBNs they touched.
+import re
+from typing import Iterable, List, Optional
+
+from database import database, read_database
+from crud.lookups import in_clause
+from schemas.search import BookSearchResult
+from responses import trusted
+
+TABLE_NAME = "BookSearch"
+
+# InnoDB ignores words shorter than innodb_ft_min_token_size (default 3)
+MIN_TERM_LENGTH = 3
+
+# title matches count this many times more than a match anywhere else
+TITLE_WEIGHT = 2
+
+# Searchable text per book, author names joined into one column
+BOOK_TEXT = """
+    SELECT b.ISBN, b.Title, b.Categories,
+           (SELECT GROUP_CONCAT(ba.AuthorName ORDER BY ba.AuthorName SEPARATOR ', ')
+            FROM BookAuthors ba
+            WHERE ba.ISBN = b.ISBN) AS Authors,
+           b.PublishName AS Publisher
+    FROM Books b
+    {filter}
+"""
+
+UPSERT = f"""
+    INSERT INTO {TABLE_NAME} (ISBN, Title, Categories, Authors, Publisher)
+    {{select}}
+    ON DUPLICATE KEY UPDATE Title = VALUES(Title), Categories = VALUES(Categories),
+                            Authors = VALUES(Authors), Publisher = VALUES(Publisher)
+"""
+
+
+# ===================================================================
+# MAINTENANCE
+# ===================================================================
+
+# Re-index every book (one set-based statement)
+async def rebuild_search() -> None:
+    await database.execute(UPSERT.format(select=BOOK_TEXT.format(filter="")))
+
+
+# Re-index the given books after a write to Books or BookAuthors
+# (deleted books drop out through the FK cascade)
+async def refresh_search(isbns: Iterable[Optional[str]]) -> None:
+    isbns = sorted({isbn for isbn in isbns if isbn})
+    if not isbns:
+        return
+    placeholders, values = in_clause("isbn", isbns)
+    select = BOOK_TEXT.format(filter=f"WHERE b.ISBN IN ({placeholders})")
+    await database.execute(UPSERT.format(select=select), values=values)
+
+
+# ISBNs written by the given authors (read BEFORE deleting them, the
+# BookAuthors rows cascade away with the author)
+async def isbns_for_authors(author_names: Iterable[str]) -> List[str]:
+    author_names = sorted(set(author_names))
+    if not author_names:
+        return []
+    placeholders, values = in_clause("author", author_names)
+    rows = await database.fetch_all(
+        f"SELECT DISTINCT ISBN FROM BookAuthors WHERE AuthorName IN ({placeholders})", values=values
+    )
+    return [row["ISBN"] for row in rows]
+
+
+# ISBNs of the given publishers (read BEFORE deleting them, the FK sets
+# Books.PublishName to NULL)
+async def isbns_for_publishers(publish_names: Iterable[str]) -> List[str]:
+    publish_names = sorted(set(publish_names))
+    if not publish_names:
+        return []
+    placeholders, values = in_clause("publisher", publish_names)
+    rows = await database.fetch_all(
+        f"SELECT ISBN FROM Books WHERE PublishName IN ({placeholders})", values=values
+    )
+    return [row["ISBN"] for row in rows]
+
+
+# ===================================================================
+# SEARCH
+# ===================================================================
+
+# Turn free text into a boolean-mode query: every word is required and
+# matched as a prefix ("harr pott" -> "+harr* +pott*"). Words too short to be
+# indexed are dropped. Returns "" when nothing searchable is left.
+def boolean_query(q: str) -> str:
+    terms = [t for t in re.findall(r"\w+", q.lower()) if len(t) >= MIN_TERM_LENGTH]
+    return " ".join(f"+{t}*" for t in dict.fromkeys(terms))
+
+
+# Books matching q, best match first (title matches weigh TITLE_WEIGHT times more)
+async def search_books(q: str, skip: int = 0, limit: int = 20) -> List[BookSearchResult]:
+    terms = boolean_query(q)
+    if not terms:
+        return []
+    query = f"""
+        SELECT b.ISBN, b.Title, b.Categories, b.PublishYear, b.PublishName, s.Authors,
+               {TITLE_WEIGHT} * MATCH (s.Title) AGAINST (:terms IN BOOLEAN MODE)
+               + MATCH (s.Title, s.Categories, s.Authors, s.Publisher) AGAINST (:terms IN BOOLEAN MODE)
+               AS Score
+        FROM {TABLE_NAME} s
+        INNER JOIN Books b ON b.ISBN = s.ISBN
+        WHERE MATCH (s.Title, s.Categories, s.Authors, s.Publisher) AGAINST (:terms IN BOOLEAN MODE)
+        ORDER BY Score DESC, s.ISBN
+        LIMIT :limit OFFSET :skip
+    """
+    rows = await read_database.fetch_all(query=query, values={"terms": terms, "skip": skip, "limit": limit})
+    return trusted(BookSearchResult, rows)
@@ -1,8 +1,10 @@
 # crud/staff_crud.py
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException
 from schemas.staff import Staff
-from database import database  # your database.py file
+from database import database, read_database  # your database.py file
+from crud.pagination import keyset_clause
+from responses import trusted
 
 TABLE_NAME = "Staff"
 
@@ -12,16 +14,19 @@ async def ensure_connection():
         await database.connect()
 
 
-# Get all staff members (optional pagination)
-async def get_staff(skip: int = 0, limit: int = 100) -> List[Staff]:
+# Get all staff members (optional pagination, offset or keyset cursor)
+async def get_staff(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Staff]:
     await ensure_connection()
+    where_sql, order_sql, values = keyset_clause(["StaffID"], cursor, skip)
     query = f"""
         SELECT StaffID, StaffName, Position, WorkTime
         FROM {TABLE_NAME}
+        {where_sql}
+        {order_sql}
         LIMIT :limit OFFSET :skip
     """
-    rows = await database.fetch_all(query=query, values={"skip": skip, "limit": limit})
-    return [Staff(**row) for row in rows]
+    rows = await read_database.fetch_all(query=query, values={**values, "limit": limit})
+    return trusted(Staff, rows)
 
 
 # Get one staff member
@@ -32,7 +37,7 @@ async def get_staff_member(staff_id: int) -> Staff:
         FROM {TABLE_NAME}
         WHERE StaffID = :staff_id
     """
-    row = await database.fetch_one(query=query, values={"staff_id": staff_id})
+    row = await read_database.fetch_one(query=query, values={"staff_id": staff_id})
     if row:
         return Staff(**row)
     raise HTTPException(status_code=404, detail="Staff member not found")
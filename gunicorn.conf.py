@@ -0,0 +1,36 @@
+# gunicorn.conf.py
+# Production settings for gunicorn (see serve.py for the why of each one and
+# the SERVER_* env variables).
+#
+#   gunicorn -c gunicorn.conf.py main:app
+from database import DB_POOL_MAX_SIZE
+from serve import (
+    SERVER_BACKLOG, SERVER_GRACEFUL_TIMEOUT, SERVER_HOST, SERVER_KEEPALIVE, SERVER_MAX_REQUESTS,
+    SERVER_MAX_REQUESTS_JITTER, SERVER_PORT, SERVER_WORKERS, LOOP, HTTP,
+)
+
+bind = f"{SERVER_HOST}:{SERVER_PORT}"
+workers = SERVER_WORKERS
+worker_class = "serve.LibraryWorker"
+
+# import main.py once in the master, then fork the workers
+preload_app = True
+
+backlog = SERVER_BACKLOG
+keepalive = SERVER_KEEPALIVE
+graceful_timeout = SERVER_GRACEFUL_TIMEOUT
+# a worker that doesn't check in for this long is killed and replaced
+timeout = 60
+max_requests = SERVER_MAX_REQUESTS
+max_requests_jitter = SERVER_MAX_REQUESTS_JITTER
+
+accesslog = "-"
+errorlog = "-"
+
+
+# each worker opens its own pool: keep this under MySQL's max_connections
+def when_ready(server) -> None:
+    server.log.info(
+        "%s workers (%s, %s), up to %s connections per database",
+        workers, LOOP, HTTP, workers * DB_POOL_MAX_SIZE,
+    )
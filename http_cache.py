@@ -0,0 +1,85 @@
+# http_cache.py
+# Response cache + ETag / conditional GET for the catalog list endpoints
+# (books, authors, publishers, book-authors) that the member pages in
+# templates/ load over and over.
+#
+# The encoded JSON body of a response is cached by path + query string + the
+# versions of the tables it was built from (see table_versions in cache.py),
+# with a strong ETag computed once from the body. A request whose
+# If-None-Match matches the cached ETag gets a 304 straight from the cache:
+# no query, no Pydantic serialization. A write bumps the table version, so the
+# next request builds a fresh response. Like the catalog cache, other workers
+# only see the write once CATALOG_CACHE_TTL runs out, and responses built
+# from replica reads are served but not cached (see cache.py).
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Hashable, Sequence
+
+from fastapi import Request, Response
+
+from cache import CATALOG_CACHE_TTL, MISSING, TTLCache, table_version
+from responses import dumps
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+
+# (path, query, table versions) -> (etag, body, headers)
+response_cache = TTLCache("responses", RESPONSE_CACHE_SIZE, CATALOG_CACHE_TTL)
+
+# the browser must revalidate every time, which is a cheap 304 while unchanged
+CACHE_CONTROL = "no-cache"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: ignore W/ prefixes
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+# Serve a GET from the response cache, or build it with load(response) and
+# cache it. load() gets a scratch Response to set extra headers on (e.g.
+# X-Next-Cursor) and returns the body (models, dicts, lists...).
+async def cached_json(
+    request: Request,
+    tables: Sequence[str],
+    load: Callable[[Response], Awaitable[Any]],
+) -> Response:
+    key = (
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        tuple(table_version(table) for table in tables),
+    )
+    entry = response_cache.get(key)
+    if entry is MISSING:
+        scratch = Response()
+        payload = await load(scratch)
+        body = dumps(payload)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        headers = {name: value for name, value in scratch.headers.items() if name != "content-length"}
+        entry = (etag, body, headers)
+        response_cache.set(key, entry)
+    etag, body, headers = entry
+
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return Response(
+        body,
+        media_type="application/json",
+        headers={**headers, "ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+# ===================================================================
+# RENDERED FRAGMENTS
+# ===================================================================
+# Server-rendered HTML pieces (e.g. the catalog table rows of the member
+# pages), cached under key + the versions of the tables they were built from.
+fragment_cache = TTLCache("fragments", RESPONSE_CACHE_SIZE, CATALOG_CACHE_TTL)
+
+
+async def cached_fragment(key: Hashable, tables: Sequence[str], render: Callable[[], Awaitable[Any]]) -> Any:
+    full_key = (key, tuple(table_version(table) for table in tables))
+    fragment = fragment_cache.get(full_key)
+    if fragment is MISSING:
+        fragment = await render()
+        fragment_cache.set(full_key, fragment)
+    return fragment
@@ -0,0 +1,174 @@
+# jobs.py
+# Background jobs for long maintenance work (batch deletes, cascading
+# deletes, and later big exports) so it doesn't run inside a request.
+#
+# A route calls submit(): the job is saved in the Jobs table as "queued" and
+# the request answers 202 with the JobID straight away (see job_accepted).
+# JOB_WORKERS worker tasks, started in lifespan (main.py), run the queued jobs
+# one at a time each, so jobs never hold more than JOB_WORKERS pool
+# connections and the rest of the pool stays free for interactive requests.
+# Jobs work in chunks of JOB_CHUNK_SIZE rows, save their progress after each
+# chunk and give the event loop back in between.
+#
+# GET /api/jobs/{id} reads the Jobs table, so any worker process can answer
+# it. The queue itself is in memory: jobs still queued or running when the
+# app shuts down are marked "failed" (if the process is killed they stay
+# queued/running in the table).
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from database import database, reads_on_primary
+from schemas.jobs import Jobs
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = "Jobs"
+
+# jobs running at the same time (per worker process)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# jobs waiting to run; submit() answers 503 when it is full
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+# rows per statement for chunked jobs
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "500"))
+
+class Job:
+    def __init__(self, kind: str, fn: Callable[..., Awaitable[Any]], args: tuple):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.fn = fn
+        self.args = args
+
+    # Save how far the job is (done out of total units)
+    async def progress(self, done: int, total: Optional[int] = None) -> None:
+        await database.execute(
+            f"UPDATE {TABLE_NAME} SET Done = :done, Total = COALESCE(:total, Total) WHERE JobID = :job_id",
+            values={"done": done, "total": total, "job_id": self.id},
+        )
+        # let waiting requests run between chunks
+        await asyncio.sleep(0)
+
+    # Call fn(chunk) for every JOB_CHUNK_SIZE items, saving progress after each
+    async def in_chunks(self, items: Sequence, fn: Callable[[list], Awaitable[Any]]) -> None:
+        items = list(items)
+        await self.progress(0, len(items))
+        for start in range(0, len(items), JOB_CHUNK_SIZE):
+            await fn(items[start:start + JOB_CHUNK_SIZE])
+            await self.progress(min(start + JOB_CHUNK_SIZE, len(items)))
+
+
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+# jobs of this process that haven't finished, by JobID
+_pending: Dict[str, Job] = {}
+
+
+async def _set_status(job_id: str, status: str, **columns) -> None:
+    assignments = "".join(f", {column} = :{column}" for column in columns)
+    await database.execute(
+        f"UPDATE {TABLE_NAME} SET Status = :status{assignments} WHERE JobID = :job_id",
+        values={"status": status, "job_id": job_id, **columns},
+    )
+
+
+# ===================================================================
+# WORKERS
+# ===================================================================
+
+async def _run(job: Job) -> None:
+    await _set_status(job.id, "running", StartedAt=datetime.now())
+    try:
+        # the job reads its own writes from the primary, the next job starts unpinned
+        with reads_on_primary(False):
+            result = await job.fn(job, *job.args)
+    except Exception as err:
+        logger.exception("job %s (%s) failed", job.id, job.kind)
+        await _set_status(job.id, "failed", Error=str(err), FinishedAt=datetime.now())
+    else:
+        await _set_status(job.id, "done", Result=json.dumps(jsonable_encoder(result)), FinishedAt=datetime.now())
+
+
+async def _work() -> None:
+    while True:
+        job = await _queue.get()
+        try:
+            await _run(job)
+        except Exception:
+            # the status update itself failed (database down); keep serving
+            logger.exception("job %s (%s) could not be recorded", job.id, job.kind)
+        # (a cancelled job stays in _pending for stop_workers to mark)
+        _pending.pop(job.id, None)
+        _queue.task_done()
+
+
+async def start_workers(count: int = JOB_WORKERS) -> None:
+    global _queue
+    _queue = asyncio.Queue(maxsize=JOB_QUEUE_SIZE)
+    _workers.extend(asyncio.create_task(_work()) for _ in range(count))
+
+
+# Stop the workers; unfinished jobs are marked failed
+async def stop_workers() -> None:
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    for job_id in list(_pending):
+        await _set_status(job_id, "failed", Error="Interrupted by shutdown", FinishedAt=datetime.now())
+    _pending.clear()
+
+
+# ===================================================================
+# SUBMIT / STATUS
+# ===================================================================
+
+# Queue fn(job, *args) to run in the background; returns the new job
+async def submit(kind: str, fn: Callable[..., Awaitable[Any]], *args) -> Jobs:
+    if _queue is None or _queue.full():
+        raise HTTPException(status_code=503, detail="Job queue is full, try again later")
+    job = Job(kind, fn, args)
+    await database.execute(
+        f"""
+        INSERT INTO {TABLE_NAME} (JobID, Kind, Status, Done, CreatedAt)
+        VALUES (:job_id, :kind, 'queued', 0, :created_at)
+        """,
+        values={"job_id": job.id, "kind": kind, "created_at": datetime.now()},
+    )
+    _pending[job.id] = job
+    _queue.put_nowait(job)
+    return await get_job(job.id)
+
+
+def _to_job(row) -> Jobs:
+    job = dict(row)
+    if job["Result"] is not None:
+        job["Result"] = json.loads(job["Result"])
+    return Jobs(**job)
+
+
+async def get_job(job_id: str) -> Optional[Jobs]:
+    row = await database.fetch_one(f"SELECT * FROM {TABLE_NAME} WHERE JobID = :job_id", values={"job_id": job_id})
+    return _to_job(row) if row else None
+
+
+# Most recent jobs first
+async def get_jobs(limit: int = 50) -> List[Jobs]:
+    rows = await database.fetch_all(
+        f"SELECT * FROM {TABLE_NAME} ORDER BY CreatedAt DESC LIMIT :limit", values={"limit": limit}
+    )
+    return [_to_job(row) for row in rows]
+
+
+# 202 Accepted response for a submitted job (Location = where to poll it)
+def job_accepted(job: Jobs) -> JSONResponse:
+    return JSONResponse(
+        status_code=202, content=jsonable_encoder(job), headers={"Location": f"/api/jobs/{job.JobID}"}
+    )
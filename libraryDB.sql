@@ -1,6 +1,16 @@
 CREATE DATABASE LibraryDB;
 USE LibraryDB;
 
+# Schema changes go in migrations/, not here: run
+# `python -m migrations.runner up` after creating the database from this file.
+#
+# This file is the original schema plus what the .py migrations add (the
+# columns and tables of 0001-0006 and 0010, regenerated from them): those
+# don't run on the benchmarks' SQLite database, and on MySQL they check
+# first, so they change nothing on a database created from this file. The
+# .sql migrations (indexes) are not folded in; `up` applies them to every
+# database. Fold a new .py migration in the same way.
+
 CREATE TABLE Publishers (
 PublishName VARCHAR(100) PRIMARY KEY,
 ContactInfo VARCHAR(255)
@@ -71,22 +81,33 @@ CREATE TABLE Staff (
 
 
 
+# A reservation waits (AssignedCopyID NULL) until a copy of the book comes
+# back and is held for it (see crud/reservation_queue.py)
 CREATE TABLE Reservations (
     ReservationID INT PRIMARY KEY,
     DateFor DATE,
     MemberID INT,
     BookReserved CHAR(13),
+    AssignedCopyID INT,
+    INDEX idx_reservations_queue (BookReserved, AssignedCopyID, DateFor, ReservationID),
     FOREIGN KEY (MemberID) REFERENCES Members(MemberID),
-    FOREIGN KEY (BookReserved) REFERENCES Books(ISBN)
+    FOREIGN KEY (BookReserved) REFERENCES Books(ISBN),
+    CONSTRAINT fk_reservations_assigned_copy FOREIGN KEY (AssignedCopyID)
+    REFERENCES Copies(CopyID)
+    ON DELETE SET NULL
 );
 
+# ReturnDate is NULL while the copy is out; fines are computed from DueDate
+# (see crud/fine_engine.py)
 CREATE TABLE Loans (
-    LoanID INT PRIMARY KEY,
+    LoanID INT AUTO_INCREMENT PRIMARY KEY,
     ReturnDate DATE,
+    DueDate DATE,
     ISBN CHAR(13),
     MemberID INT,
     StaffID INT,
     CopyID INT,
+    INDEX idx_loans_due_date (DueDate),
     FOREIGN KEY (ISBN) REFERENCES Books(ISBN),
     FOREIGN KEY (MemberID) REFERENCES Members(MemberID),
     FOREIGN KEY (StaffID) REFERENCES Staff(StaffID),
@@ -101,6 +122,60 @@ CREATE TABLE Fines (
     FOREIGN KEY (LoanID) REFERENCES Loans(LoanID)
 );
 
+# Copies per title and how many are on loan. Maintained by the app
+# (crud/availability_crud.py) and filled by migration 0003.
+CREATE TABLE BookAvailability (
+    ISBN CHAR(13) PRIMARY KEY,
+    TotalCopies INT NOT NULL DEFAULT 0,
+    OnLoan INT NOT NULL DEFAULT 0,
+    IsAvailable TINYINT AS (TotalCopies > OnLoan) STORED,
+    IsOnLoan TINYINT AS (OnLoan > 0) STORED,
+    INDEX idx_availability_available (IsAvailable, ISBN),
+    INDEX idx_availability_on_loan (IsOnLoan, ISBN),
+    CONSTRAINT fk_availability_books FOREIGN KEY (ISBN)
+    REFERENCES Books(ISBN)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+# Searchable text per book for GET /api/books/search. Maintained by the app
+# (crud/search_crud.py) and filled by migration 0004.
+CREATE TABLE BookSearch (
+    ISBN CHAR(13) PRIMARY KEY,
+    Title VARCHAR(255) NOT NULL,
+    Categories VARCHAR(100),
+    Authors TEXT,
+    Publisher VARCHAR(100),
+    FULLTEXT INDEX ft_book_search_title (Title),
+    FULLTEXT INDEX ft_book_search_all (Title, Categories, Authors, Publisher),
+    CONSTRAINT fk_book_search_books FOREIGN KEY (ISBN)
+    REFERENCES Books(ISBN)
+    ON UPDATE CASCADE
+    ON DELETE CASCADE
+);
+
+# Background jobs (batch deletes etc.) and their progress, see jobs.py
+CREATE TABLE Jobs (
+    JobID CHAR(32) PRIMARY KEY,
+    Kind VARCHAR(50) NOT NULL,
+    Status VARCHAR(10) NOT NULL,
+    Done INT NOT NULL DEFAULT 0,
+    Total INT,
+    Result TEXT,
+    Error TEXT,
+    CreatedAt DATETIME NOT NULL,
+    StartedAt DATETIME,
+    FinishedAt DATETIME,
+    INDEX idx_jobs_created (CreatedAt)
+);
+
+# Written by the primary every few seconds and read back from the read
+# replicas to measure how far behind they are, see ReadRouter in database.py
+CREATE TABLE ReplicaHeartbeat (
+    ID INT PRIMARY KEY,
+    Beat DOUBLE NOT NULL
+);
+
 
 INSERT INTO Publishers (PublishName, ContactInfo) VALUES 
 ('Penguin Random House', 'info@penguinrandomhouse.com'),
@@ -153,14 +228,16 @@ INSERT INTO Reservations (ReservationID, DateFor, MemberID, BookReserved) VALUES
 (1, '2025-10-22', 1, '9780143127741'),
 (2, '2025-10-23', 2, '9781501128035');
 
-INSERT INTO Loans (LoanID, ReturnDate, ISBN, MemberID, StaffID, CopyID) VALUES
-(1, '2025-10-10', '9780316420259', 1, 1, 6),
-(2, '2025-10-20', '9781250278187', 3, 3, 5);
+INSERT INTO Loans (LoanID, ReturnDate, DueDate, ISBN, MemberID, StaffID, CopyID) VALUES
+(1, '2025-10-10', '2025-09-13', '9780316420259', 1, 1, 6),
+(2, '2025-10-20', '2025-08-21', '9781250278187', 3, 3, 5);
 
 INSERT INTO Fines (FineID, AmountFined, DaysOverdue, LoanID) VALUES
 (1, 10, 27, 1),
 (2, 25, 60, 2);
 
+INSERT INTO ReplicaHeartbeat (ID, Beat) VALUES (1, 0);
+
 
 
 
@@ -1,13 +1,26 @@
+import asyncio
+import logging
+import os
+import time
 import uvicorn
-from fastapi import FastAPI, Request
-from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from contextlib import asynccontextmanager, suppress
 from starlette.middleware.cors import CORSMiddleware
-from sqlalchemy.ext.asyncio import create_async_engine
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from database import database, DATABASE_URL
+from database import database, read_database, reads_on_primary, DB_SLOW_QUERY_MS
+from database import READ_PRIMARY_COOKIE, READ_YOUR_WRITES_SECONDS
+from metrics import request_started, request_finished, route_metrics, server_timing
+from metrics import prometheus_text, PROMETHEUS_CONTENT_TYPE
+from crud.pagination import NEXT_CURSOR_HEADER, next_cursor
+from crud.catalog_crud import get_catalog_view
+from http_cache import cached_fragment
+from crud.fine_engine import run_periodically, FINE_ENGINE_INTERVAL_HOURS
+from jobs import start_workers, stop_workers
 
 # ------------------------
 # IMPORT ALL API ROUTERS
@@ -22,29 +35,38 @@ from routes.staff_routes import router as staff_router
 from routes.copies_routes import router as copies_router
 from routes.fines_routes import router as fines_router
 from routes.book_authors_routes import router as book_authors_router
+from routes.catalog_routes import router as catalog_router
+from routes.jobs_routes import router as jobs_router
 
-# (Admin still imported but we won’t rely on it now)
-from views.authors_view import AuthorsView
-from views.book_authors_view import BookAuthorsView
-from views.books_view import BooksView
-from views.copies_view import CopiesView
-from views.fines_view import FinesView
-from views.loans_view import LoansView
-from views.members_view import MemberView
-from views.publishers_view import PublishersView
-from views.reservations_view import ReservationsView
-from views.staff_views import StaffView
+# Admin panel: loaded on the first /admin request by default (see admin_panel.py)
+from admin_panel import mount_admin, ESTIMATED_COUNT_HEADER
 
-from starlette_admin.contrib.sqla import Admin
+# app loggers (database, jobs, fine engine...); DEBUG also logs every query
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 
 # ================================
 # LIFESPAN: DB Connect/Disconnect
 # ================================
+# The connection pool is owned by the app: opened once here and shared by
+# every request. Routes and views must not connect/disconnect themselves.
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await database.connect()
     print("Database connected")
+    # read replicas, if any (see DATABASE_REPLICA_URLS in database.py)
+    await read_database.connect()
+    # background jobs (see jobs.py)
+    await start_workers()
+    # overdue fines, every FINE_ENGINE_INTERVAL_HOURS (off by default, see crud/fine_engine.py)
+    fine_engine = asyncio.create_task(run_periodically()) if FINE_ENGINE_INTERVAL_HOURS > 0 else None
     yield
+    if fine_engine is not None:
+        fine_engine.cancel()
+        # wait until it has stopped, so the pool isn't closed under it
+        with suppress(asyncio.CancelledError):
+            await fine_engine
+    await stop_workers()
+    await read_database.disconnect()
     await database.disconnect()
     print("Database disconnected")
 
@@ -54,15 +76,6 @@ async def lifespan(app: FastAPI):
 # ================================
 app = FastAPI(lifespan=lifespan)
 
-
-@app.on_event("startup")
-async def startup():
-    await database.connect()
-
-@app.on_event("shutdown")
-async def shutdown():
-    await database.disconnect()
-
 # ================================
 # CORS (for frontend dev)
 # ================================
@@ -72,9 +85,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing", "ETag", ESTIMATED_COUNT_HEADER],
 )
 
 
+# ================================
+# REQUEST / QUERY INSTRUMENTATION
+# ================================
+# Times every request and every query it makes (see database.py), adds a
+# Server-Timing header and records per-route metrics (see metrics.py).
+#
+# Also picks where the request reads from (see read_database in
+# database.py): write requests, and clients that wrote in the last
+# READ_YOUR_WRITES_SECONDS (the READ_PRIMARY_COOKIE), read from the primary.
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    request_started()
+    writes = request.method not in READ_ONLY_METHODS
+    with database.track_queries() as stats, reads_on_primary(writes or READ_PRIMARY_COOKIE in request.cookies):
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            route = request.scope.get("route")
+            request_finished(request.method, route.path if route else "unmatched", status_code, elapsed_ms, stats)
+    response.headers["Server-Timing"] = server_timing(stats, elapsed_ms)
+    if writes and read_database.replicas and status_code < 400:
+        response.set_cookie(READ_PRIMARY_COOKIE, "1", max_age=READ_YOUR_WRITES_SECONDS, httponly=True, samesite="lax")
+    # admin list pages whose total is an estimate (see views/sql_view.py)
+    if getattr(request.state, "count_estimated", False):
+        response.headers[ESTIMATED_COUNT_HEADER] = "true"
+    return response
+
+
 # ================================
 # STATIC FILES + HTML TEMPLATES
 # ================================
@@ -88,18 +137,56 @@ templates = Jinja2Templates(directory="templates")
 async def read_index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+# ================================
+# MEMBER CATALOG PAGES
+# ================================
+# The first page of rows is rendered here, so the table shows up with the
+# HTML; later pages come from /member/catalog/rows as ready-made <tr> rows.
+# Rendered rows are cached per filter + page and go stale as soon as one of
+# CATALOG_TABLES is written (see bump_version in cache.py).
+CATALOG_PAGE_SIZE = 50
+CATALOG_TABLES = ["Books", "BookAuthors", "Publishers", "BookAvailability"]
+# button shown on each row, per filter
+CATALOG_ACTIONS = {None: None, "available": "loan", "on-loan": "reserve"}
+
+
+# (rows html, cursor of the next page or None)
+async def render_catalog_rows(status: Optional[str], cursor: Optional[str] = None):
+    async def render():
+        books = await get_catalog_view(0, CATALOG_PAGE_SIZE, cursor, status)
+        rows = templates.get_template("partials/catalog_rows.html").render(
+            books=books, action=CATALOG_ACTIONS[status]
+        )
+        return rows, next_cursor(books, ["ISBN"], CATALOG_PAGE_SIZE)
+    return await cached_fragment(("catalog", status, cursor), CATALOG_TABLES, render)
+
+
+async def catalog_page(request: Request, template: str, status: Optional[str]):
+    rows, cursor = await render_catalog_rows(status)
+    return templates.TemplateResponse(template, {"request": request, "rows": rows, "next_cursor": cursor})
+
+
 @app.get("/member/home", response_class=HTMLResponse)
 async def members_home(request: Request):
-    return templates.TemplateResponse("member_home.html", {"request": request})
+    return await catalog_page(request, "member_home.html", None)
 @app.get("/member/signup", response_class=HTMLResponse)
 async def members_signup(request: Request):
     return templates.TemplateResponse("signup.html", {"request": request})
 @app.get("/member/available", response_class=HTMLResponse)
 async def member_available(request: Request):
-    return templates.TemplateResponse("member_available.html", {"request": request})
+    return await catalog_page(request, "member_available.html", "available")
 @app.get("/member/on-loan", response_class=HTMLResponse)
 async def member_on_loan(request: Request):
-    return templates.TemplateResponse("member_on_loan.html", {"request": request})
+    return await catalog_page(request, "member_on_loan.html", "on-loan")
+
+# Next page of rows for the member pages (X-Next-Cursor = the page after)
+@app.get("/member/catalog/rows", response_class=HTMLResponse)
+async def member_catalog_rows(status: Optional[str] = None, cursor: Optional[str] = None):
+    if status not in CATALOG_ACTIONS:
+        raise HTTPException(status_code=400, detail="status must be 'available' or 'on-loan'")
+    rows, next_page = await render_catalog_rows(status, cursor)
+    return HTMLResponse(rows, headers={NEXT_CURSOR_HEADER: next_page} if next_page else None)
+
 
 # staff
 @app.get("/staff", response_class=HTMLResponse)
@@ -136,6 +223,34 @@ async def read_reservations(request: Request):
 async def read_staff(request: Request):
     return templates.TemplateResponse("staff/staff_testing.html", {"request": request})
 
+# ================================
+# HEALTH CHECK (load balancer / orchestrator)
+# ================================
+@app.get("/health")
+async def health():
+    healthy = await database.check_health()
+    return JSONResponse(
+        status_code=200 if healthy else 503,
+        content={
+            "database": "ok" if healthy else "unavailable",
+            "pool": database.pool_status(),
+            "replicas": read_database.status(),
+        },
+    )
+
+# ================================
+# METRICS (Prometheus + per-route query aggregates)
+# ================================
+# Prometheus scrape target
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(prometheus_text(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+# Same data as JSON, plus the slowest statement per route
+@app.get("/metrics/queries")
+async def query_metrics():
+    return {"slow_query_ms": DB_SLOW_QUERY_MS, "routes": route_metrics()}
+
 # ================================
 # REGISTER API ROUTERS
 # ================================
@@ -149,29 +264,19 @@ app.include_router(staff_router)
 app.include_router(copies_router)
 app.include_router(fines_router)
 app.include_router(book_authors_router)
+app.include_router(catalog_router)
+app.include_router(jobs_router)
 
 
 # ================================
-# ADMIN (still mounted but optional)
+# ADMIN (see ADMIN_MODE in admin_panel.py)
 # ================================
-engine = create_async_engine(DATABASE_URL)
-
-admin = Admin(engine=engine, title="Library Admin Panel", base_url="/admin")
-admin.add_view(AuthorsView)
-admin.add_view(BookAuthorsView)
-admin.add_view(BooksView)
-admin.add_view(CopiesView)
-admin.add_view(FinesView)
-admin.add_view(LoansView)
-admin.add_view(MemberView)
-admin.add_view(PublishersView)
-admin.add_view(ReservationsView)
-admin.add_view(StaffView)
-admin.mount_to(app)
+mount_admin(app)
 
 
 # ================================
-# RUN SERVER
+# RUN SERVER (development: one worker, auto reload)
 # ================================
+# Production runs several workers: python serve.py (see serve.py)
 if __name__ == "__main__":
     uvicorn.run("main:app", host="127.0.0.1", port=8008, reload=True)
@@ -0,0 +1,180 @@
+# metrics.py
+# Runtime metrics, filled by the middleware in main.py:
+#   - a Server-Timing header on every response
+#   - per-route aggregates (requests, latency, queries, DB time, slowest
+#     statement) as JSON at GET /metrics/queries
+#   - Prometheus text format at GET /metrics: per-route request counts and
+#     latency histograms, in-flight requests, connection pool usage and cache
+#     hit rates (no client library needed, the format is plain text)
+#
+# Counters are per worker process and reset on restart; with several workers
+# scrape each one (or sum them in Prometheus).
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from cache import cache_stats
+from database import QueryStats, database, statement_text
+
+# latency histogram buckets, in seconds (Prometheus client defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_ms = 0.0
+        self.slowest_query_ms = 0.0
+        self.slowest_query: Optional[str] = None
+        self.statuses: Counter = Counter()
+        # requests per LATENCY_BUCKETS entry (not cumulative, see prometheus_text)
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def add(self, status_code: int, elapsed_ms: float, stats: QueryStats) -> None:
+        self.requests += 1
+        if status_code >= 500:
+            self.errors += 1
+        self.statuses[status_code] += 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed_ms <= bound * 1000:
+                self.buckets[i] += 1
+                break
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.queries += stats.count
+        self.max_queries = max(self.max_queries, stats.count)
+        self.db_ms += stats.total_ms
+        if stats.slowest_sql is not None and stats.slowest_ms >= self.slowest_query_ms:
+            self.slowest_query_ms = stats.slowest_ms
+            self.slowest_query = statement_text(stats.slowest_sql)
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.requests, 2),
+            "max_ms": round(self.max_ms, 2),
+            "avg_queries": round(self.queries / self.requests, 2),
+            "max_queries": self.max_queries,
+            "avg_db_ms": round(self.db_ms / self.requests, 2),
+            "slowest_query_ms": round(self.slowest_query_ms, 2),
+            "slowest_query": self.slowest_query,
+        }
+
+
+# ("GET", "/api/books/{isbn}") -> RouteStats
+route_stats: Dict[Tuple[str, str], RouteStats] = {}
+
+# requests being handled right now
+in_flight = 0
+
+
+def request_started() -> None:
+    global in_flight
+    in_flight += 1
+
+
+def request_finished(method: str, route: str, status_code: int, elapsed_ms: float, stats: QueryStats) -> None:
+    global in_flight
+    in_flight -= 1
+    route_stats.setdefault((method, route), RouteStats()).add(status_code, elapsed_ms, stats)
+
+
+# Every route seen so far, the most DB time first
+def route_metrics() -> List[dict]:
+    routes = [
+        {"route": f"{method} {route}", **stats.snapshot()}
+        for (method, route), stats in route_stats.items()
+    ]
+    return sorted(routes, key=lambda r: r["avg_db_ms"] * r["requests"], reverse=True)
+
+
+# Server-Timing header value, e.g.
+# db;desc="3 queries";dur=4.20, db-slowest;dur=2.10, total;dur=9.87
+def server_timing(stats: QueryStats, elapsed_ms: float) -> str:
+    queries = "1 query" if stats.count == 1 else f"{stats.count} queries"
+    parts = [f'db;desc="{queries}";dur={stats.total_ms:.2f}']
+    if stats.count:
+        parts.append(f"db-slowest;dur={stats.slowest_ms:.2f}")
+    parts.append(f"total;dur={elapsed_ms:.2f}")
+    return ", ".join(parts)
+
+
+# ===================================================================
+# PROMETHEUS TEXT FORMAT
+# ===================================================================
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def prometheus_text() -> str:
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{_labels(**labels) if labels else ''} {value}")
+
+    routes = sorted(route_stats.items())
+
+    metric("library_http_requests_total", "counter", "Requests handled, by route and status code", [
+        ("", {"method": method, "route": route, "status": status}, count)
+        for (method, route), stats in routes
+        for status, count in sorted(stats.statuses.items())
+    ])
+
+    histogram = []
+    for (method, route), stats in routes:
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+            cumulative += count
+            histogram.append(("_bucket", {"method": method, "route": route, "le": bound}, cumulative))
+        histogram.append(("_bucket", {"method": method, "route": route, "le": "+Inf"}, stats.requests))
+        histogram.append(("_sum", {"method": method, "route": route}, round(stats.total_ms / 1000, 6)))
+        histogram.append(("_count", {"method": method, "route": route}, stats.requests))
+    metric("library_http_request_duration_seconds", "histogram", "Request latency, by route", histogram)
+
+    metric("library_http_requests_in_flight", "gauge", "Requests being handled right now", [("", None, in_flight)])
+
+    metric("library_db_queries_total", "counter", "SQL statements run, by route", [
+        ("", {"method": method, "route": route}, stats.queries) for (method, route), stats in routes
+    ])
+    metric("library_db_query_seconds_total", "counter", "Time spent in SQL statements, by route", [
+        ("", {"method": method, "route": route}, round(stats.db_ms / 1000, 6)) for (method, route), stats in routes
+    ])
+
+    pool = database.pool_status()
+    if pool.get("size") is not None:
+        in_use = pool["size"] - pool["free"]
+        metric("library_db_pool_connections", "gauge", "Pooled connections, by state", [
+            ("", {"state": "in_use"}, in_use),
+            ("", {"state": "idle"}, pool["free"]),
+        ])
+        metric("library_db_pool_max_connections", "gauge", "Pool size limit", [("", None, pool["max_size"])])
+        metric("library_db_pool_utilization", "gauge", "Connections in use / pool size limit", [
+            ("", None, round(in_use / pool["max_size"], 4) if pool["max_size"] else 0)
+        ])
+
+    caches = cache_stats()
+    metric("library_cache_hits_total", "counter", "Cache hits", [("", {"cache": c["name"]}, c["hits"]) for c in caches])
+    metric("library_cache_misses_total", "counter", "Cache misses", [("", {"cache": c["name"]}, c["misses"]) for c in caches])
+    metric("library_cache_evictions_total", "counter", "Entries evicted to stay under maxsize", [
+        ("", {"cache": c["name"]}, c["evictions"]) for c in caches
+    ])
+    metric("library_cache_entries", "gauge", "Entries in the cache", [("", {"cache": c["name"]}, c["size"]) for c in caches])
+    metric("library_cache_hit_ratio", "gauge", "Hits / lookups since start", [
+        ("", {"cache": c["name"]}, c["hit_rate"]) for c in caches
+    ])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,20 @@
+# migrations/0001_loans_due_date.py
+# Loans.DueDate, which the fine engine (crud/fine_engine.py) computes fines
+# from, and its index. Databases created from libraryDB.sql already have both.
+from migrations.runner import column_exists, index_exists
+
+
+async def up(connection) -> None:
+    if not await column_exists(connection, "Loans", "DueDate"):
+        await connection.execute(
+            "ALTER TABLE Loans ADD COLUMN DueDate DATE NULL AFTER ReturnDate, ALGORITHM=INPLACE, LOCK=NONE"
+        )
+    if not await index_exists(connection, "Loans", "idx_loans_due_date"):
+        await connection.execute("CREATE INDEX idx_loans_due_date ON Loans (DueDate) ALGORITHM=INPLACE LOCK=NONE")
+
+
+async def down(connection) -> None:
+    if await index_exists(connection, "Loans", "idx_loans_due_date"):
+        await connection.execute("DROP INDEX idx_loans_due_date ON Loans ALGORITHM=INPLACE LOCK=NONE")
+    if await column_exists(connection, "Loans", "DueDate"):
+        await connection.execute("ALTER TABLE Loans DROP COLUMN DueDate, ALGORITHM=INPLACE, LOCK=NONE")
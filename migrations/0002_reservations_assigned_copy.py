@@ -0,0 +1,50 @@
+# migrations/0002_reservations_assigned_copy.py
+# Reservations.AssignedCopyID, the copy held for a reservation (see
+# crud/reservation_queue.py), with its foreign key and the queue index.
+# Databases created from libraryDB.sql already have all three.
+#
+# MySQL only adds a foreign key in place (no table copy) with
+# foreign_key_checks off. Skipping the check is safe here: the column was
+# just added and is NULL in every row.
+from migrations.runner import column_exists, foreign_key_name, index_exists
+
+
+async def up(connection) -> None:
+    if not await column_exists(connection, "Reservations", "AssignedCopyID"):
+        await connection.execute(
+            "ALTER TABLE Reservations ADD COLUMN AssignedCopyID INT NULL, ALGORITHM=INPLACE, LOCK=NONE"
+        )
+    if not await index_exists(connection, "Reservations", "idx_reservations_queue"):
+        await connection.execute("""
+            CREATE INDEX idx_reservations_queue
+            ON Reservations (BookReserved, AssignedCopyID, DateFor, ReservationID)
+            ALGORITHM=INPLACE LOCK=NONE
+        """)
+    # left by `down`; the queue index serves the BookReserved foreign key
+    if await index_exists(connection, "Reservations", "idx_reservations_book"):
+        await connection.execute("DROP INDEX idx_reservations_book ON Reservations ALGORITHM=INPLACE LOCK=NONE")
+    if await foreign_key_name(connection, "Reservations", "AssignedCopyID") is None:
+        await connection.execute("SET SESSION foreign_key_checks = 0")
+        try:
+            await connection.execute("""
+                ALTER TABLE Reservations
+                ADD CONSTRAINT fk_reservations_assigned_copy FOREIGN KEY (AssignedCopyID)
+                    REFERENCES Copies(CopyID) ON DELETE SET NULL,
+                ALGORITHM=INPLACE, LOCK=NONE
+            """)
+        finally:
+            await connection.execute("SET SESSION foreign_key_checks = 1")
+
+
+async def down(connection) -> None:
+    name = await foreign_key_name(connection, "Reservations", "AssignedCopyID")
+    if name is not None:
+        await connection.execute(f"ALTER TABLE Reservations DROP FOREIGN KEY {name}, ALGORITHM=INPLACE, LOCK=NONE")
+    if await index_exists(connection, "Reservations", "idx_reservations_queue"):
+        # the BookReserved foreign key needs an index of its own again
+        await connection.execute(
+            "CREATE INDEX idx_reservations_book ON Reservations (BookReserved) ALGORITHM=INPLACE LOCK=NONE"
+        )
+        await connection.execute("DROP INDEX idx_reservations_queue ON Reservations ALGORITHM=INPLACE LOCK=NONE")
+    if await column_exists(connection, "Reservations", "AssignedCopyID"):
+        await connection.execute("ALTER TABLE Reservations DROP COLUMN AssignedCopyID, ALGORITHM=INPLACE, LOCK=NONE")
@@ -0,0 +1,55 @@
+# migrations/0003_book_availability.py
+# BookAvailability, the copy counts per title behind the available/on-loan
+# book lists (crud/availability_crud.py), counted from Copies, Loans and
+# held Reservations. Databases created from libraryDB.sql have the table
+# but not the counts. The app keeps them up to date from then on.
+#
+# The SQL is written out here, not imported from the app, so this migration
+# does the same thing whatever the app's code becomes.
+from migrations.runner import key_ranges
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS BookAvailability (
+        ISBN CHAR(13) PRIMARY KEY,
+        TotalCopies INT NOT NULL DEFAULT 0,
+        OnLoan INT NOT NULL DEFAULT 0,
+        IsAvailable TINYINT AS (TotalCopies > OnLoan) STORED,
+        IsOnLoan TINYINT AS (OnLoan > 0) STORED,
+        INDEX idx_availability_available (IsAvailable, ISBN),
+        INDEX idx_availability_on_loan (IsOnLoan, ISBN),
+        CONSTRAINT fk_availability_books FOREIGN KEY (ISBN)
+        REFERENCES Books(ISBN)
+        ON UPDATE CASCADE
+        ON DELETE CASCADE
+    )
+"""
+
+# one run of titles; writes made meanwhile recount their titles themselves.
+# A copy counts as on loan when it has an open loan or is held for a
+# reservation.
+FILL = """
+    INSERT INTO BookAvailability (ISBN, TotalCopies, OnLoan)
+    SELECT c.ISBN,
+           COUNT(*) AS TotalCopies,
+           SUM(EXISTS (
+               SELECT 1 FROM Loans l
+               WHERE l.CopyID = c.CopyID AND l.ReturnDate IS NULL
+           ) OR EXISTS (
+               SELECT 1 FROM Reservations r
+               WHERE r.AssignedCopyID = c.CopyID
+           )) AS OnLoan
+    FROM Copies c
+    WHERE c.ISBN IS NOT NULL AND c.ISBN BETWEEN :first AND :last
+    GROUP BY c.ISBN
+    ON DUPLICATE KEY UPDATE TotalCopies = VALUES(TotalCopies), OnLoan = VALUES(OnLoan)
+"""
+
+
+async def up(connection) -> None:
+    await connection.execute(CREATE_TABLE)
+    async for first, last in key_ranges(connection, "Copies", "ISBN"):
+        await connection.execute(FILL, values={"first": first, "last": last})
+
+
+async def down(connection) -> None:
+    await connection.execute("DROP TABLE IF EXISTS BookAvailability")
@@ -0,0 +1,49 @@
+# migrations/0004_book_search.py
+# BookSearch, the FULLTEXT-indexed text of every book behind
+# GET /api/books/search (crud/search_crud.py). Databases created from
+# libraryDB.sql have the table but not the rows. The app keeps them up to
+# date from then on.
+#
+# The SQL is written out here, not imported from the app, so this migration
+# does the same thing whatever the app's code becomes.
+from migrations.runner import key_ranges
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS BookSearch (
+        ISBN CHAR(13) PRIMARY KEY,
+        Title VARCHAR(255) NOT NULL,
+        Categories VARCHAR(100),
+        Authors TEXT,
+        Publisher VARCHAR(100),
+        FULLTEXT INDEX ft_book_search_title (Title),
+        FULLTEXT INDEX ft_book_search_all (Title, Categories, Authors, Publisher),
+        CONSTRAINT fk_book_search_books FOREIGN KEY (ISBN)
+        REFERENCES Books(ISBN)
+        ON UPDATE CASCADE
+        ON DELETE CASCADE
+    )
+"""
+
+# one run of books: title, categories, authors (A-Z) and publisher
+FILL = """
+    INSERT INTO BookSearch (ISBN, Title, Categories, Authors, Publisher)
+    SELECT b.ISBN, b.Title, b.Categories,
+           (SELECT GROUP_CONCAT(ba.AuthorName ORDER BY ba.AuthorName SEPARATOR ', ')
+            FROM BookAuthors ba
+            WHERE ba.ISBN = b.ISBN) AS Authors,
+           b.PublishName AS Publisher
+    FROM Books b
+    WHERE b.ISBN BETWEEN :first AND :last
+    ON DUPLICATE KEY UPDATE Title = VALUES(Title), Categories = VALUES(Categories),
+                            Authors = VALUES(Authors), Publisher = VALUES(Publisher)
+"""
+
+
+async def up(connection) -> None:
+    await connection.execute(CREATE_TABLE)
+    async for first, last in key_ranges(connection, "Books", "ISBN"):
+        await connection.execute(FILL, values={"first": first, "last": last})
+
+
+async def down(connection) -> None:
+    await connection.execute("DROP TABLE IF EXISTS BookSearch")
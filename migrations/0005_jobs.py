@@ -0,0 +1,27 @@
+# migrations/0005_jobs.py
+# Jobs, the status and progress of background jobs (jobs.py).
+# Databases created from libraryDB.sql already have it.
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS Jobs (
+        JobID CHAR(32) PRIMARY KEY,
+        Kind VARCHAR(50) NOT NULL,
+        Status VARCHAR(10) NOT NULL,
+        Done INT NOT NULL DEFAULT 0,
+        Total INT,
+        Result TEXT,
+        Error TEXT,
+        CreatedAt DATETIME NOT NULL,
+        StartedAt DATETIME,
+        FinishedAt DATETIME,
+        INDEX idx_jobs_created (CreatedAt)
+    )
+"""
+
+
+async def up(connection) -> None:
+    await connection.execute(CREATE_TABLE)
+
+
+async def down(connection) -> None:
+    await connection.execute("DROP TABLE IF EXISTS Jobs")
@@ -0,0 +1,18 @@
+# migrations/0006_replica_heartbeat.py
+# ReplicaHeartbeat, the row the primary keeps writing and the read replicas'
+# lag is measured with (ReadRouter in database.py). Databases created from
+# libraryDB.sql already have it.
+
+
+async def up(connection) -> None:
+    await connection.execute("""
+        CREATE TABLE IF NOT EXISTS ReplicaHeartbeat (
+            ID INT PRIMARY KEY,
+            Beat DOUBLE NOT NULL
+        )
+    """)
+    await connection.execute("INSERT IGNORE INTO ReplicaHeartbeat (ID, Beat) VALUES (1, 0)")
+
+
+async def down(connection) -> None:
+    await connection.execute("DROP TABLE IF EXISTS ReplicaHeartbeat")
@@ -0,0 +1,3 @@
+-- the CopyID foreign key needs an index of its own again
+CREATE INDEX idx_loans_copy ON Loans (CopyID) ALGORITHM=INPLACE LOCK=NONE;
+DROP INDEX idx_loans_copy_return ON Loans ALGORITHM=INPLACE LOCK=NONE;
@@ -0,0 +1,8 @@
+-- The open loan of a copy: checkout and return (_lock_copies in
+-- crud/loans_crud.py) and the per-title availability counts behind the
+-- available / on-loan book lists (COUNT_COPIES in crud/availability_crud.py)
+-- look it up with CopyID = ? AND ReturnDate IS NULL. InnoDB keeps LoanID in
+-- every secondary index, so this one answers both without reading the rows.
+-- It also serves the CopyID foreign key, so MySQL drops the index it made
+-- for that.
+CREATE INDEX idx_loans_copy_return ON Loans (CopyID, ReturnDate) ALGORITHM=INPLACE LOCK=NONE;
@@ -0,0 +1,4 @@
+CREATE INDEX idx_reservations_queue
+    ON Reservations (BookReserved, AssignedCopyID, DateFor, ReservationID)
+    ALGORITHM=INPLACE LOCK=NONE;
+DROP INDEX idx_reservations_book_queue ON Reservations ALGORITHM=INPLACE LOCK=NONE;
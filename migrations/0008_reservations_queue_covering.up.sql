@@ -0,0 +1,11 @@
+-- A title's reservation queue (WAITING in crud/reservation_queue.py, loaded
+-- when a copy is returned or a reservation made): BookReserved = ? AND
+-- AssignedCopyID IS NULL ORDER BY DateFor, ReservationID, reading MemberID.
+-- idx_reservations_queue finds and orders the rows but has to read each one
+-- for MemberID; with MemberID at the end the index alone answers it. The new
+-- index is added before the old one is dropped because the BookReserved
+-- foreign key uses it.
+CREATE INDEX idx_reservations_book_queue
+    ON Reservations (BookReserved, AssignedCopyID, DateFor, ReservationID, MemberID)
+    ALGORITHM=INPLACE LOCK=NONE;
+DROP INDEX idx_reservations_queue ON Reservations ALGORITHM=INPLACE LOCK=NONE;
@@ -0,0 +1,3 @@
+-- the MemberID foreign key needs an index of its own again
+CREATE INDEX idx_loans_member ON Loans (MemberID) ALGORITHM=INPLACE LOCK=NONE;
+DROP INDEX idx_loans_member_return ON Loans ALGORITHM=INPLACE LOCK=NONE;
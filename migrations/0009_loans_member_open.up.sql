@@ -0,0 +1,12 @@
+-- A member's loans, and which of them are still out: MemberID = ? (the
+-- admin Loans search by member, the member loans report in libraryDB.sql)
+-- AND ReturnDate IS NULL. The foreign key index on MemberID finds the
+-- member's rows but reads each one for ReturnDate; with ReturnDate next to
+-- it the open ones come straight from the index. It also serves the MemberID
+-- foreign key, so MySQL drops the index it made for that.
+--
+-- The crud/books_crud.py lookups need nothing new: they go by the Books
+-- primary key or the BookAvailability indexes, and the Copies.ISBN foreign
+-- key index already holds CopyID (InnoDB keeps the primary key in every
+-- secondary index), so a title's copies are read from it alone.
+CREATE INDEX idx_loans_member_return ON Loans (MemberID, ReturnDate) ALGORITHM=INPLACE LOCK=NONE;
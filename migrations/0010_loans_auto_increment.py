@@ -0,0 +1,33 @@
+# migrations/0010_loans_auto_increment.py
+# Loans.LoanID AUTO_INCREMENT, so a checkout gets its ids from InnoDB instead
+# of reading MAX(LoanID) with a locking read every other checkout waited on.
+# Databases created from libraryDB.sql already have it.
+#
+# This one is not online: MySQL can only add AUTO_INCREMENT by copying the
+# table, which blocks writes to Loans (reads go on, LOCK=SHARED) until it is
+# done, so run it while the desks are closed. Fines.LoanID references the
+# column and MySQL won't change a referenced column with foreign_key_checks
+# on; the type stays INT, so the references stay valid.
+
+AUTO_INCREMENT = """
+    SELECT EXTRA LIKE '%auto_increment%' FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Loans' AND COLUMN_NAME = 'LoanID'
+"""
+
+
+async def _modify(connection, definition: str) -> None:
+    await connection.execute("SET SESSION foreign_key_checks = 0")
+    try:
+        await connection.execute(f"ALTER TABLE Loans MODIFY LoanID {definition}, ALGORITHM=COPY, LOCK=SHARED")
+    finally:
+        await connection.execute("SET SESSION foreign_key_checks = 1")
+
+
+async def up(connection) -> None:
+    if not await connection.fetch_val(AUTO_INCREMENT):
+        await _modify(connection, "INT NOT NULL AUTO_INCREMENT")
+
+
+async def down(connection) -> None:
+    if await connection.fetch_val(AUTO_INCREMENT):
+        await _modify(connection, "INT NOT NULL")
@@ -0,0 +1,34 @@
+# migrations/0011_loans_due_date_backfill.py
+# A DueDate for the loans made before Loans had one (0001 added it NULL), so
+# the fine engine, which only fines loans past their DueDate, sees them too.
+#
+# Loans has no checkout date to count the loan period from, so:
+#   - an open loan is due a loan period (LOAN_PERIOD_DAYS' default, 14
+#     days, fixed here so later changes to the setting don't change what
+#     this migration does) after the day this runs: a full period to bring
+#     the copy back before it is fined, not fines for days nobody knew were
+#     overdue
+#   - a returned loan is due on its ReturnDate: it was not overdue as far as
+#     anyone can tell, and it is not fined after the fact
+# Filled one run of MIGRATION_BATCH_SIZE LoanIDs per statement (key_ranges).
+#
+# down leaves the dates in place: they can't be told apart from the ones set
+# at checkout, and a NULL DueDate only hides a loan from the fine engine.
+from migrations.runner import key_ranges
+
+LOAN_PERIOD_DAYS = 14
+
+FILL = """
+    UPDATE Loans
+    SET DueDate = COALESCE(ReturnDate, CURDATE() + INTERVAL :period DAY)
+    WHERE LoanID BETWEEN :first AND :last AND DueDate IS NULL
+"""
+
+
+async def up(connection) -> None:
+    async for first, last in key_ranges(connection, "Loans", "LoanID"):
+        await connection.execute(FILL, values={"first": first, "last": last, "period": LOAN_PERIOD_DAYS})
+
+
+async def down(connection) -> None:
+    pass
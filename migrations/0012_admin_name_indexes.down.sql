@@ -0,0 +1,2 @@
+DROP INDEX idx_staff_name ON Staff ALGORITHM=INPLACE LOCK=NONE;
+DROP INDEX idx_members_name ON Members ALGORITHM=INPLACE LOCK=NONE;
@@ -0,0 +1,5 @@
+-- The admin Members and Staff list pages (views/sql_view.py): their search
+-- box is a prefix match on the name (LIKE 'term%') and they sort by it, so
+-- both read the name index instead of scanning the table.
+CREATE INDEX idx_members_name ON Members (MemName) ALGORITHM=INPLACE LOCK=NONE;
+CREATE INDEX idx_staff_name ON Staff (StaffName) ALGORITHM=INPLACE LOCK=NONE;
@@ -0,0 +1,303 @@
+# migrations/runner.py
+# Versioned schema changes for databases already created from libraryDB.sql.
+#
+#   python -m migrations.runner status
+#   python -m migrations.runner up              (apply every pending one)
+#   python -m migrations.runner up --to 1
+#   python -m migrations.runner down            (undo the last one)
+#   python -m migrations.runner down --to 0     (undo them all)
+#
+# A migration is a pair of files in this folder, NNNN_name.up.sql and
+# NNNN_name.down.sql: statements ending with ";" at the end of a line, "--"
+# comment lines allowed. Or, when it needs to look before it changes
+# something (a column the database may already have) or fills a table, one
+# NNNN_name.py module with `async def up(connection)` and
+# `async def down(connection)`, using the helpers at the end of this file.
+# Applied versions are recorded in the SchemaMigrations table with a checksum
+# of the up file / module (status flags a file edited after it was applied:
+# add a new migration instead).
+#
+# Run it as a deploy step, not from the app. It is safe to run while the app
+# serves traffic:
+#   - write index and column changes with ALGORITHM=INPLACE LOCK=NONE, so
+#     MySQL makes them without blocking reads and writes, or fails right away
+#     if it can't (it never silently falls back to a table copy)
+#   - fill new tables in batches of MIGRATION_BATCH_SIZE keys (key_ranges),
+#     not with one statement that locks every source row
+#   - DDL waits at most MIGRATION_LOCK_WAIT_TIMEOUT seconds for the table's
+#     metadata lock (a long transaction holds it); waiting longer would queue
+#     every query behind the migration
+#   - a named lock (GET_LOCK) keeps two deploys from migrating at once
+# MySQL can't roll DDL back, so a migration that fails part way is not
+# recorded: fix it and run `up` again (its statements that did run may need
+# undoing by hand first).
+#
+# The same files run on the benchmarks' SQLite database (benchmarks/seed.py),
+# minus the MySQL-only options. .py migrations skip it (its schema is built
+# from libraryDB.sql, which already has what they add).
+import argparse
+import asyncio
+import hashlib
+import importlib
+import os
+import re
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from database import database, IS_MYSQL
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_TABLE = "SchemaMigrations"
+
+# seconds a migration statement waits for a table's metadata lock (MySQL)
+MIGRATION_LOCK_WAIT_TIMEOUT = int(os.getenv("MIGRATION_LOCK_WAIT_TIMEOUT", "5"))
+# seconds to wait for another running migration before giving up
+MIGRATION_RUN_LOCK_TIMEOUT = int(os.getenv("MIGRATION_RUN_LOCK_TIMEOUT", "60"))
+RUN_LOCK_NAME = "library_schema_migrations"
+# keys per statement when a migration fills a table
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "1000"))
+
+FILE_NAME = re.compile(r"^(\d{4})_(\w+)\.(up\.sql|down\.sql|py)$")
+
+CREATE_HISTORY = f"""
+    CREATE TABLE IF NOT EXISTS {HISTORY_TABLE} (
+        Version INT PRIMARY KEY,
+        Name VARCHAR(100) NOT NULL,
+        Checksum CHAR(64) NOT NULL,
+        AppliedAt DATETIME NOT NULL,
+        DurationMs INT NOT NULL
+    )
+"""
+
+
+class Migration:
+    def __init__(self, version: int, name: str, is_module: bool = False):
+        self.version = version
+        self.name = name
+        self.is_module = is_module
+
+    def path(self, direction: str) -> str:
+        if self.is_module:
+            return os.path.join(MIGRATIONS_DIR, f"{self.version:04d}_{self.name}.py")
+        return os.path.join(MIGRATIONS_DIR, f"{self.version:04d}_{self.name}.{direction}.sql")
+
+    def checksum(self) -> str:
+        with open(self.path("up"), "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+
+    def statements(self, direction: str) -> List[str]:
+        with open(self.path(direction)) as file:
+            return split_statements(file.read())
+
+    def module(self):
+        return importlib.import_module(f"migrations.{self.version:04d}_{self.name}")
+
+
+# ===================================================================
+# FILES
+# ===================================================================
+
+# Statements of a .sql file (comment lines dropped)
+def split_statements(sql: str) -> List[str]:
+    statements = []
+    current: List[str] = []
+    for line in sql.splitlines():
+        if not line.strip() or line.lstrip().startswith("--"):
+            continue
+        current.append(line)
+        if line.rstrip().endswith(";"):
+            statements.append("\n".join(current).rstrip().rstrip(";"))
+            current = []
+    if current:
+        raise ValueError(f"Statement without a closing ';': {' '.join(current)[:80]}")
+    return statements
+
+
+# The migrations in this folder, oldest first
+def discover() -> List[Migration]:
+    found: Dict[int, Dict[str, str]] = {}
+    for file_name in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = FILE_NAME.match(file_name)
+        if match:
+            version, name, kind = int(match.group(1)), match.group(2), match.group(3)
+            found.setdefault(version, {})[kind] = name
+    migrations = []
+    for version, names in sorted(found.items()):
+        if set(names) == {"py"}:
+            migrations.append(Migration(version, names["py"], is_module=True))
+        elif set(names) == {"up.sql", "down.sql"} and names["up.sql"] == names["down.sql"]:
+            migrations.append(Migration(version, names["up.sql"]))
+        else:
+            raise ValueError(
+                f"Migration {version:04d} needs one .up.sql and one .down.sql file with the same name, or one .py file"
+            )
+    return migrations
+
+
+# MySQL DDL -> SQLite: no online DDL options, DROP INDEX without ON table
+def for_sqlite(statement: str) -> str:
+    statement = re.sub(r",?\s*\b(ALGORITHM|LOCK)\s*=?\s*\w+", "", statement, flags=re.I)
+    return re.sub(r"^(\s*DROP INDEX \w+)\s+ON\s+\w+", r"\1", statement, flags=re.I)
+
+
+# ===================================================================
+# RUN
+# ===================================================================
+
+async def _applied(connection) -> Dict[int, dict]:
+    await connection.execute(CREATE_HISTORY)
+    rows = await connection.fetch_all(f"SELECT Version, Name, Checksum, AppliedAt FROM {HISTORY_TABLE}")
+    return {row["Version"]: dict(row) for row in rows}
+
+
+async def _run(connection, migration: Migration, direction: str) -> int:
+    started = time.perf_counter()
+    if migration.is_module:
+        if IS_MYSQL:
+            await getattr(migration.module(), direction)(connection)
+    else:
+        for statement in migration.statements(direction):
+            await connection.execute(statement if IS_MYSQL else for_sqlite(statement))
+    return round((time.perf_counter() - started) * 1000)
+
+
+# Apply (up) or undo (down) migrations up to version `target`; returns
+# what was done, one line per migration
+async def migrate(direction: str = "up", target: Optional[int] = None) -> List[str]:
+    migrations = discover()
+    done = []
+    async with database.connection() as connection:
+        if IS_MYSQL:
+            locked = await connection.fetch_val(
+                "SELECT GET_LOCK(:name, :timeout)", values={"name": RUN_LOCK_NAME, "timeout": MIGRATION_RUN_LOCK_TIMEOUT}
+            )
+            if locked != 1:
+                raise RuntimeError("Another migration run holds the lock, try again later")
+            await connection.execute(f"SET SESSION lock_wait_timeout = {MIGRATION_LOCK_WAIT_TIMEOUT}")
+        try:
+            applied = await _applied(connection)
+            if direction == "up":
+                for migration in migrations:
+                    if migration.version in applied or (target is not None and migration.version > target):
+                        continue
+                    duration_ms = await _run(connection, migration, "up")
+                    await connection.execute(
+                        f"""
+                        INSERT INTO {HISTORY_TABLE} (Version, Name, Checksum, AppliedAt, DurationMs)
+                        VALUES (:version, :name, :checksum, :applied_at, :duration_ms)
+                        """,
+                        values={
+                            "version": migration.version, "name": migration.name, "checksum": migration.checksum(),
+                            "applied_at": datetime.now(), "duration_ms": duration_ms,
+                        },
+                    )
+                    done.append(f"applied {migration.version:04d}_{migration.name} ({duration_ms} ms)")
+            else:
+                # default: undo only the last one
+                if target is None:
+                    target = max(applied, default=1) - 1
+                for migration in reversed(migrations):
+                    if migration.version not in applied or migration.version <= target:
+                        continue
+                    duration_ms = await _run(connection, migration, "down")
+                    await connection.execute(
+                        f"DELETE FROM {HISTORY_TABLE} WHERE Version = :version", values={"version": migration.version}
+                    )
+                    done.append(f"undone {migration.version:04d}_{migration.name} ({duration_ms} ms)")
+        finally:
+            if IS_MYSQL:
+                await connection.fetch_val("SELECT RELEASE_LOCK(:name)", values={"name": RUN_LOCK_NAME})
+    return done
+
+
+# One line per migration: applied or pending, and edited-after-applying
+async def status() -> List[str]:
+    async with database.connection() as connection:
+        applied = await _applied(connection)
+    lines = []
+    for migration in discover():
+        entry = applied.get(migration.version)
+        if entry is None:
+            state = "pending"
+        else:
+            state = f"applied {entry['AppliedAt']}"
+            if entry["Checksum"] != migration.checksum():
+                state += " (file changed since!)"
+        lines.append(f"{migration.version:04d}_{migration.name:<40} {state}")
+    return lines
+
+
+# ===================================================================
+# HELPERS FOR .py MIGRATIONS (MySQL, on the migration's connection)
+# ===================================================================
+
+async def column_exists(connection, table: str, column: str) -> bool:
+    return bool(await connection.fetch_val("""
+        SELECT EXISTS (
+            SELECT 1 FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND COLUMN_NAME = :column
+        )
+    """, values={"table": table, "column": column}))
+
+
+async def index_exists(connection, table: str, index: str) -> bool:
+    return bool(await connection.fetch_val("""
+        SELECT EXISTS (
+            SELECT 1 FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_NAME = :index
+        )
+    """, values={"table": table, "index": index}))
+
+
+# Name of the foreign key on table.column, None if it has none (the ones
+# libraryDB.sql declares without a name get generated names)
+async def foreign_key_name(connection, table: str, column: str) -> Optional[str]:
+    return await connection.fetch_val("""
+        SELECT CONSTRAINT_NAME FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND COLUMN_NAME = :column
+          AND REFERENCED_TABLE_NAME IS NOT NULL
+        LIMIT 1
+    """, values={"table": table, "column": column})
+
+
+# (first, last) values of table.key in consecutive runs of `size` keys, to
+# fill a table one short statement per run
+async def key_ranges(
+    connection, table: str, key: str, size: int = MIGRATION_BATCH_SIZE
+) -> AsyncIterator[Tuple[str, str]]:
+    last = None
+    while True:
+        after = "" if last is None else f"WHERE {key} > :last"
+        rows = await connection.fetch_all(
+            f"SELECT DISTINCT {key} FROM {table} {after} ORDER BY {key} LIMIT {size}",
+            values={} if last is None else {"last": last},
+        )
+        keys = [row[key] for row in rows if row[key] is not None]
+        if not keys:
+            return
+        yield keys[0], keys[-1]
+        last = keys[-1]
+
+
+async def run_once(command: str, target: Optional[int]) -> List[str]:
+    await database.connect()
+    try:
+        if command == "status":
+            return await status()
+        return await migrate(command, target) or ["nothing to do"]
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply or undo schema migrations")
+    parser.add_argument("command", choices=["status", "up", "down"])
+    parser.add_argument("--to", type=int, default=None, help="target version (up: apply up to it, down: undo above it)")
+    args = parser.parse_args()
+    for line in asyncio.run(run_once(args.command, args.to)):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
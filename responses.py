@@ -0,0 +1,67 @@
+# responses.py
+# Fast path from SQL rows to JSON bytes for the list endpoints.
+#
+# List rows come from our own SELECTs, so their types are already right.
+# Validating every row into a Pydantic model in crud/, then validating the
+# models again through the route's response_model and walking them with
+# jsonable_encoder was most of the CPU time of a 1000-row page. Instead:
+#   - crud list functions build their models with trusted() (model_construct,
+#     no validation)
+#   - list routes return fast_json(rows, response): one encode to bytes with
+#     orjson (json + jsonable_encoder if orjson is not installed). FastAPI
+#     sends a returned Response as is, so response_model is not applied a
+#     second time; keep response_model on the route for the OpenAPI docs.
+#
+# Only use trusted() for rows read from the database, never for request data.
+# benchmarks/encode.py compares this path with the validating one.
+import json
+from decimal import Decimal
+from typing import Any, Iterable, List, Optional, Type, TypeVar
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, see requirements.txt
+    orjson = None
+
+M = TypeVar("M", bound=BaseModel)
+
+
+# Models for rows straight from the database, without validation
+def trusted(model: Type[M], rows: Iterable[Any]) -> List[M]:
+    return [model.model_construct(**dict(row)) for row in rows]
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        # a constructed model holds its field values in __dict__
+        return obj.__dict__
+    if isinstance(obj, Decimal):
+        # MySQL's SUM() is a DECIMAL even for counts
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+# JSON bytes for models, dicts, lists, dates...
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Response for a list endpoint; copies the headers set on the route's
+# Response parameter (e.g. X-Next-Cursor from set_next_cursor)
+def fast_json(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    headers = None
+    if response is not None:
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return FastJSONResponse(content, headers=headers)
@@ -1,91 +1,115 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from database import database
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 from schemas.authors import Authors
 from crud.authors_crud import (
     get_authors, get_author, create_author,
-    update_author, delete_author
+    update_author, delete_author, delete_authors
 )
+from crud.pagination import set_next_cursor
+from crud.export_crud import export_response
+from jobs import submit, job_accepted
+from http_cache import cached_json
+from crud.authors_crud import upsert_authors
+from crud.bulk import BulkLoadError, bulk_summary
+from schemas.bulk import BulkResult
+from responses import trusted
 
 router = APIRouter(prefix="/api/authors", tags=["Authors"])
 
 # ===============================
-# GET all authors
+# GET all authors (cached, answers If-None-Match with 304)
 # ===============================
 @router.get("/", response_model=List[Authors])
-async def api_get_authors(skip: int = 0, limit: int = 1000):
-    async with database:
-        rows = await get_authors(skip, limit)
-        result = []
-        for r in rows:
-            row = dict(r._mapping)
-            # Convert DOB to string for Pydantic
-            if row.get("DOB"):
-                row["DOB"] = row["DOB"].isoformat()
-            result.append(Authors(**row))
-        return result
+async def api_get_authors(request: Request, skip: int = 0, limit: int = 1000, cursor: Optional[str] = None):
+    async def load(response: Response):
+        rows = await get_authors(skip, limit, cursor)
+        set_next_cursor(response, rows, ["AuthorName"], limit)
+        return trusted(Authors, rows)
+    return await cached_json(request, ["Authors"], load)
+
+# ===============================
+# GET: Stream every author as NDJSON or CSV
+# ===============================
+@router.get("/export")
+async def api_export_authors(format: str = "ndjson"):
+    return export_response("authors", format)
 
 # ===============================
 # GET one author by name
 # ===============================
 @router.get("/{author_name}", response_model=Authors)
 async def api_get_author(author_name: str):
-    async with database:
-        author = await get_author(author_name)
-        if not author:
-            raise HTTPException(status_code=404, detail="Author not found")
-        if author.get("DOB"):
-            author["DOB"] = author["DOB"].isoformat()
-        return Authors(**author)
+    author = await get_author(author_name)
+    if not author:
+        raise HTTPException(status_code=404, detail="Author not found")
+    if author.get("DOB"):
+        author["DOB"] = author["DOB"].isoformat()
+    return Authors(**author)
 
 # ===============================
 # POST: Create new author
 # ===============================
 @router.post("/", response_model=Authors)
 async def api_create_author(author: Authors):
-    async with database:
-        try:
-            dob_value = str(author.DOB) if author.DOB else None
-            await create_author(author.AuthorName, dob_value, author.Nationality)
-            return author
-        except ValueError as err:
-            raise HTTPException(status_code=400, detail=str(err))
+    try:
+        dob_value = str(author.DOB) if author.DOB else None
+        await create_author(author.AuthorName, dob_value, author.Nationality)
+        return author
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+# ===============================
+# POST: Create or update many authors
+# ===============================
+@router.post("/bulk", response_model=BulkResult)
+async def api_upsert_authors(authors: List[Authors]):
+    if not authors:
+        raise HTTPException(status_code=400, detail="No authors provided")
+    rows = [
+        {
+            "AuthorName": author.AuthorName,
+            "DOB": str(author.DOB) if author.DOB else None,
+            "Nationality": author.Nationality,
+        }
+        for author in authors
+    ]
+    try:
+        results = await upsert_authors(rows)
+    except BulkLoadError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    return bulk_summary(results)
 
 # ===============================
 # PUT: Update existing author
 # ===============================
 @router.put("/", response_model=Authors)
 async def api_update_author(author: Authors):
-    async with database:
-        try:
-            dob_value = str(author.DOB) if author.DOB else None
-            await update_author(author.AuthorName, dob_value, author.Nationality)
-            return author
-        except ValueError as err:
-            raise HTTPException(status_code=400, detail=str(err))
+    try:
+        dob_value = str(author.DOB) if author.DOB else None
+        await update_author(author.AuthorName, dob_value, author.Nationality)
+        return author
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
 
 # ===============================
 # DELETE: Delete a single author
 # ===============================
 @router.delete("/{author_name}")
 async def api_delete_author(author_name: str):
-    async with database:
-        deleted = await delete_author(author_name)
-        if deleted == 0:
-            raise HTTPException(status_code=404, detail="Author not found")
-        return {"detail": f"Author '{author_name}' deleted"}
+    deleted = await delete_author(author_name)
+    if deleted == 0:
+        raise HTTPException(status_code=404, detail="Author not found")
+    return {"detail": f"Author '{author_name}' deleted"}
 
 # ===============================
-# DELETE many authors
+# DELETE many authors (background job: 202 + JobID, poll GET /api/jobs/{id})
 # ===============================
-@router.delete("/batch/")
+@router.delete("/batch/", status_code=202)
 async def api_delete_authors(author_names: List[str]):
-    async with database:
-        deleted_count = 0
-        for author_name in author_names:
-            deleted = await delete_author(author_name)
-            if deleted:
-                deleted_count += 1
-        if deleted_count == 0:
-            raise HTTPException(status_code=404, detail="No authors found to delete")
-        return {"detail": f"Deleted {deleted_count} authors"}
+    if not author_names:
+        raise HTTPException(status_code=400, detail="No author names provided")
+
+    async def run(job):
+        await job.in_chunks(author_names, delete_authors)
+        return {"detail": f"Deleted up to {len(author_names)} authors"}
+    return job_accepted(await submit("delete authors", run))
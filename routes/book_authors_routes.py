@@ -1,6 +1,5 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from database import database
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 from schemas.book_authors import BookAuthor
 from crud.book_authors_crud import (
     get_book_authors,
@@ -11,59 +10,78 @@ from crud.book_authors_crud import (
     delete_authors_by_book,
     delete_books_by_author
 )
+from crud.pagination import set_next_cursor
+from crud.export_crud import export_response
+from http_cache import cached_json
+from crud.book_authors_crud import upsert_book_authors
+from crud.bulk import BulkLoadError, bulk_summary
+from schemas.bulk import BulkResult
+from responses import fast_json, trusted
 
 router = APIRouter(prefix="/api/book-authors", tags=["BookAuthors"])
 
 
-# GET all book-author relationships
+# GET all book-author relationships (cached, answers If-None-Match with 304)
 @router.get("/", response_model=List[BookAuthor])
-async def api_get_book_authors(skip: int = 0, limit: int = 1000):
-    async with database:
-        rows = await get_book_authors(skip, limit)
-        return [BookAuthor(**dict(r._mapping)) for r in rows]
+async def api_get_book_authors(request: Request, skip: int = 0, limit: int = 1000, cursor: Optional[str] = None):
+    async def load(response: Response):
+        rows = await get_book_authors(skip, limit, cursor)
+        set_next_cursor(response, rows, ["ISBN", "AuthorName"], limit)
+        return trusted(BookAuthor, rows)
+    return await cached_json(request, ["BookAuthors"], load)
+
+# GET export of every row as NDJSON or CSV (streamed)
+@router.get("/export")
+async def api_export_book_authors(format: str = "ndjson"):
+    return export_response("book-authors", format)
 
 # GET all authors for a specific book
 @router.get("/book/{isbn}", response_model=List[BookAuthor])
 async def api_get_authors_by_book(isbn: str):
-    async with database:
-        rows = await get_authors_by_book(isbn)
-        return [BookAuthor(**r) for r in rows]
-    
+    rows = await get_authors_by_book(isbn)
+    return fast_json(trusted(BookAuthor, rows))
+
 # GET all books for a specific author
 @router.get("/author/{author_name}", response_model=List[BookAuthor])
 async def api_get_books_by_author(author_name: str):
-    async with database:
-        rows = await get_books_by_author(author_name)
-        return [BookAuthor(**r) for r in rows]
+    rows = await get_books_by_author(author_name)
+    return fast_json(trusted(BookAuthor, rows))
 
 # POST: Create new book-author relationship
 @router.post("/", response_model=BookAuthor)
 async def api_create_book_author(rel: BookAuthor):
-    async with database:
-        try:
-            return await create_book_author(rel.ISBN, rel.AuthorName)
-        except ValueError as err:
-            raise HTTPException(status_code=400, detail=str(err))
-        
+    try:
+        return await create_book_author(rel.ISBN, rel.AuthorName)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+# POST: Create many book-author relationships (existing ones are kept)
+@router.post("/bulk", response_model=BulkResult)
+async def api_upsert_book_authors(rels: List[BookAuthor]):
+    if not rels:
+        raise HTTPException(status_code=400, detail="No relationships provided")
+    try:
+        results = await upsert_book_authors([rel.dict() for rel in rels])
+    except BulkLoadError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    return bulk_summary(results)
+
 # DELETE a single book-author relationship
 @router.delete("/{isbn}/{author_name}")
 async def api_delete_book_author(isbn: str, author_name: str):
-    async with database:
-        deleted = await delete_book_author(isbn, author_name)
-        if deleted == 0:
-            raise HTTPException(status_code=404, detail="Relationship not found")
-        return {"detail": f"Deleted relationship ISBN={isbn}, Author={author_name}"}
+    deleted = await delete_book_author(isbn, author_name)
+    if deleted == 0:
+        raise HTTPException(status_code=404, detail="Relationship not found")
+    return {"detail": f"Deleted relationship ISBN={isbn}, Author={author_name}"}
 
 # DELETE all authors for a book
 @router.delete("/book/{isbn}")
 async def api_delete_authors_by_book(isbn: str):
-    async with database:
-        deleted = await delete_authors_by_book(isbn)
-        return {"detail": f"Deleted {deleted} author(s) for book {isbn}"}
+    deleted = await delete_authors_by_book(isbn)
+    return {"detail": f"Deleted {deleted} author(s) for book {isbn}"}
 
 # DELETE all books for an author
 @router.delete("/author/{author_name}")
 async def api_delete_books_by_author(author_name: str):
-    async with database:
-        deleted = await delete_books_by_author(author_name)
-        return {"detail": f"Deleted {deleted} book(s) for author {author_name}"}
\ No newline at end of file
+    deleted = await delete_books_by_author(author_name)
+    return {"detail": f"Deleted {deleted} book(s) for author {author_name}"}
\ No newline at end of file
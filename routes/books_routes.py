@@ -1,25 +1,82 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 from schemas.books import Books
 from crud.books_crud import get_books, get_book, create_book, update_book, delete_book
 from crud.books_crud import get_books_available_for_loan, get_books_on_loan
+from crud.pagination import set_next_cursor
+from crud.export_crud import export_response
+from jobs import submit, job_accepted
+from http_cache import cached_json
+from crud.availability_crud import get_availability, get_book_availability
+from schemas.availability import BookAvailability
+from schemas.bulk import BulkResult
+from crud.books_crud import upsert_books
+from crud.bulk import BulkLoadError, bulk_summary
+from crud.search_crud import search_books
+from schemas.search import BookSearchResult
+from responses import fast_json
 
 router = APIRouter(prefix="/api/books", tags=["books"])
 
-# GET all books
+# GET all books (cached, answers If-None-Match with 304)
+# Pass the X-Next-Cursor response header back as ?cursor= for the next page
 @router.get("/", response_model=List[Books])
-async def api_get_books(skip: int = 0, limit: int = 100):
-    return await get_books(skip, limit)
+async def api_get_books(request: Request, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    async def load(response: Response):
+        books = await get_books(skip, limit, cursor)
+        set_next_cursor(response, books, ["ISBN"], limit)
+        return books
+    return await cached_json(request, ["Books"], load)
+
+# GET export of every row as NDJSON or CSV (streamed)
+@router.get("/export")
+async def api_export_books(format: str = "ndjson"):
+    return export_response("books", format)
 
 # GET books available for loan
 @router.get("/available", response_model=List[Books])
-async def api_get_books_available_for_loan(skip: int = 0, limit: int = 100):
-    return await get_books_available_for_loan(skip, limit)
+async def api_get_books_available_for_loan(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    books = await get_books_available_for_loan(skip, limit, cursor)
+    set_next_cursor(response, books, ["ISBN"], limit)
+    return fast_json(books, response)
 
 # GET books currently on loan (need reservation)
 @router.get("/on-loan", response_model=List[Books])
-async def api_get_books_on_loan(skip: int = 0, limit: int = 100):
-    return await get_books_on_loan(skip, limit)
+async def api_get_books_on_loan(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    books = await get_books_on_loan(skip, limit, cursor)
+    set_next_cursor(response, books, ["ISBN"], limit)
+    return fast_json(books, response)
+
+# GET full-text search over title, categories, authors and publisher
+# Every word must match, as a prefix ("harr pott"); best matches first
+@router.get("/search", response_model=List[BookSearchResult])
+async def api_search_books(q: str, skip: int = 0, limit: int = 20):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q must not be empty")
+    return fast_json(await search_books(q, skip, min(limit, 100)))
+
+# GET copy counts per title (status = available | on-loan to filter)
+@router.get("/availability", response_model=List[BookAvailability])
+async def api_get_availability(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    if status not in (None, "available", "on-loan"):
+        raise HTTPException(status_code=400, detail="status must be 'available' or 'on-loan'")
+    counts = await get_availability(skip, limit, cursor, status)
+    set_next_cursor(response, counts, ["ISBN"], limit)
+    return fast_json(counts, response)
+
+# GET copy counts for one title
+@router.get("/{isbn}/availability", response_model=BookAvailability)
+async def api_get_book_availability(isbn: str):
+    counts = await get_book_availability(isbn)
+    if not counts:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return counts
 
 
 # POST create book
@@ -30,6 +87,17 @@ async def api_create_book(book: Books):
         raise HTTPException(status_code=400, detail="Book already exists")
     return await create_book(book)
 
+# POST create or update many books (publisher feeds)
+@router.post("/bulk", response_model=BulkResult)
+async def api_upsert_books(books: List[Books]):
+    if not books:
+        raise HTTPException(status_code=400, detail="No books provided")
+    try:
+        results = await upsert_books(books)
+    except BulkLoadError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    return bulk_summary(results)
+
 # PUT update book
 @router.put("/", response_model=Books)
 async def api_update_book(book: Books):
@@ -38,14 +106,20 @@ async def api_update_book(book: Books):
         raise HTTPException(status_code=404, detail="Book not found")
     return await update_book(book)
 
-# DELETE book
-@router.delete("/{isbn}")
+# DELETE book (cascades to its authors links and search row, so it runs as a
+# background job: 202 + JobID, poll GET /api/jobs/{id})
+@router.delete("/{isbn}", status_code=202)
 async def api_delete_book(isbn: str):
     existing = await get_book(isbn)
     if not existing:
         raise HTTPException(status_code=404, detail="Book not found")
-    await delete_book(isbn)
-    return {"detail": "Book deleted"}
+
+    async def run(job):
+        await job.progress(0, 1)
+        await delete_book(isbn)
+        await job.progress(1)
+        return {"detail": "Book deleted"}
+    return job_accepted(await submit("delete book", run))
 
 # GET single book
 @router.get("/{isbn}", response_model=Books)
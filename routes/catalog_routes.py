@@ -0,0 +1,27 @@
+# routes/catalog_routes.py
+from fastapi import APIRouter, HTTPException, Response
+from typing import List, Optional
+from schemas.catalog import CatalogBook
+from crud.catalog_crud import get_catalog_view, CATALOG_STATUS
+from crud.pagination import set_next_cursor
+from responses import fast_json
+
+router = APIRouter(prefix="/api/catalog", tags=["Catalog"])
+
+
+# GET books with authors, publisher contact and copy counts in one call
+# (status = available | on-loan to filter; X-Next-Cursor for the next page)
+@router.get("/view", response_model=List[CatalogBook])
+async def api_get_catalog_view(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    if status not in CATALOG_STATUS:
+        raise HTTPException(status_code=400, detail="status must be 'available' or 'on-loan'")
+    limit = min(limit, 500)
+    books = await get_catalog_view(skip, limit, cursor, status)
+    set_next_cursor(response, books, ["ISBN"], limit)
+    return fast_json(books, response)
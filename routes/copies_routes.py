@@ -1,51 +1,70 @@
-from fastapi import APIRouter, HTTPException
-from database import database
+from fastapi import APIRouter, HTTPException, Response
 from schemas.copies import Copies
 from crud.copies_crud import get_copies, get_copy, create_copy, update_copy, delete_copy, delete_copies
+from crud.pagination import set_next_cursor
+from crud.export_crud import export_response
+from jobs import submit, job_accepted
+from crud.copies_crud import upsert_copies
+from crud.bulk import BulkLoadError, bulk_summary
+from schemas.bulk import BulkResult
+from responses import fast_json, trusted
 
 router = APIRouter(prefix="/api/copies", tags=["Copies"])
 
 @router.get("/", response_model=list[Copies])
-async def api_get_copies(skip: int = 0, limit: int = 10):
-    async with database:
-        rows = await get_copies(skip=skip, limit=limit)
-        return [Copies(**dict(r)) for r in rows]
+async def api_get_copies(response: Response, skip: int = 0, limit: int = 10, cursor: str | None = None):
+    rows = await get_copies(skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, rows, ["CopyID"], limit)
+    return fast_json(trusted(Copies, rows), response)
+
+@router.get("/export")
+async def api_export_copies(format: str = "ndjson"):
+    return export_response("copies", format)
 
 @router.get("/{copy_id}", response_model=Copies)
 async def api_get_copy(copy_id: int):
-    async with database:
-        copy = await get_copy(copy_id)
-        if not copy:
-            raise HTTPException(status_code=404, detail="Copy not found")
-        return Copies(**copy)
+    copy = await get_copy(copy_id)
+    if not copy:
+        raise HTTPException(status_code=404, detail="Copy not found")
+    return Copies(**copy)
 
 @router.post("/", response_model=Copies)
 async def api_create_copy(copy: Copies):
-    async with database:
-        try:
-            await create_copy(copy.CopyID, copy.ISBN, copy.ShelfLocation, copy.ConditionDesc)
-            return copy
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        await create_copy(copy.CopyID, copy.ISBN, copy.ShelfLocation, copy.ConditionDesc)
+        return copy
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bulk", response_model=BulkResult)
+async def api_upsert_copies(copies: list[Copies]):
+    if not copies:
+        raise HTTPException(status_code=400, detail="No copies provided")
+    try:
+        results = await upsert_copies([copy.dict() for copy in copies])
+    except BulkLoadError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    return bulk_summary(results)
 
 @router.put("/", response_model=Copies)
 async def api_update_copy(copy: Copies):
-    async with database:
-        await update_copy(copy.CopyID, copy.ISBN, copy.ShelfLocation, copy.ConditionDesc)
-        return copy
+    await update_copy(copy.CopyID, copy.ISBN, copy.ShelfLocation, copy.ConditionDesc)
+    return copy
 
 @router.delete("/{copy_id}")
 async def api_delete_copy(copy_id: int):
-    async with database:
-        deleted = await delete_copy(copy_id)
-        if deleted == 0:
-            raise HTTPException(status_code=404, detail="Copy not found")
-        return {"detail": "Copy deleted"}
+    deleted = await delete_copy(copy_id)
+    if deleted == 0:
+        raise HTTPException(status_code=404, detail="Copy not found")
+    return {"detail": "Copy deleted"}
 
-@router.delete("/")
+# Runs as a background job: 202 + JobID, poll GET /api/jobs/{id}
+@router.delete("/", status_code=202)
 async def api_delete_copies(copy_ids: list[int]):
-    async with database:
-        if not copy_ids:
-            raise HTTPException(status_code=400, detail="No copy IDs provided for deletion.")
-        deleted_count = await delete_copies(copy_ids)
-        return {"detail": f"Deleted {deleted_count} copies."}
+    if not copy_ids:
+        raise HTTPException(status_code=400, detail="No copy IDs provided for deletion.")
+
+    async def run(job):
+        await job.in_chunks(copy_ids, delete_copies)
+        return {"detail": f"Deleted up to {len(copy_ids)} copies."}
+    return job_accepted(await submit("delete copies", run))
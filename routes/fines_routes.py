@@ -1,14 +1,34 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Response
+from typing import List, Optional
+from datetime import date
 from schemas.fines import Fines
 from crud.fines_crud import get_fines, get_fine, create_fine, update_fine, delete_fine
+from crud.pagination import set_next_cursor
+from crud.export_crud import export_response
+from crud.fine_engine import JOB_KIND, fines_job
+from jobs import submit, job_accepted
+from responses import fast_json
 
 router = APIRouter(prefix="/api/fines", tags=["fines"])
 
 # GET all fines
 @router.get("/", response_model=List[Fines])
-async def api_get_fines(skip: int = 0, limit: int = 100):
-    return await get_fines(skip, limit)
+async def api_get_fines(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    fines = await get_fines(skip, limit, cursor)
+    set_next_cursor(response, fines, ["FineID"], limit)
+    return fast_json(fines, response)
+
+# GET export of every row as NDJSON or CSV (streamed)
+@router.get("/export")
+async def api_export_fines(format: str = "ndjson"):
+    return export_response("fines", format)
+
+# POST run the fine engine now (fines every overdue loan, as of today by
+# default); it scans every loan, so it runs as a background job: 202 + JobID,
+# poll GET /api/jobs/{id} (its Result is the engine's summary)
+@router.post("/compute", status_code=202)
+async def api_compute_fines(today: Optional[date] = None):
+    return job_accepted(await submit(JOB_KIND, fines_job, today))
 
 # GET single fine
 @router.get("/{fine_id}", response_model=Fines)
@@ -0,0 +1,20 @@
+# routes/jobs_routes.py
+from fastapi import APIRouter, HTTPException
+from typing import List
+from schemas.jobs import Jobs
+from jobs import get_job, get_jobs
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+# GET recent background jobs, newest first
+@router.get("/", response_model=List[Jobs])
+async def api_get_jobs(limit: int = 50):
+    return await get_jobs(min(limit, 500))
+
+# GET status and progress of one job (the Location of a 202 response)
+@router.get("/{job_id}", response_model=Jobs)
+async def api_get_job(job_id: str):
+    job = await get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,21 +1,51 @@
 # routes/loans_routes.py
-from fastapi import APIRouter, HTTPException
-from typing import List
-from schemas.loans import Loans
+from fastapi import APIRouter, HTTPException, Response
+from typing import List, Optional
+from schemas.loans import Loans, LoanCheckout, LoanReturn, LoanReturned
 from crud.loans_crud import (
     get_loans,
     get_loan,
     create_loan,
     update_loan,
     delete_loan,
+    checkout_copies,
+    return_copies,
 )
+from crud.pagination import set_next_cursor
+from crud.export_crud import export_response
+from responses import fast_json
 
 router = APIRouter(prefix="/api/loans", tags=["Loans"])
 
 
 @router.get("/", response_model=List[Loans])
-async def api_get_loans(skip: int = 0, limit: int = 100):
-    return await get_loans(skip=skip, limit=limit)
+async def api_get_loans(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    loans = await get_loans(skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, loans, ["LoanID"], limit)
+    return fast_json(loans, response)
+
+
+@router.get("/export")
+async def api_export_loans(format: str = "ndjson"):
+    return export_response("loans", format)
+
+
+# Checkout desk: lend all scanned copies in one transaction
+# (409 if any copy is already on loan, nothing is saved then)
+@router.post("/checkout", response_model=List[Loans])
+async def api_checkout(checkout: LoanCheckout):
+    if not checkout.CopyIDs:
+        raise HTTPException(status_code=400, detail="No copies provided")
+    return await checkout_copies(checkout.MemberID, checkout.StaffID, checkout.CopyIDs)
+
+
+# Return desk: close the open loans of all scanned copies in one transaction
+# (HeldFor = reservation the copy now goes to the hold shelf for)
+@router.post("/return", response_model=List[LoanReturned])
+async def api_return(loan_return: LoanReturn):
+    if not loan_return.CopyIDs:
+        raise HTTPException(status_code=400, detail="No copies provided")
+    return await return_copies(loan_return.CopyIDs, loan_return.ReturnDate)
 
 
 @router.get("/{loan_id}", response_model=Loans)
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Response
+from typing import List, Optional
 from schemas.members import Members
 from crud.members_crud import get_members, get_member, create_member, update_member, delete_member
+from crud.pagination import set_next_cursor
+from crud.export_crud import export_response
+from responses import fast_json
 
 router = APIRouter(
     prefix="/api/members",
@@ -10,8 +13,15 @@ router = APIRouter(
 
 # Get all members
 @router.get("/", response_model=List[Members])
-async def api_get_members(skip: int = 0, limit: int = 100):
-    return await get_members(skip, limit)
+async def api_get_members(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    members = await get_members(skip, limit, cursor)
+    set_next_cursor(response, members, ["memberID"], limit)
+    return fast_json(members, response)
+
+# Export every row as NDJSON or CSV (streamed)
+@router.get("/export")
+async def api_export_members(format: str = "ndjson"):
+    return export_response("members", format)
 
 # Get a single member by memberID
 @router.get("/{memberID}", response_model=Members)
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 from schemas.publishers import Publishers
 from crud.publishers_crud import (
     get_publishers,
@@ -9,25 +9,25 @@ from crud.publishers_crud import (
     delete_publisher,
     delete_publishers
 )
-from database import database  # database instance
+from crud.pagination import set_next_cursor
+from crud.export_crud import export_response
+from http_cache import cached_json
 
 router = APIRouter(prefix="/api/publishers", tags=["Publishers"])
 
-# Ensure database connection
-@router.on_event("startup")
-async def startup():
-    if not database.is_connected:
-        await database.connect()
-
-@router.on_event("shutdown")
-async def shutdown():
-    if database.is_connected:
-        await database.disconnect()
-
-# Get all publishers
+# Get all publishers (cached, answers If-None-Match with 304)
 @router.get("/", response_model=List[Publishers])
-async def api_get_publishers(skip: int = 0, limit: int = 100):
-    return await get_publishers(skip, limit)
+async def api_get_publishers(request: Request, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    async def load(response: Response):
+        publishers = await get_publishers(skip, limit, cursor)
+        set_next_cursor(response, publishers, ["PublishName"], limit)
+        return publishers
+    return await cached_json(request, ["Publishers"], load)
+
+# Export every row as NDJSON or CSV (streamed)
+@router.get("/export")
+async def api_export_publishers(format: str = "ndjson"):
+    return export_response("publishers", format)
 
 # Get publisher by name
 @router.get("/{name}", response_model=Publishers)
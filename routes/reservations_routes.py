@@ -1,6 +1,6 @@
 # routes/reservations_routes.py
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Response
+from typing import List, Optional
 from schemas.reservations import Reservations
 from crud.reservations_crud import (
     get_reservations,
@@ -10,12 +10,27 @@ from crud.reservations_crud import (
     delete_reservation,
     delete_reservations_by_member,
 )
+from crud.reservation_queue import get_queue
+from crud.pagination import set_next_cursor
+from crud.export_crud import export_response
+from responses import fast_json
 
 router = APIRouter(prefix="/api/reservations", tags=["Reservations"])
 
 @router.get("/", response_model=List[Reservations])
-async def api_get_reservations(skip: int = 0, limit: int = 100):
-    return await get_reservations(skip, limit)
+async def api_get_reservations(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    reservations = await get_reservations(skip, limit, cursor)
+    set_next_cursor(response, reservations, ["ReservationID"], limit)
+    return fast_json(reservations, response)
+
+@router.get("/export")
+async def api_export_reservations(format: str = "ndjson"):
+    return export_response("reservations", format)
+
+# Waiting reservations of a book, in the order they will get a returned copy
+@router.get("/queue/{isbn}", response_model=List[Reservations])
+async def api_get_reservation_queue(isbn: str):
+    return await get_queue(isbn)
 
 @router.get("/{reservation_id}", response_model=Reservations)
 async def api_get_reservation(reservation_id: int):
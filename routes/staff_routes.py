@@ -1,14 +1,25 @@
 # routes/staff_routes.py
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Response
 from schemas.staff import Staff
 import crud.staff_crud as crud
+from crud.pagination import set_next_cursor
+from crud.export_crud import export_response
+from responses import fast_json
 
 router = APIRouter(prefix="/staff", tags=["Staff"])
 
 
 @router.get("/")
-async def get_staff(skip: int = 0, limit: int = 100):
-    return await crud.get_staff(skip, limit)
+async def get_staff(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    staff = await crud.get_staff(skip, limit, cursor)
+    set_next_cursor(response, staff, ["StaffID"], limit)
+    return fast_json(staff, response)
+
+
+@router.get("/export")
+async def export_staff(format: str = "ndjson"):
+    return export_response("staff", format)
 
 
 @router.get("/{staff_id}")
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class BookAvailability(BaseModel):
+    ISBN: str
+    Title: str
+    TotalCopies: int
+    OnLoan: int
+    Available: int
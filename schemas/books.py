@@ -7,7 +7,7 @@ class Books(BaseModel):
     ISBN: str = Field(..., min_length=13, max_length=13)
     Title: str
     Categories: Optional[str] = None
-    PublishYear: Optional[int] = None   # YEAR is int in Python
+    PublishYear: Optional[int] = Field(None, ge=1500, le=2025)   # YEAR is int in Python; chk_publish_year in libraryDB.sql
     PublishName: Optional[str] = None
 
 # the optional is because it can be null
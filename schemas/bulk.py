@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class BulkRowResult(BaseModel):
+    index: int      # position of the row in the request body
+    key: str        # primary key of the row ("ISBN/AuthorName" for links)
+    status: str     # "created" or "updated"
+
+
+class BulkResult(BaseModel):
+    created: int
+    updated: int
+    results: List[BulkRowResult]
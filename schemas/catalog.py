@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+# One row of GET /api/catalog/view: a book with everything the member pages show
+class CatalogBook(BaseModel):
+    ISBN: str
+    Title: str
+    Categories: Optional[str] = None
+    PublishYear: Optional[int] = None
+    PublishName: Optional[str] = None
+    PublisherContact: Optional[str] = None
+    Authors: Optional[str] = None   # comma separated
+    TotalCopies: int = 0
+    OnLoan: int = 0
+    Available: int = 0
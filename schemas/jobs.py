@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+from datetime import datetime
+
+# A background job (see jobs.py); Done/Total is its progress
+class Jobs(BaseModel):
+    JobID: str
+    Kind: str
+    Status: str   # queued, running, done or failed
+    Done: int = 0
+    Total: Optional[int] = None
+    Result: Optional[Any] = None
+    Error: Optional[str] = None
+    CreatedAt: datetime
+    StartedAt: Optional[datetime] = None
+    FinishedAt: Optional[datetime] = None
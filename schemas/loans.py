@@ -1,11 +1,29 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date
 
 class Loans(BaseModel):
-    LoanID: int
-    ReturnDate: Optional[date] = None
+    LoanID: Optional[int] = None   # assigned by the database on create
+    ReturnDate: Optional[date] = None   # NULL while the copy is out
+    DueDate: Optional[date] = None
     ISBN: Optional[str] = None
     MemberID: Optional[int] = None
     StaffID: Optional[int] = None
-    CopyID: Optional[int] = None
\ No newline at end of file
+    CopyID: Optional[int] = None
+
+# Checkout desk: lend several copies to one member at once
+class LoanCheckout(BaseModel):
+    MemberID: int
+    StaffID: Optional[int] = None
+    CopyIDs: List[int]
+
+
+# A closed loan; HeldFor is the reservation its copy is now held for, if any
+class LoanReturned(Loans):
+    HeldFor: Optional[int] = None
+
+
+# Return desk: close the open loans of the scanned copies
+class LoanReturn(BaseModel):
+    CopyIDs: List[int]
+    ReturnDate: Optional[date] = None   # defaults to today
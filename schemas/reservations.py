@@ -6,4 +6,5 @@ class Reservations(BaseModel):
     ReservationID: int
     memberID: int
     DateFor: date
-    BookReserved: int
\ No newline at end of file
+    BookReserved: int
+    AssignedCopyID: Optional[int] = None   # copy held for it, NULL while waiting
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class BookSearchResult(BaseModel):
+    ISBN: str
+    Title: str
+    Categories: Optional[str] = None
+    PublishYear: Optional[int] = None
+    PublishName: Optional[str] = None
+    Authors: Optional[str] = None   # comma separated
+    Score: float
@@ -0,0 +1,111 @@
+# serve.py
+# Production launcher: several worker processes, each running its own event
+# loop and database pool, so the app uses every CPU core.
+#
+#   python serve.py
+#   gunicorn -c gunicorn.conf.py main:app      (same thing)
+#
+# On Linux/macOS gunicorn runs the workers with the settings in
+# gunicorn.conf.py:
+#   - SERVER_WORKERS processes (default: one per usable CPU core), each a
+#     LibraryWorker (uvicorn with uvloop + httptools when installed)
+#   - the app is imported once in the master and forked (preload), so
+#     workers start fast and share the imported code; each worker opens its
+#     own pool in lifespan (main.py), never before the fork
+#   - SIGTERM drains: workers stop accepting, finish the requests in flight
+#     for up to SERVER_GRACEFUL_TIMEOUT seconds, then run the lifespan
+#     shutdown (background jobs stopped, replica and primary pools closed)
+# gunicorn does not run on Windows; there the same settings go to uvicorn's
+# own multi-process mode (no preload).
+#
+# `python main.py` is still the development server (one worker, reload).
+import os
+import sys
+
+# SERVER_* settings (read here and by gunicorn.conf.py)
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8008"))
+
+
+# CPU cores this process may run on (the container's limit, not the host's)
+def usable_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# worker processes; async workers each serve many requests, so one per core
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", str(usable_cpus())))
+# pending connections the kernel queues before refusing new ones
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+# seconds an idle keep-alive connection stays open; keep it longer than the
+# load balancer's idle timeout (60s on most) or it will reuse closed sockets
+SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "65"))
+# seconds in-flight requests get to finish on shutdown/restart
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+# restart a worker after this many requests (+ random jitter, so they don't
+# all restart at once) to cap slow memory growth; 0 = never
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "10000"))
+SERVER_MAX_REQUESTS_JITTER = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "1000"))
+
+
+def _installed(module: str) -> bool:
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+# uvloop/httptools are optional (uvicorn[standard]); fall back to the
+# asyncio loop and h11 parser without them
+LOOP = "uvloop" if _installed("uvloop") else "asyncio"
+HTTP = "httptools" if _installed("httptools") else "h11"
+
+# the lifespan shutdown (pool close) must fit in the graceful timeout, so
+# stop waiting for slow requests a few seconds before gunicorn kills us
+DRAIN_SECONDS = max(1, SERVER_GRACEFUL_TIMEOUT - 5)
+
+UVICORN_OPTIONS = dict(
+    loop=LOOP,
+    http=HTTP,
+    lifespan="on",
+    timeout_graceful_shutdown=DRAIN_SECONDS,
+)
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:
+    try:
+        from uvicorn.workers import UvicornWorker
+    except ImportError:  # no gunicorn (e.g. Windows)
+        UvicornWorker = None
+
+if UvicornWorker is not None:
+    class LibraryWorker(UvicornWorker):
+        CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, **UVICORN_OPTIONS}
+
+
+def main() -> None:
+    if UvicornWorker is not None:
+        from gunicorn.app.wsgiapp import run
+        config = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+        sys.argv = ["gunicorn", "-c", config, "main:app"]
+        run()
+        return
+
+    import uvicorn
+    uvicorn.run(
+        "main:app",
+        host=SERVER_HOST,
+        port=SERVER_PORT,
+        workers=SERVER_WORKERS,
+        backlog=SERVER_BACKLOG,
+        timeout_keep_alive=SERVER_KEEPALIVE,
+        limit_max_requests=SERVER_MAX_REQUESTS or None,
+        **UVICORN_OPTIONS,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,26 @@
 import logging
 from typing import Any, List, Optional
 from starlette.requests import Request
-from starlette_admin import BaseModelView  # ✅ No RequestAction import needed
 from starlette_admin.exceptions import FormValidationError
 from starlette_admin.fields import IntegerField, StringField
 from crud.books_crud import *
-from database import database
+from crud.lookups import attach_lookups
+from database import database, IS_MYSQL
+from crud.search_crud import boolean_query
+from views.sql_view import SQLModelView
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
-class BooksView(BaseModelView):
+# Resolve the publisher for a whole page of books in one query.
+# Rows use the lower-case field names of this view.
+async def attach_book_details(rows: List[dict]) -> List[dict]:
+    return await attach_lookups(
+        rows, "publishname", "Publishers", "PublishName", {"publisher": "PublishName"}
+    )
+
+
+class BooksView(SQLModelView):
     # ===================================================================
     # BASIC CONFIGURATION
     # ===================================================================
@@ -22,6 +31,16 @@ class BooksView(BaseModelView):
     pk_attr = "isbn"
     form_include_pk = True
 
+    table = "Books"
+    columns = {
+        "isbn": "ISBN",
+        "title": "Title",
+        "categories": "Categories",
+        "publishyear": "PublishYear",
+        "publishname": "PublishName",
+    }
+    display_fields = ["publisher"]
+
     searchable_fields = ["title", "categories"]
     sortable_fields = ["isbn", "title", "publishyear", "publishname"]
 
@@ -37,40 +56,23 @@ class BooksView(BaseModelView):
     ]
 
     # ===================================================================
-    # EXTRACT PRIMARY KEY VALUE
+    # DISPLAY COLUMNS + SEARCH
     # ===================================================================
-    async def get_pk_value(self, request: Request, obj: Any) -> Any:
-        return obj["isbn"] if isinstance(obj, dict) else getattr(obj, self.pk_attr)
-
-    # ===================================================================
-    # SERIALIZE A BOOK FOR DISPLAY
-    # ===================================================================
-    async def serialize(self, *args, **kwargs) -> dict:
-        obj = args[0] if args else kwargs.get("obj") or kwargs.get("instance")
-        if obj is None:
-            return {}
-
-        if not isinstance(obj, dict):
-            obj = dict(obj._mapping) if hasattr(obj, "_mapping") else obj.__dict__
+    async def attach(self, rows: List[dict]) -> List[dict]:
+        return await attach_book_details(rows)
 
-        # Resolve publisher name if missing
-        publisher = obj.get("publishname")
-        if not publisher:
-            async with database:
-                row = await database.fetch_one(
-                    "SELECT PublishName FROM Publishers WHERE PublishName = :p",
-                    values={"p": obj.get("publishname")}
-                )
-                publisher = row["PublishName"] if row else "Unknown"
-
-        return {
-            "isbn": obj.get("isbn"),
-            "title": obj.get("title"),
-            "categories": obj.get("categories"),
-            "publishyear": obj.get("publishyear"),
-            "publishname": publisher,
-            "_meta": {"pk": obj.get("isbn")},
-        }
+    # On MySQL the search box uses the BookSearch full-text index (title,
+    # categories, authors, publisher); words too short for it fall back to
+    # the prefix match on title/categories
+    def search_clause(self, term: str, values: dict) -> Optional[str]:
+        terms = boolean_query(term) if IS_MYSQL else ""
+        if not terms:
+            return super().search_clause(term, values)
+        values["terms"] = terms
+        return """ISBN IN (
+            SELECT ISBN FROM BookSearch
+            WHERE MATCH (Title, Categories, Authors, Publisher) AGAINST (:terms IN BOOLEAN MODE)
+        )"""
 
     # ===================================================================
     # VALIDATE FORM INPUT
@@ -85,110 +87,54 @@ class BooksView(BaseModelView):
 
         # Foreign key check: publisher must exist
         if data.get("publishname"):
-            async with database:
-                exists = await database.fetch_val(
-                    "SELECT COUNT(*) FROM Publishers WHERE PublishName = :p",
-                    values={"p": data["publishname"]}
-                )
-                if exists == 0:
-                    errors["publishname"] = f"Publisher '{data['publishname']}' does not exist"
+            exists = await database.fetch_val(
+                "SELECT COUNT(*) FROM Publishers WHERE PublishName = :p",
+                values={"p": data["publishname"]}
+            )
+            if exists == 0:
+                errors["publishname"] = f"Publisher '{data['publishname']}' does not exist"
 
         if errors:
             raise FormValidationError(errors)
 
-    # ===================================================================
-    # LIST VIEW + SEARCH
-    # ===================================================================
-    async def find_all(
-        self,
-        request: Request,
-        skip: int = 0,
-        limit: int = 100,
-        where: Optional[Any] = None,
-        order_by: Optional[List[Any]] = None,
-    ) -> List[Any]:
-
-        async with database:
-            if where and isinstance(where, (str, int)) and str(where).strip():
-                term = f"%{str(where).strip()}%"
-                query = """
-                    SELECT ISBN, Title, Categories, PublishYear, PublishName
-                    FROM Books
-                    WHERE Title LIKE :search OR Categories LIKE :search
-                    LIMIT :limit OFFSET :skip
-                """
-                rows = await database.fetch_all(
-                    query=query,
-                    values={"search": term, "limit": limit, "skip": skip}
-                )
-            else:
-                query = """
-                    SELECT ISBN, Title, Categories, PublishYear, PublishName
-                    FROM Books
-                    LIMIT :limit OFFSET :skip
-                """
-                rows = await database.fetch_all(
-                    query=query,
-                    values={"limit": limit, "skip": skip}
-                )
-
-        return [dict(r) for r in rows]
-
-    # ===================================================================
-    # COUNT RECORDS
-    # ===================================================================
-    async def count(self, request: Request, where: Optional[Any] = None) -> int:
-        async with database:
-            if where and isinstance(where, (str, int)) and str(where).strip():
-                term = f"%{str(where).strip()}%"
-                return await database.fetch_val(
-                    "SELECT COUNT(*) FROM Books WHERE Title LIKE :search OR Categories LIKE :search",
-                    values={"search": term},
-                )
-            return await database.fetch_val("SELECT COUNT(*) FROM Books")
-
     # ===================================================================
     # FIND BY PK
     # ===================================================================
     async def find_by_pk(self, request: Request, pk: Any) -> Optional[Any]:
-        async with database:
-            return await get_book(pk)
+        return await get_book(pk)
 
     # ===================================================================
     # CREATE BOOK
     # ===================================================================
     async def create(self, request: Request, data: dict) -> Any:
         await self.validate(request, data)
-        async with database:
-            isbn = await create_book(
-                data["isbn"],
-                data["title"],
-                data.get("categories"),
-                data.get("publishyear"),
-                data.get("publishname"),
-            )
-            return await get_book(isbn)
+        isbn = await create_book(
+            data["isbn"],
+            data["title"],
+            data.get("categories"),
+            data.get("publishyear"),
+            data.get("publishname"),
+        )
+        return await get_book(isbn)
 
     # ===================================================================
     # UPDATE BOOK
     # ===================================================================
     async def edit(self, request: Request, pk: Any, data: dict) -> Any:
         await self.validate(request, data)
-        async with database:
-            updated = await update_book(
-                pk,
-                data["title"],
-                data.get("categories"),
-                data.get("publishyear"),
-                data.get("publishname"),
-            )
-            if not updated:
-                raise FormValidationError({"_schema": "Update failed"})
-            return await get_book(pk)
+        updated = await update_book(
+            pk,
+            data["title"],
+            data.get("categories"),
+            data.get("publishyear"),
+            data.get("publishname"),
+        )
+        if not updated:
+            raise FormValidationError({"_schema": "Update failed"})
+        return await get_book(pk)
 
     # ===================================================================
     # DELETE
     # ===================================================================
     async def delete(self, request: Request, pks: List[Any]) -> int:
-        async with database:
-            return await delete_books(pks)
\ No newline at end of file
+        return await delete_books(pks)
\ No newline at end of file
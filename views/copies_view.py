@@ -1,7 +1,6 @@
 import logging
 from typing import Any, List, Optional
 from starlette.requests import Request
-from starlette_admin import BaseModelView
 from starlette_admin.exceptions import FormValidationError
 from starlette_admin.fields import IntegerField, StringField
 from database import database
@@ -11,12 +10,12 @@ from crud.copies_crud import (
     update_copy,
     delete_copies
 )
+from views.sql_view import SQLModelView
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
-class CopiesView(BaseModelView):
+class CopiesView(SQLModelView):
     # ===================================================================
     # BASIC CONFIGURATION
     # ===================================================================
@@ -27,8 +26,16 @@ class CopiesView(BaseModelView):
     pk_attr = "copy_id"
     form_include_pk = True
 
-    searchable_fields = ["isbn"]
-    sortable_fields = ["copy_id", "isbn", "shelf_location"]
+    table = "Copies"
+    columns = {
+        "copy_id": "CopyID",
+        "isbn": "ISBN",
+        "shelf_location": "ShelfLocation",
+        "condition_desc": "ConditionDesc",
+    }
+
+    searchable_fields = ["copy_id", "isbn", "shelf_location"]
+    sortable_fields = ["copy_id", "isbn", "shelf_location", "condition_desc"]
 
 
     # ===================================================================
@@ -41,12 +48,6 @@ class CopiesView(BaseModelView):
         StringField(name="condition_desc", label="Condition", required=False),
     ]
 
-    # ===================================================================
-    # EXTRACT PRIMARY KEY VALUE
-    # ===================================================================
-    async def get_pk_value(self, request: Request, obj: Any) -> Any:
-        return obj["copy_id"] if isinstance(obj, dict) else getattr(obj, self.pk_attr)
-
     # ===================================================================
     # VALIDATE FORM DATA
     # ===================================================================
@@ -59,83 +60,44 @@ class CopiesView(BaseModelView):
             errors["isbn"] = "Required"
 
         # Validate FK: ISBN exists
-        async with database:
-            exists = await database.fetch_val(
-                "SELECT COUNT(*) FROM Books WHERE ISBN=:isbn",
-                values={"isbn": data["isbn"]}
-            )
-            if exists == 0:
-                errors["isbn"] = f"Book ISBN {data['isbn']} does not exist"
+        exists = await database.fetch_val(
+            "SELECT COUNT(*) FROM Books WHERE ISBN=:isbn",
+            values={"isbn": data["isbn"]}
+        )
+        if exists == 0:
+            errors["isbn"] = f"Book ISBN {data['isbn']} does not exist"
 
         if errors:
             raise FormValidationError(errors)
 
 
-    async def find_all(self, request: Request, skip: int = 0, limit: int = 100,
-                       where: Optional[Any] = None, order_by=None):
-
-        async with database:
-            if where and str(where).strip():
-                term = str(where).strip()
-                query = """
-                    SELECT * FROM Copies
-                    WHERE ISBN LIKE :s
-                    LIMIT :limit OFFSET :skip
-                """
-                rows = await database.fetch_all(
-                    query, values={"s": f"%{term}%", "limit": limit, "skip": skip}
-                )
-            else:
-                rows = await database.fetch_all(
-                    "SELECT * FROM Copies LIMIT :limit OFFSET :skip",
-                    values={"limit": limit, "skip": skip}
-                )
-
-        return [dict(r) for r in rows]
-
-
-    async def count(self, request: Request, where: Optional[Any] = None) -> int:
-        async with database:
-            if where and str(where).strip():
-                term = str(where).strip()
-                return await database.fetch_val(
-                    "SELECT COUNT(*) FROM Copies WHERE ISBN LIKE :s",
-                    values={"s": f"%{term}%"}
-                )
-            return await database.fetch_val("SELECT COUNT(*) FROM Copies")
-
-
     async def find_by_pk(self, request: Request, pk: Any):
-        async with database:
-            return await get_copy(pk)
+        return await get_copy(pk)
 
 
     async def create(self, request: Request, data: dict):
         await self.validate(request, data)
-        async with database:
-            cid = await create_copy(
-                data["copy_id"],
-                data["isbn"],
-                data.get("shelf_location"),
-                data.get("condition_desc")
-            )
-            return await get_copy(cid)
+        cid = await create_copy(
+            data["copy_id"],
+            data["isbn"],
+            data.get("shelf_location"),
+            data.get("condition_desc")
+        )
+        return await get_copy(cid)
 
 
     async def edit(self, request: Request, pk: Any, data: dict):
         await self.validate(request, data)
-        async with database:
-            updated = await update_copy(
-                pk,
-                data["isbn"],
-                data.get("shelf_location"),
-                data.get("condition_desc")
-            )
-            if not updated:
-                raise FormValidationError({"_schema": "Update failed"})
-            return await get_copy(pk)
+        updated = await update_copy(
+            pk,
+            data["isbn"],
+            data.get("shelf_location"),
+            data.get("condition_desc")
+        )
+        if not updated:
+            raise FormValidationError({"_schema": "Update failed"})
+        return await get_copy(pk)
 
 
     async def delete(self, request: Request, pks: List[Any]):
-        async with database:
-            return await delete_copies(pks)
+        return await delete_copies(pks)
@@ -1,16 +1,16 @@
 import logging
 from typing import Any, List, Optional
 from starlette.requests import Request
-from starlette_admin import BaseModelView
 from starlette_admin.exceptions import FormValidationError
-from starlette_admin.fields import StringField, DateField
+from starlette_admin.fields import IntegerField
 from crud.fines_crud import *
 from database import database
+from schemas.fines import Fines
+from views.sql_view import SQLModelView
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-class FinesView(BaseModelView):
+class FinesView(SQLModelView):
     # ===================================================================
     # BASIC CONFIGURATION
     # ===================================================================
@@ -22,45 +22,23 @@ class FinesView(BaseModelView):
 
     form_include_pk = True
 
-    searchable_fields = ["FineID", "Amount"]
-    sortable_fields = ["FineID", "Amount"]
+    table = "Fines"
+    columns = {"FineID": "FineID", "Amount": "AmountFined", "DaysOverdue": "DaysOverdue", "LoanID": "LoanID"}
+
+    searchable_fields = ["FineID", "LoanID"]
+    sortable_fields = ["FineID", "Amount", "DaysOverdue", "LoanID"]
 
     # ===================================================================
     # FIELD DEFINITIONS
     # ===================================================================
     fields = [
-        StringField(name="FineID", label="Fine ID", required=True),
-        StringField(name="Amount", label="Amount", required=False),
-        StringField(name="DateIssued", label="Date Issued", required=False),
-        StringField(name="DatePaid", label="Date Paid", required=False),
+        IntegerField(name="FineID", label="Fine ID", required=True),
+        IntegerField(name="Amount", label="Amount", required=False),
+        IntegerField(name="DaysOverdue", label="Days Overdue", required=False),
+        IntegerField(name="LoanID", label="Loan ID", required=False),
     ]
 
 
-    # ===================================================================
-    # EXTRACT PRIMARY KEY VALUE
-    # ===================================================================
-    async def get_pk_value(self, request: Request, obj: Any) -> Any:
-        return obj["FineID"] if isinstance(obj, dict) else getattr(obj, self.pk_attr)
-
-    # ===================================================================
-    # SERIALIZE
-    # ===================================================================
-    async def serialize(self, *args, **kwargs) -> dict:
-        obj = args[0] if args else kwargs.get("obj") or kwargs.get("instance")
-        if obj is None:
-            return {}
-
-        if not isinstance(obj, dict):
-            obj = dict(obj._mapping) if hasattr(obj, "_mapping") else obj.__dict__
-
-        return {
-            "FineID": obj.get("FineID"),
-            "Amount": obj.get("AmountFined"),
-            "DaysOverdue": obj.get("DaysOverdue"),
-            "LoanID": obj.get("LoanID"),
-            "_meta": {"pk": obj.get("FineID")},
-        }
-    
     # ===================================================================
     # VALIDATE FORM INPUT
     # ===================================================================
@@ -77,92 +55,43 @@ class FinesView(BaseModelView):
         if errors:
             raise FormValidationError(errors)
 
-    # ===================================================================
-    # LIST VIEW WITH SEARCH
-    # ===================================================================
-    async def find_all(
-        self,
-        request: Request,
-        skip: int = 0,
-        limit: int = 100,
-        where: Optional[Any] = None,
-        order_by: Optional[List[Any]] = None,
-    ) -> List[Any]:
-        async with database:
-            if where and isinstance(where, (str, int)) and str(where).strip():
-                search_term = str(where).strip()
-                query = """
-                    SELECT FineID, Amount, DaysOverdue, LoanID
-                    FROM Fines
-                    WHERE FineID LIKE :search OR Amount LIKE :search
-                    LIMIT :limit OFFSET :skip
-                """
-                rows = await database.fetch_all(
-                    query=query,
-                    values={"search": f"%{search_term}%", "limit": limit, "skip": skip},
-                )
-            else:
-                query = """
-                    SELECT FineID, Amount, DaysOverdue, LoanID
-                    FROM Fines
-                    LIMIT :limit OFFSET :skip
-                """
-                rows = await database.fetch_all(
-                    query=query, values={"limit": limit, "skip": skip}
-                )
-            return [dict(row) for row in rows]
-        
-    # ===================================================================
-    # COUNT TOTAL RECORDS
-    # ===================================================================
-    async def count(self, request: Request, where: Optional[Any] = None) -> int:
-        async with database:
-            if where and isinstance(where, (str, int)) and str(where).strip():
-                search_term = str(where).strip()
-                query = """
-                    SELECT COUNT(*) FROM Fines
-                    WHERE FineID LIKE :search OR LoanID LIKE :search
-                """
-                return await database.fetch_val(query, values={"search": f"%{search_term}%"})
-            else:
-                return await database.fetch_val("SELECT COUNT(*) FROM Fines")
-
     # ===================================================================
     # FIND BY PRIMARY KEY
     # ===================================================================
     async def find_by_pk(self, request: Request, pk: Any) -> Optional[Any]:
-        async with database:
-            return await get_fine(pk)
-        
+        return await get_fine(int(pk))
+
+    # Form data -> Fines schema
+    def to_fine(self, fine_id: Any, data: dict) -> Fines:
+        return Fines(
+            FineID=fine_id, AmountFined=data["Amount"], DaysOverdue=data["DaysOverdue"], LoanID=data["LoanID"]
+        )
+
     # ===================================================================
     # CREATE NEW FINE
     # ===================================================================
     async def create(self, request: Request, data: dict) -> Any:
         await self.validate(request, data)
-        async with database:
-            await create_fine(data["FineID"], data.get("Amount"), data.get("DaysOverdue"), data.get("LoanID"))
-            return await get_fine(data["FineID"])
+        return await create_fine(self.to_fine(data["FineID"], data))
 
     # ===================================================================
     # UPDATE EXISTING FINE
     # ===================================================================
     async def edit(self, request: Request, pk: Any, data: dict) -> Any:
         await self.validate(request, data)
-        async with database:
-            await update_fine(pk, data.get("Amount"), data.get("DaysOverdue"), data.get("LoanID"))
-            return await get_fine(pk)
-    
+        return await update_fine(self.to_fine(int(pk), data))
+
     # ===================================================================
-    # DELETE ONE FINE
+    # DELETE ONE OR MANY FINES
     # ===================================================================
     async def delete(self, request: Request, pks: List[Any]) -> int:
-        async with database:
-            return await delete_fine(pks)
-        
+        for pk in pks:
+            await delete_fine(int(pk))
+        return len(pks)
+
     # ===================================================================
     # READ FINE BY LOAN ID
     # ===================================================================
     async def get_fines_by_loan(self, request: Request, LoanID: int) -> List[Any]:
-        async with database:
-            rows = await get_fines_by_loan(LoanID)
-            return [dict(row) for row in rows]
\ No newline at end of file
+        rows = await get_fines_by_loan(LoanID)
+        return [dict(row) for row in rows]
\ No newline at end of file
@@ -1,17 +1,29 @@
 import logging
 from typing import Any, List, Optional
 from starlette.requests import Request
-from starlette_admin import BaseModelView
 from starlette_admin.exceptions import FormValidationError
+from fastapi import HTTPException
 from starlette_admin.fields import IntegerField, StringField, DateField
 from crud.loans_crud import *
+from crud.lookups import attach_lookups
 from database import database
+from schemas.loans import Loans
+from views.sql_view import SQLModelView
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
-class LoansView(BaseModelView):
+# Resolve book title, member name, staff name and shelf location for a page
+# of loans: one IN (...) query per table instead of four queries per row
+async def attach_loan_details(rows: List[dict]) -> List[dict]:
+    await attach_lookups(rows, "ISBN", "Books", "ISBN", {"BookTitle": "Title"})
+    await attach_lookups(rows, "MemberID", "Members", "MemberID", {"MemberName": "MemName"})
+    await attach_lookups(rows, "StaffID", "Staff", "StaffID", {"StaffName": "StaffName"})
+    await attach_lookups(rows, "CopyID", "Copies", "CopyID", {"CopyLocation": "ShelfLocation"})
+    return rows
+
+
+class LoansView(SQLModelView):
     # ===================================================================
     # BASIC CONFIGURATION
     # ===================================================================
@@ -23,160 +35,109 @@ class LoansView(BaseModelView):
 
     form_include_pk = True
 
-    searchable_fields = ["LoanID"]
-    sortable_fields = ["LoanID", "ReturnDate", "ISBN", "MemberID", "StaffID", "CopyID"]
+    table = "Loans"
+    display_fields = ["BookTitle", "MemberName", "StaffName", "CopyLocation"]
+
+    searchable_fields = ["LoanID", "ISBN", "MemberID", "CopyID"]
+    sortable_fields = ["LoanID", "ReturnDate", "DueDate", "ISBN", "MemberID", "StaffID", "CopyID"]
 
     # ===================================================================
     # FIELD DEFINITIONS
     # ===================================================================
     fields = [
-        IntegerField(name="LoanID", label="Loan ID", required=True),
-        DateField(name="ReturnDate", label="Return Date", required=False),
-        StringField(name="ISBN", label="Book ISBN", required=False),
+        IntegerField(name="LoanID", label="Loan ID", exclude_from_create=True, read_only=True),
+        # set at the checkout/return desk (see update_loan), not in the forms
+        DateField(name="ReturnDate", label="Return Date", exclude_from_create=True, exclude_from_edit=True),
+        DateField(name="DueDate", label="Due Date", required=False),
+        StringField(name="ISBN", label="Book ISBN", exclude_from_create=True, exclude_from_edit=True),
         IntegerField(name="MemberID", label="Member ID", required=False),
         IntegerField(name="StaffID", label="Staff ID", required=False),
-        IntegerField(name="CopyID", label="Copy ID", required=False),
+        IntegerField(name="CopyID", label="Copy ID", required=False, exclude_from_edit=True),
     ]
 
     # ===================================================================
-    # EXTRACT PRIMARY KEY VALUE
+    # DISPLAY COLUMNS (book title, member, staff, shelf)
     # ===================================================================
-    async def get_pk_value(self, request: Request, obj: Any) -> Any:
-        return obj["LoanID"] if isinstance(obj, dict) else getattr(obj, self.pk_attr)
-
-    # ===================================================================
-    # SERIALIZE OBJECT
-    # ===================================================================
-    async def serialize(self, *args, **kwargs) -> dict:
-        obj = args[0] if args else kwargs.get("obj") or kwargs.get("instance")
-        if obj is None:
-            return {}
-
-        if not isinstance(obj, dict):
-            obj = dict(obj._mapping) if hasattr(obj, "_mapping") else obj.__dict__
-
-        async with database:
-            book_title = None
-            member_name = None
-            staff_name = None
-            copy_location = None
-
-            if obj.get("ISBN"):
-                book = await database.fetch_one("SELECT Title FROM Books WHERE ISBN = :isbn", values={"isbn": obj["ISBN"]})
-                book_title = book["Title"] if book else None
-
-            if obj.get("MemberID"):
-                member = await database.fetch_one("SELECT MemberName FROM Members WHERE MemberID = :id", values={"id": obj["MemberID"]})
-                member_name = member["MemberName"] if member else None
-
-            if obj.get("StaffID"):
-                staff = await database.fetch_one("SELECT StaffName FROM Staff WHERE StaffID = :id", values={"id": obj["StaffID"]})
-                staff_name = staff["StaffName"] if staff else None
-
-            if obj.get("CopyID"):
-                copy = await database.fetch_one("SELECT ShelfLocation FROM Copies WHERE CopyID = :id", values={"id": obj["CopyID"]})
-                copy_location = copy["ShelfLocation"] if copy else None
-
-        return {
-            "LoanID": obj.get("LoanID"),
-            "ReturnDate": obj.get("ReturnDate"),
-            "ISBN": obj.get("ISBN"),
-            "BookTitle": book_title,
-            "MemberID": obj.get("MemberID"),
-            "MemberName": member_name,
-            "StaffID": obj.get("StaffID"),
-            "StaffName": staff_name,
-            "CopyID": obj.get("CopyID"),
-            "CopyLocation": copy_location,
-            "_meta": {"pk": obj.get("LoanID")},
-        }
+    async def attach(self, rows: List[dict]) -> List[dict]:
+        return await attach_loan_details(rows)
 
     # ===================================================================
     # VALIDATE FORM INPUT
     # ===================================================================
     async def validate(self, request: Request, data: dict) -> None:
         errors = {}
-        if not data.get("LoanID"):
-            errors["LoanID"] = "Required"
-
-        async with database:
-            if data.get("ISBN"):
-                exists = await database.fetch_val("SELECT COUNT(*) FROM Books WHERE ISBN = :isbn", values={"isbn": data["ISBN"]})
-                if exists == 0:
-                    errors["ISBN"] = f"Book ISBN {data['ISBN']} does not exist"
-            if data.get("MemberID"):
-                exists = await database.fetch_val("SELECT COUNT(*) FROM Members WHERE MemberID = :id", values={"id": data["MemberID"]})
-                if exists == 0:
-                    errors["MemberID"] = f"Member ID {data['MemberID']} does not exist"
-            if data.get("StaffID"):
-                exists = await database.fetch_val("SELECT COUNT(*) FROM Staff WHERE StaffID = :id", values={"id": data["StaffID"]})
-                if exists == 0:
-                    errors["StaffID"] = f"Staff ID {data['StaffID']} does not exist"
-            if data.get("CopyID"):
-                exists = await database.fetch_val("SELECT COUNT(*) FROM Copies WHERE CopyID = :id", values={"id": data["CopyID"]})
-                if exists == 0:
-                    errors["CopyID"] = f"Copy ID {data['CopyID']} does not exist"
+
+        if data.get("ISBN"):
+            exists = await database.fetch_val("SELECT COUNT(*) FROM Books WHERE ISBN = :isbn", values={"isbn": data["ISBN"]})
+            if exists == 0:
+                errors["ISBN"] = f"Book ISBN {data['ISBN']} does not exist"
+        if data.get("MemberID"):
+            exists = await database.fetch_val("SELECT COUNT(*) FROM Members WHERE MemberID = :id", values={"id": data["MemberID"]})
+            if exists == 0:
+                errors["MemberID"] = f"Member ID {data['MemberID']} does not exist"
+        if data.get("StaffID"):
+            exists = await database.fetch_val("SELECT COUNT(*) FROM Staff WHERE StaffID = :id", values={"id": data["StaffID"]})
+            if exists == 0:
+                errors["StaffID"] = f"Staff ID {data['StaffID']} does not exist"
+        if data.get("CopyID"):
+            exists = await database.fetch_val("SELECT COUNT(*) FROM Copies WHERE CopyID = :id", values={"id": data["CopyID"]})
+            if exists == 0:
+                errors["CopyID"] = f"Copy ID {data['CopyID']} does not exist"
 
         if errors:
             raise FormValidationError(errors)
 
-    # ===================================================================
-    # LIST VIEW
-    # ===================================================================
-    async def find_all(self, request: Request, skip: int = 0, limit: int = 100, where: Optional[Any] = None, order_by: Optional[List[Any]] = None) -> List[Any]:
-        async with database:
-            rows = await get_loans(skip, limit)
-            return [dict(row) for row in rows]
-
-    # ===================================================================
-    # COUNT TOTAL RECORDS
-    # ===================================================================
-    async def count(self, request: Request, where: Optional[Any] = None) -> int:
-        async with database:
-            return await database.fetch_val("SELECT COUNT(*) FROM Loans")
-
     # ===================================================================
     # FIND BY PRIMARY KEY
     # ===================================================================
     async def find_by_pk(self, request: Request, pk: Any) -> Optional[Any]:
-        async with database:
-            return await get_loan(pk)
+        return await get_loan(int(pk))
+
+    # Form data -> Loans schema
+    def to_loan(self, loan_id: Any, data: dict) -> Loans:
+        return Loans(
+            LoanID=loan_id,
+            ReturnDate=data.get("ReturnDate"),
+            DueDate=data.get("DueDate"),
+            ISBN=data.get("ISBN"),
+            MemberID=data.get("MemberID"),
+            StaffID=data.get("StaffID"),
+            CopyID=data.get("CopyID"),
+        )
 
     # ===================================================================
     # CREATE NEW LOAN
     # ===================================================================
+    # (a checkout: the copy must be free, see create_loan)
     async def create(self, request: Request, data: dict) -> Any:
+        errors = {field: "Required" for field in ("MemberID", "CopyID") if not data.get(field)}
+        if errors:
+            raise FormValidationError(errors)
         await self.validate(request, data)
-        async with database:
-            await create_loan(
-                loan_id=data["LoanID"],
-                return_date=data.get("ReturnDate"),
-                isbn=data.get("ISBN"),
-                member_id=data.get("MemberID"),
-                staff_id=data.get("StaffID"),
-                copy_id=data.get("CopyID"),
-            )
-            return await get_loan(data["LoanID"])
+        try:
+            return await create_loan(self.to_loan(None, data))
+        except HTTPException as err:
+            raise FormValidationError({"CopyID": err.detail})
 
     # ===================================================================
     # UPDATE EXISTING LOAN
     # ===================================================================
+    # (due date, member and staff; the copy and return date stay as they are)
     async def edit(self, request: Request, pk: Any, data: dict) -> Any:
         await self.validate(request, data)
-        async with database:
-            await update_loan(
-                loan_id=pk,
-                return_date=data.get("ReturnDate"),
-                isbn=data.get("ISBN"),
-                member_id=data.get("MemberID"),
-                staff_id=data.get("StaffID"),
-                copy_id=data.get("CopyID"),
-            )
-            return await get_loan(pk)
+        current = await get_loan(int(pk))
+        if current is None:
+            raise FormValidationError({"DueDate": "Loan not found"})
+        kept = {"ReturnDate": current.ReturnDate, "ISBN": current.ISBN, "CopyID": current.CopyID}
+        try:
+            return await update_loan(self.to_loan(int(pk), {**data, **kept}))
+        except HTTPException as err:
+            raise FormValidationError({"DueDate": err.detail})
 
     # ===================================================================
     # DELETE ONE OR MANY LOANS
     # ===================================================================
     async def delete(self, request: Request, pks: List[Any]) -> int:
-        async with database:
-            return await delete_loans(pks)
+        for pk in pks:
+            await delete_loan(int(pk))
+        return len(pks)
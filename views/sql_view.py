@@ -0,0 +1,299 @@
+# views/sql_view.py
+# Shared base for the admin views: list pages (find_all/count) built as SQL
+# from a column map, so paging, the search box, column sorting and the
+# search builder filters all run in the database instead of in Python.
+#
+# A view sets `table` and, when its field names differ from the table's
+# columns, `columns` ({field name: column}); rows come back keyed by field
+# name. The search box does a prefix match (LIKE 'term%', which can use an
+# index) on `searchable_fields`, or an equality match for integer fields.
+# Sorting accepts several `sortable_fields` and always ends on `key_fields`
+# so pages are stable. Override search_clause() for a better search and
+# attach() to add display columns to a page of rows in batched lookups.
+#
+# find_all() starts the matching COUNT(*) as its own task, so both queries
+# run at the same time on two pool connections and count() only waits for
+# it. Counts are cached for ADMIN_COUNT_CACHE_TTL seconds per table version
+# (see bump_version in cache.py), so paging through a big table doesn't
+# count it again for every page.
+#
+# A page without search/filters on a table with more than
+# ADMIN_EXACT_COUNT_LIMIT rows (per the table statistics, MySQL only) shows
+# the statistics' estimate instead of a COUNT(*), which would scan the whole
+# index. Such responses carry the ESTIMATED_COUNT_HEADER header (see
+# admin_panel.py, added by the middleware in main.py). Filtered pages are
+# always counted exactly.
+#
+# Both list queries read from a replica when there is one (read_database in
+# database.py).
+import asyncio
+import os
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette_admin import BaseModelView
+from starlette_admin.fields import IntegerField
+
+from cache import MISSING, TTLCache, table_version
+from crud.lookups import in_clause
+from database import estimated_row_count, read_database
+
+# seconds a list page count is reused (0 = always count)
+ADMIN_COUNT_CACHE_TTL = float(os.getenv("ADMIN_COUNT_CACHE_TTL", "10"))
+
+# unfiltered tables estimated above this many rows are not counted (0 = always count)
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv("ADMIN_EXACT_COUNT_LIMIT", "100000"))
+
+# (view, table version, where, values) -> (total, estimated)
+count_cache = TTLCache("admin_counts", maxsize=1000, ttl=ADMIN_COUNT_CACHE_TTL)
+
+# Search builder operators -> SQL ({column}, {value} = placeholder)
+COMPARISONS = {
+    "eq": "{column} = {value}",
+    "neq": "{column} <> {value}",
+    "lt": "{column} < {value}",
+    "gt": "{column} > {value}",
+    "le": "{column} <= {value}",
+    "ge": "{column} >= {value}",
+}
+# LIKE operators -> (pattern, negated)
+PATTERNS = {
+    "startswith": ("{}%", False),
+    "not_startswith": ("{}%", True),
+    "endswith": ("%{}", False),
+    "not_endswith": ("%{}", True),
+    "contains": ("%{}%", False),
+    "not_contains": ("%{}%", True),
+}
+# operators without a value
+CHECKS = {
+    "is_null": "{column} IS NULL",
+    "is_not_null": "{column} IS NOT NULL",
+    "is_true": "{column} = 1",
+    "is_false": "{column} = 0",
+}
+
+
+# Escape the LIKE wildcards of a user value
+def like_escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SQLModelView(BaseModelView):
+    table: str = ""
+    # {field name: SQL column}; defaults to the field names themselves
+    columns: Dict[str, str] = {}
+    # fields that identify a row (sort tie breaker); defaults to [pk_attr]
+    key_fields: List[str] = []
+    # extra keys attach() adds to rows, passed through by serialize()
+    display_fields: List[str] = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.columns = self.columns or {field.name: field.name for field in self.fields}
+        self.key_fields = self.key_fields or [self.pk_attr]
+
+    # ===================================================================
+    # HOOKS
+    # ===================================================================
+
+    # Add display columns to a page of rows (in place); rows are field-keyed
+    async def attach(self, rows: List[dict]) -> List[dict]:
+        return rows
+
+    # SQL condition for the search box text, adding its values to `values`
+    def search_clause(self, term: str, values: dict) -> Optional[str]:
+        conditions = []
+        for name in self.searchable_fields or []:
+            column = self.columns.get(name)
+            if column is None:
+                continue
+            if isinstance(self.get_field(name), IntegerField):
+                if term.isdigit():
+                    values["search_id"] = int(term)
+                    conditions.append(f"{column} = :search_id")
+            else:
+                values["search"] = f"{like_escape(term)}%"
+                conditions.append(f"{column} LIKE :search")
+        # nothing can match (e.g. letters typed into an id-only search)
+        return " OR ".join(conditions) if conditions else "1 = 0"
+
+    def get_field(self, name: str) -> Any:
+        return next((field for field in self.fields if field.name == name), None)
+
+    # ===================================================================
+    # SQL BUILDING
+    # ===================================================================
+
+    # One search builder condition on a column
+    def _condition(self, column: str, operator: str, arg: Any, values: dict) -> Optional[str]:
+        name = f"f{len(values)}"
+        if operator in COMPARISONS:
+            values[name] = arg
+            return COMPARISONS[operator].format(column=column, value=f":{name}")
+        if operator in PATTERNS:
+            pattern, negated = PATTERNS[operator]
+            values[name] = pattern.format(like_escape(arg))
+            return f"{column} {'NOT ' if negated else ''}LIKE :{name}"
+        if operator in CHECKS:
+            return CHECKS[operator].format(column=column)
+        if operator in ("in", "not_in") and isinstance(arg, list):
+            if not arg:
+                return "1 = 0" if operator == "in" else None
+            placeholders, in_values = in_clause(f"{name}_", arg)
+            values.update(in_values)
+            return f"{column} {'NOT ' if operator == 'not_in' else ''}IN ({placeholders})"
+        if operator in ("between", "not_between") and isinstance(arg, list) and len(arg) == 2:
+            values[f"{name}_a"], values[f"{name}_b"] = arg
+            return f"{column} {'NOT ' if operator == 'not_between' else ''}BETWEEN :{name}_a AND :{name}_b"
+        # unknown operator: ignored
+        return None
+
+    # The search builder JSON ({"and": [{"Field": {"eq": 1}}, ...]}) as SQL.
+    # Only fields of this view become columns, everything else is ignored.
+    def filter_clause(self, where: dict, values: dict) -> Optional[str]:
+        parts = []
+        for key, value in where.items():
+            if key in ("and", "or") and isinstance(value, list):
+                inner = [self.filter_clause(item, values) for item in value if isinstance(item, dict)]
+                inner = [part for part in inner if part]
+                if inner:
+                    parts.append("(" + f" {key.upper()} ".join(inner) + ")")
+            elif key in self.columns and isinstance(value, dict):
+                for operator, arg in value.items():
+                    condition = self._condition(self.columns[key], operator, arg, values)
+                    if condition:
+                        parts.append(condition)
+        return " AND ".join(parts) if parts else None
+
+    # " WHERE ..." (or "") and its values for the list page's `where`
+    def where_clause(self, where: Any) -> Tuple[str, dict]:
+        values: dict = {}
+        condition = None
+        if isinstance(where, dict):
+            condition = self.filter_clause(where, values)
+        elif where is not None and str(where).strip():
+            condition = self.search_clause(str(where).strip(), values)
+        return (f" WHERE {condition}" if condition else ""), values
+
+    # " ORDER BY ..." from ["Field asc", "Other desc"], ending on the key fields
+    def order_clause(self, order_by: Optional[List[str]]) -> str:
+        terms = []
+        sorted_fields = set()
+        for item in order_by or []:
+            name, _, direction = str(item).partition(" ")
+            if name in (self.sortable_fields or []) and name in self.columns and name not in sorted_fields:
+                terms.append(f"{self.columns[name]} {'DESC' if direction.strip().lower() == 'desc' else 'ASC'}")
+                sorted_fields.add(name)
+        terms.extend(f"{self.columns[name]} ASC" for name in self.key_fields if name not in sorted_fields)
+        return " ORDER BY " + ", ".join(terms)
+
+    def select_list(self) -> str:
+        return ", ".join(f"{column} AS {name}" for name, column in self.columns.items())
+
+    # ===================================================================
+    # LIST VIEW
+    # ===================================================================
+
+    # (total, estimated): the statistics' estimate for big unfiltered tables,
+    # COUNT(*) otherwise
+    async def _count(self, where_sql: str, values: dict) -> Tuple[int, bool]:
+        key = (self.identity, table_version(self.table), where_sql, tuple(sorted(values.items())))
+        counted = count_cache.get(key)
+        if counted is MISSING:
+            estimate = None
+            if not where_sql and ADMIN_EXACT_COUNT_LIMIT > 0:
+                estimate = await estimated_row_count(self.table)
+            if estimate is not None and estimate > ADMIN_EXACT_COUNT_LIMIT:
+                counted = (estimate, True)
+            else:
+                counted = (await read_database.fetch_val(f"SELECT COUNT(*) FROM {self.table}{where_sql}", values=values), False)
+            count_cache.set(key, counted)
+        return counted
+
+    async def find_all(
+        self,
+        request: Request,
+        skip: int = 0,
+        limit: int = 100,
+        where: Optional[Any] = None,
+        order_by: Optional[List[Any]] = None,
+    ) -> List[Any]:
+        where_sql, values = self.where_clause(where)
+        # count() is called right after this with the same `where`
+        counting = asyncio.create_task(self._count(where_sql, values))
+        request.state.admin_count = counting
+        try:
+            rows = await read_database.fetch_all(
+                query=f"""
+                    SELECT {self.select_list()}
+                    FROM {self.table}{where_sql}{self.order_clause(order_by)}
+                    LIMIT :limit OFFSET :skip
+                """,
+                values={**values, "limit": limit, "skip": skip},
+            )
+        except BaseException:
+            counting.cancel()
+            raise
+        return await self.attach([dict(row) for row in rows])
+
+    async def count(self, request: Request, where: Optional[Any] = None) -> int:
+        counting = getattr(request.state, "admin_count", None)
+        if counting is not None:
+            request.state.admin_count = None
+            total, estimated = await counting
+        else:
+            total, estimated = await self._count(*self.where_clause(where))
+        request.state.count_estimated = estimated
+        return total
+
+    # ===================================================================
+    # SERIALIZE
+    # ===================================================================
+
+    # A SQL row, dict or schema model as a field-keyed dict (crud functions
+    # return column names, matched here without regard to case)
+    def to_row(self, obj: Any) -> dict:
+        if isinstance(obj, BaseModel):
+            raw = obj.dict()
+        elif isinstance(obj, dict):
+            raw = obj
+        else:
+            raw = dict(obj._mapping) if hasattr(obj, "_mapping") else dict(obj)
+        lowered = {key.lower(): value for key, value in raw.items()}
+        row = dict(raw)
+        for name, column in self.columns.items():
+            if name not in row:
+                row[name] = lowered.get(column.split(".")[-1].lower())
+        return row
+
+    async def get_pk_value(self, request: Request, obj: Any) -> Any:
+        row = self.to_row(obj)
+        if len(self.key_fields) > 1:
+            return tuple(row[name] for name in self.key_fields)
+        return row[self.pk_attr]
+
+    async def serialize(
+        self,
+        obj: Any,
+        request: Request,
+        action: Any = None,
+        include_relationships: bool = True,
+        include_select2: bool = False,
+    ) -> dict:
+        if obj is None:
+            return {}
+        row = self.to_row(obj)
+        # list pages arrive with attach() already done; a single row
+        # (detail/edit page) gets the same lookups here
+        if self.display_fields and self.display_fields[0] not in row:
+            await self.attach([row])
+        data = {}
+        for name in [field.name for field in self.fields] + self.display_fields:
+            value = row.get(name)
+            data[name] = value.isoformat() if isinstance(value, (date, datetime)) else value
+        pk = await self.get_pk_value(request, row)
+        data["_meta"] = {"pk": pk, "repr": str(pk)}
+        return data
@@ -1,16 +1,16 @@
 import logging
 from typing import Any, List, Optional
 from starlette.requests import Request
-from starlette_admin import BaseModelView
 from starlette_admin.exceptions import FormValidationError
-from starlette_admin.fields import StringField, DateField
+from starlette_admin.fields import IntegerField, StringField
 from crud.staff_crud import *
 from database import database
+from schemas.staff import Staff
+from views.sql_view import SQLModelView
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-class StaffView(BaseModelView):
+class StaffView(SQLModelView):
     # ===================================================================
     # BASIC CONFIGURATION
     # ===================================================================
@@ -22,44 +22,21 @@ class StaffView(BaseModelView):
 
     form_include_pk = True
 
-    searchable_fields = ["StaffID", "StaffName"]
-    sortable_fields = ["StaffID", "StaffName"]
+    table = "Staff"
+
+    searchable_fields = ["StaffID", "StaffName", "Position"]
+    sortable_fields = ["StaffID", "StaffName", "Position", "WorkTime"]
 
     # ===================================================================
     # FIELD DEFINITIONS
     # ===================================================================
     fields = [
-        StringField(name="StaffID", label="Staff ID", required=True),
+        IntegerField(name="StaffID", label="Staff ID", required=True),
         StringField(name="StaffName", label="Staff Name", required=False),
         StringField(name="Position", label="Position", required=False),
-        StringField(name="Email", label="Email", required=False),
+        IntegerField(name="WorkTime", label="Work Time", required=False),
     ]
 
-    # ===================================================================
-    # EXTRACT PRIMARY KEY VALUE
-    # ===================================================================
-    async def get_pk_value(self, request: Request, obj: Any) -> Any:
-        return obj["StaffID"] if isinstance(obj, dict) else getattr(obj, self.pk_attr)
-    
-    # ===================================================================
-    # SERIALIZE
-    # ===================================================================
-    async def serialize(self, *args, **kwargs) -> dict:
-        obj = args[0] if args else kwargs.get("obj") or kwargs.get("instance")
-        if obj is None:
-            return {}
-
-        if not isinstance(obj, dict):
-            obj = dict(obj._mapping) if hasattr(obj, "_mapping") else obj.__dict__
-
-        return {
-            "StaffID": obj.get("StaffID"),
-            "StaffName": obj.get("StaffName"),
-            "Position": obj.get("Position"),
-            "Email": obj.get("Email"),
-            "_meta": {"pk": obj.get("StaffID")},
-        }
-
     # ===================================================================
     # VALIDATE FORM INPUT
     # ===================================================================
@@ -72,85 +49,37 @@ class StaffView(BaseModelView):
         if errors:
             raise FormValidationError(errors)
 
-    # ===================================================================
-    # LIST VIEW WITH SEARCH
-    # ===================================================================
-    async def find_all(
-        self,
-        request: Request,
-        skip: int = 0,
-        limit: int = 100,
-        where: Optional[Any] = None,
-        order_by: Optional[List[Any]] = None,
-    ) -> List[Any]:
-        async with database:
-            if where and isinstance(where, (str, int)) and str(where).strip():
-                search_term = str(where).strip()
-                query = """
-                    SELECT StaffID, StaffName, Position, Email
-                    FROM Staff
-                    WHERE StaffID LIKE :search OR StaffName LIKE :search
-                    LIMIT :limit OFFSET :skip
-                """
-                rows = await database.fetch_all(
-                    query=query,
-                    values={"search": f"%{search_term}%", "limit": limit, "skip": skip},
-                )
-            else:
-                query = """
-                    SELECT StaffID, StaffName, Position, Email
-                    FROM Staff
-                    LIMIT :limit OFFSET :skip
-                """
-                rows = await database.fetch_all(
-                    query=query, values={"limit": limit, "skip": skip}
-                )
-            return [dict(row) for row in rows]
-        
-    # ===================================================================
-    # COUNT TOTAL RECORDS
-    # ===================================================================
-    async def count(self, request: Request, where: Optional[Any] = None) -> int:
-        async with database:
-            if where and isinstance(where, (str, int)) and str(where).strip():
-                search_term = str(where).strip()
-                query = """
-                    SELECT COUNT(*) FROM Staff
-                    WHERE StaffID LIKE :search OR StaffName LIKE :search
-                """
-                return await database.fetch_val(query, values={"search": f"%{search_term}%"})
-            else:
-                return await database.fetch_val("SELECT COUNT(*) FROM Staff")
-            
     # ===================================================================
     # FIND BY PRIMARY KEY
     # ===================================================================
     async def find_by_pk(self, request: Request, pk: Any) -> Optional[Any]:
-        async with database:
-            return await get_staff(pk)
-        
+        return await get_staff_member(int(pk))
+
+    # Form data -> Staff schema
+    def to_staff(self, staff_id: Any, data: dict) -> Staff:
+        return Staff(
+            StaffID=staff_id, StaffName=data["StaffName"], Position=data.get("Position"), WorkTime=data.get("WorkTime")
+        )
+
     # ===================================================================
     # CREATE NEW STAFF
     # ===================================================================
     async def create(self, request: Request, data: dict) -> Any:
         await self.validate(request, data)
-        async with database:
-            await create_staff(data["StaffID"], data.get("StaffName"), data.get("Position"), data.get("Email"))
-            return await get_staff(data["StaffID"])
-        
+        return await create_staff(self.to_staff(data["StaffID"], data))
+
     # ===================================================================
     # UPDATE EXISTING STAFF
     # ===================================================================
     async def edit(self, request: Request, pk: Any, data: dict) -> Any:
         await self.validate(request, data)
-        async with database:
-            await update_staff(pk, data.get("StaffName"), data.get("Position"), data.get("Email"))
-            return await get_staff(pk)
-        
+        return await update_staff(self.to_staff(int(pk), data))
+
     # ===================================================================
-    # DELETE ONE STAFF
+    # DELETE ONE OR MANY STAFF
     # ===================================================================
     async def delete(self, request: Request, pks: List[Any]) -> int:
-        async with database:
-            return await delete_staff(pks)
-        
+        for pk in pks:
+            await delete_staff(int(pk))
+        return len(pks)
+